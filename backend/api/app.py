@@ -23,6 +23,7 @@ from routes.insights import bp as insights_bp
 # Import database and websocket
 from database.connection import init_db
 from websocket.live_updates import register_socketio_handlers
+from workers.review_ingest import init_review_workers
 
 def create_app():
     app = Flask(__name__)
@@ -59,6 +60,9 @@ def create_app():
     # Initialize database
     init_db()
     
+    # Background NLP workers (only when REVIEW_INGEST_MODE=async)
+    init_review_workers(socketio)
+    
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(reviews_bp, url_prefix='/api/reviews')
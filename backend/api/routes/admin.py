@@ -7,6 +7,18 @@ from datetime import datetime, timedelta
 from database.models import User, Review, ProcessingLog
 from utils.auth_decorator import simple_auth_required, get_current_user_id
 from database.connection import get_db
+from nlp.model_registry import get_model_registry
+from nlp.result_cache import get_result_cache
+from nlp.micro_batching import executor_stats
+from nlp.batching import batcher_stats
+from nlp.embedding_store import get_embedding_store
+from nlp.topic_model_store import get_topic_model_store
+from nlp.similarity_index import get_similarity_index
+from nlp.near_duplicates import get_duplicate_index
+from nlp.spacy_provider import get_spacy_provider
+from workers.review_ingest import get_review_worker_pool
+from workers.bulk_reprocess import start_job_in_background, get_running_job, load_checkpoint, list_checkpoints
+from nlp.profiles import DEFAULT_PROFILE
 import traceback
 
 bp = Blueprint('admin', __name__)
@@ -44,12 +56,15 @@ def get_processing_queue():
         # Calculate statistics
         total_processed = db.query(ProcessingLog).count()
         successful = db.query(ProcessingLog).filter(
-            ProcessingLog.error.is_(None)
+            ProcessingLog.errors.is_(None)
         ).count()
         
+        ingest_pool = get_review_worker_pool()
+        
         # Format response
         return jsonify({
             'queue_status': 'active',
+            'ingest_workers': ingest_pool.stats() if ingest_pool else {'mode': 'sync'},
             'pipeline_stats': {
                 'total_processed': total_processed,
                 'successful': successful,
@@ -59,7 +74,7 @@ def get_processing_queue():
                 {
                     'review_id': log.review_id,
                     'processing_time': log.processing_time,
-                    'status': 'success' if not log.error else 'failed',
+                    'status': 'success' if not log.errors else 'failed',
                     'created_at': log.created_at.isoformat() if log.created_at else None
                 }
                 for log in recent_logs
@@ -134,11 +149,12 @@ def get_system_health():
             ProcessingLog.created_at.desc()
         ).limit(100).all()
         
-        avg_processing_time = sum(log.processing_time for log in recent_logs) / len(recent_logs) if recent_logs else 0
+        timed_logs = [log.processing_time for log in recent_logs if log.processing_time is not None]
+        avg_processing_time = sum(timed_logs) / len(timed_logs) if timed_logs else 0
         
         # Check for recent errors
         recent_errors = db.query(ProcessingLog).filter(
-            ProcessingLog.error.isnot(None),
+            ProcessingLog.errors.isnot(None),
             ProcessingLog.created_at >= datetime.now() - timedelta(hours=1)
         ).count()
         
@@ -154,6 +170,15 @@ def get_system_health():
                 'error_rate': round(recent_errors / max(len(recent_logs), 1), 2),
                 'recent_errors': recent_errors
             },
+            'models': get_model_registry().memory_summary(),
+            'nlp_cache': get_result_cache().stats() if get_result_cache() else {'enabled': False},
+            'nlp_microbatch': executor_stats(),
+            'nlp_batching': batcher_stats(),
+            'embeddings': get_embedding_store().stats(),
+            'topic_model': get_topic_model_store().stats(),
+            'similarity_index': get_similarity_index().stats(),
+            'near_duplicates': get_duplicate_index().stats(),
+            'spacy': get_spacy_provider().stats(),
             'timestamp': datetime.now().isoformat()
         }
         
@@ -175,6 +200,83 @@ def get_system_health():
             'error': str(e)
         }), 200
 
+@bp.route('/models', methods=['GET'])
+@admin_required
+def get_model_status():
+    """Get which NLP models are resident in this worker and their memory footprint"""
+    try:
+        registry = get_model_registry()
+        
+        return jsonify({
+            'models': registry.resident_models(),
+            'summary': registry.memory_summary(),
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        print(f"Model status error: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/reprocess-jobs', methods=['POST'])
+@admin_required
+def start_reprocess_job():
+    """Start (or resume with job_id) a bulk reprocess job in the background"""
+    try:
+        data = request.get_json() or {}
+        job_id = data.get('job_id')
+        if job_id and not load_checkpoint(job_id):
+            return jsonify({'error': f'No checkpoint for job {job_id}'}), 404
+        
+        job = start_job_in_background(
+            filters=data.get('filters', {}),
+            profile=data.get('profile', DEFAULT_PROFILE),
+            chunk_size=int(data.get('chunk_size', 256)),
+            job_id=job_id
+        )
+        
+        return jsonify({
+            'message': 'Reprocess job started',
+            'job': job.state
+        }), 202
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Start reprocess job error: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/reprocess-jobs', methods=['GET'])
+@admin_required
+def list_reprocess_jobs():
+    """List bulk reprocess jobs with their progress"""
+    jobs = []
+    for state in list_checkpoints():
+        running = get_running_job(state['job_id'])
+        jobs.append(running.state if running else state)
+    return jsonify({'jobs': jobs})
+
+@bp.route('/reprocess-jobs/<job_id>', methods=['GET'])
+@admin_required
+def get_reprocess_job(job_id):
+    """Progress, throughput and ETA of a bulk reprocess job"""
+    running = get_running_job(job_id)
+    state = running.state if running else load_checkpoint(job_id)
+    if not state:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'job': state, 'running': running is not None})
+
+@bp.route('/reprocess-jobs/<job_id>/cancel', methods=['POST'])
+@admin_required
+def cancel_reprocess_job(job_id):
+    """Stop a running job after its current chunk (it can be resumed later)"""
+    running = get_running_job(job_id)
+    if not running:
+        return jsonify({'error': 'Job is not running'}), 404
+    running.cancel()
+    return jsonify({'message': 'Cancellation requested', 'job_id': job_id})
+
 @bp.route('/export-data', methods=['POST'])
 @admin_required
 def export_data():
@@ -12,8 +12,8 @@ import traceback
 
 # Import NLP pipeline - with fallback
 try:
-    from nlp.advanced_pipeline import AdvancedNLPPipeline
-    nlp_pipeline = AdvancedNLPPipeline()
+    from nlp.advanced_pipeline import get_shared_pipeline
+    nlp_pipeline = get_shared_pipeline()  # Shared across blueprints, models load on first use
 except Exception as e:
     print(f"Warning: Could not load AdvancedNLPPipeline: {e}")
     nlp_pipeline = None
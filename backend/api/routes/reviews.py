@@ -4,13 +4,21 @@ from datetime import datetime, timedelta
 from database.models import Review, Product, ProcessingLog, AspectSentiment, Alert
 from database.connection import get_db
 from utils.auth_decorator import simple_auth_required, get_current_user_id
+from nlp.profiles import PIPELINE_PROFILES, DEFAULT_PROFILE, status_for_profile
+from nlp.review_fields import review_fields_from_results, format_nlp_analysis, duplicate_fields, nlp_results_from_review
+from nlp.instrumentation import ProcessingTrace
+from nlp.similarity_index import get_similarity_index
+from nlp.near_duplicates import get_duplicate_index, duplicate_detection_enabled, REUSE_THRESHOLD
+from nlp.embedding_store import get_embedding_store
+from database.processing_logs import build_processing_log, reusable_reviews
+from workers.review_ingest import get_review_worker_pool
 import traceback
 import time
 
 # Initialize NLP pipeline
 try:
-    from nlp.advanced_pipeline import AdvancedNLPPipeline
-    nlp_pipeline = AdvancedNLPPipeline()
+    from nlp.advanced_pipeline import get_shared_pipeline
+    nlp_pipeline = get_shared_pipeline()  # Shared across blueprints, models load on first use
 except ImportError:
     print("Warning: Could not load AdvancedNLPPipeline")
     nlp_pipeline = None
@@ -51,6 +59,11 @@ def submit_review():
         except (ValueError, TypeError):
             return jsonify({'error': 'Invalid rating'}), 400
         
+        # Optional stage selection, e.g. 'ingest-fast' to return sentiment quickly
+        nlp_profile = data.get('nlp_profile', DEFAULT_PROFILE)
+        if nlp_profile not in PIPELINE_PROFILES:
+            return jsonify({'error': f'Unknown nlp_profile: {nlp_profile}'}), 400
+        
         db = get_db()
         
         # Check if product exists
@@ -60,6 +73,35 @@ def submit_review():
         
         print(f"Processing review for product: {product.name} (Category: {product.category}, Subcategory: {product.subcategory})")
         
+        # Async ingest mode: store as pending and let the worker pool analyze it
+        ingest_pool = get_review_worker_pool()
+        if ingest_pool and data.get('async_processing', True):
+            review = Review(
+                user_id=user_id,
+                product_id=product_id,
+                rating=rating,
+                review_title=data.get('review_title', ''),
+                review_text=data['review_text'],
+                verified_purchase=data.get('verified_purchase', False),
+                processing_status='pending',
+                nlp_profile=nlp_profile,
+                processing_attempts=0,
+                review_date=datetime.utcnow(),
+                created_at=datetime.utcnow()
+            )
+            db.add(review)
+            db.commit()
+            
+            queued = ingest_pool.submit(review.id, nlp_profile)
+            print(f"Review {review.id} accepted for background processing (queued: {queued})")
+            
+            return jsonify({
+                'message': 'Review accepted for processing',
+                'review_id': review.id,
+                'processing_status': 'pending',
+                'nlp_profile': nlp_profile
+            }), 202
+        
         # Initialize with default NLP results
         nlp_results = {
             'processed_text': data['review_text'].lower(),
@@ -84,22 +126,50 @@ def submit_review():
             'emoji_analysis': {'has_emojis': False}
         }
         
+        # A near-duplicate of an already processed review reuses its analysis
+        duplicate_index = get_duplicate_index() if duplicate_detection_enabled() else None
+        signature = duplicate_match = source_review = None
+        if duplicate_index:
+            try:
+                signature, duplicate_match = duplicate_index.check(data['review_text'])
+                if duplicate_match and duplicate_match['similarity'] >= REUSE_THRESHOLD:
+                    source_review = reusable_reviews(db, [duplicate_match['review_id']]).get(
+                        duplicate_match['review_id']
+                    )
+            except Exception as e:
+                print(f"Duplicate check error (non-fatal): {e}")
+        
+        # Pass complete product info including subcategory
+        product_info = {
+            'category': product.category,
+            'subcategory': product.subcategory,  # Added subcategory
+            'brand': product.brand,
+            'product_name': product.name,
+            'product_id': product.id
+        }
+        
         # Try NLP processing with full product context
-        if nlp_pipeline:
+        trace = ProcessingTrace()
+        nlp_error = None
+        if source_review:
+            nlp_results = nlp_results_from_review(source_review)
+            if nlp_pipeline:
+                try:
+                    # Processed text, emojis and competitor mentions follow this review's own wording
+                    nlp_results.update(nlp_pipeline.text_fields([data['review_text']], [product_info])[0])
+                except Exception as e:
+                    print(f"Could not compute text fields for the near-duplicate (non-fatal): {e}")
+            trace.profile = 'duplicate'
+            print(f"Near-duplicate of review {source_review.id} "
+                  f"(similarity {duplicate_match['similarity']:.2f}); reusing its NLP results")
+        elif nlp_pipeline:
             try:
                 print("Starting NLP processing with category context...")
-                # Pass complete product info including subcategory
-                product_info = {
-                    'category': product.category,
-                    'subcategory': product.subcategory,  # Added subcategory
-                    'brand': product.brand,
-                    'product_name': product.name,
-                    'product_id': product.id
-                }
-                
                 nlp_results = nlp_pipeline.process_review(
                     data['review_text'],
-                    product_info
+                    product_info,
+                    profile=nlp_profile,
+                    trace=trace
                 )
                 
                 # Log competitor mentions if found
@@ -108,12 +178,22 @@ def submit_review():
                     for mention in nlp_results['competitor_mentions']:
                         print(f"  - {mention.get('competitor')}: {mention.get('comparison_type')} (Favorable: {mention.get('favorable_to_us')})")
                 
-                print("NLP processing completed successfully")
-            except Exception as nlp_error:
-                print(f"NLP processing error (non-fatal): {nlp_error}")
+                print(f"NLP processing completed successfully in {trace.finish().wall_seconds:.2f}s")
+            except Exception as e:
+                nlp_error = e
+                print(f"NLP processing error (non-fatal): {e}")
                 traceback.print_exc()
                 # Continue with default results
         
+        # A cheap profile leaves the review 'partial' until a full pass has run
+        if nlp_error:
+            processing_status = 'failed'
+        elif nlp_pipeline and not source_review:
+            processing_status = status_for_profile(nlp_profile)
+        else:
+            processing_status = 'complete'
+        partial = processing_status == 'partial'
+        
         # Create review
         review = Review(
             user_id=user_id,
@@ -136,35 +216,61 @@ def submit_review():
             quality_score=nlp_results.get('quality_metrics', {}).get('quality_score', 0.5),
             authenticity_score=nlp_results.get('quality_metrics', {}).get('authenticity_score', 0.5),
             competitor_mentions=nlp_results.get('competitor_mentions', []),
+            # A failed analysis keeps the default results above; the ingest sweep retries it
+            processing_status=processing_status,
+            nlp_profile=DEFAULT_PROFILE if partial else nlp_profile,
+            processing_attempts=0 if partial else (1 if (nlp_pipeline or source_review) else 0),
             
             review_date=datetime.utcnow(),
             created_at=datetime.utcnow()
         )
         
         db.add(review)
+        db.flush()
+        
+        if duplicate_index:
+            try:
+                analysis = duplicate_index.add(review.id, signature, user_id, product_id, duplicate_match)
+                for field, value in duplicate_fields(analysis).items():
+                    setattr(review, field, value)
+            except Exception as e:
+                print(f"Duplicate indexing error (non-fatal): {e}")
+        
+        if source_review:
+            review.topics = nlp_results['topics']
+            try:
+                get_embedding_store().copy(source_review.id, review.id)
+            except Exception as e:
+                print(f"Embedding copy error (non-fatal): {e}")
+        elif nlp_pipeline:
+            try:
+                topics = nlp_pipeline.assign_topics([review.id], [review.review_text])[0]
+                if topics is not None:
+                    review.topics = nlp_results['topics'] = topics
+            except Exception as e:
+                print(f"Embedding/topic assignment error (non-fatal): {e}")
+        
+        if nlp_pipeline or source_review:
+            trace.profile = trace.profile or nlp_profile
+            db.add(build_processing_log(review.id, trace, nlp_results, error=nlp_error))
         db.commit()
         
         print(f"Review saved successfully with ID: {review.id}")
         
+        if partial and ingest_pool:
+            # The heavy stages run in the background
+            ingest_pool.submit(review.id, DEFAULT_PROFILE)
+        
         # Format NLP results for frontend
-        formatted_nlp = {
-            'sentiment': {
-                'primary_sentiment': nlp_results.get('sentiment_analysis', {}).get('primary_sentiment', 'neutral'),
-                'confidence': nlp_results.get('sentiment_analysis', {}).get('confidence', 0.5),
-                'sentiment_scores': nlp_results.get('sentiment_analysis', {}).get('sentiment_scores', {})
-            },
-            'aspects': nlp_results.get('aspect_sentiments', {}),
-            'emotions': nlp_results.get('emotions', {}),
-            'quality': nlp_results.get('quality_metrics', {}),
-            'keywords': nlp_results.get('keywords', []),
-            'entities': nlp_results.get('entities', {}),
-            'competitor_mentions': nlp_results.get('competitor_mentions', [])
-        }
+        formatted_nlp = format_nlp_analysis(nlp_results)
         
         return jsonify({
             'message': 'Review submitted successfully',
             'review_id': review.id,
-            'nlp_analysis': formatted_nlp
+            'nlp_profile': trace.profile if source_review else nlp_profile,
+            'processing_status': review.processing_status,
+            'nlp_analysis': formatted_nlp,
+            'duplicate_analysis': review.duplicate_analysis
         }), 201
         
     except Exception as e:
@@ -224,6 +330,138 @@ def get_user_reviews():
         traceback.print_exc()
         return jsonify({'error': 'Failed to get reviews'}), 500
 
+@bp.route('/<review_id>/status', methods=['GET'])
+@simple_auth_required
+def get_review_status(review_id):
+    """Processing state of a review submitted in async mode"""
+    try:
+        db = get_db()
+        review = db.query(Review).filter_by(id=review_id).first()
+        if not review:
+            return jsonify({'error': 'Review not found'}), 404
+        
+        return jsonify({
+            'review_id': review.id,
+            'processing_status': review.processing_status or 'complete',
+            'sentiment': review.sentiment
+        })
+        
+    except Exception as e:
+        print(f"Get review status error: {str(e)}")
+        return jsonify({'error': 'Failed to get review status'}), 500
+
+# Candidates fetched per requested result when filtering by category
+CATEGORY_OVERSAMPLE = 10
+MAX_SIMILAR = 100
+
+def _similar_review_hits(db, vector, k, exclude_ids=()):
+    """(review_id, similarity) nearest to vector, honouring ?product_id= and ?category="""
+    index = get_similarity_index()
+    product_id = request.args.get('product_id')
+    category = request.args.get('category')
+    
+    if product_id:
+        allowed = [row.id for row in db.query(Review.id).filter(Review.product_id == product_id)]
+        return index.search(vector, k, allowed_ids=allowed, exclude_ids=exclude_ids)
+    
+    if category:
+        in_category = db.query(Review.id).join(Product, Product.id == Review.product_id).filter(
+            Product.category == category
+        )
+        # Over-fetch and keep the category's reviews; search the whole category only if too few survive
+        hits = index.search(vector, k * CATEGORY_OVERSAMPLE, exclude_ids=exclude_ids)
+        keep = {row.id for row in in_category.filter(Review.id.in_([review_id for review_id, _ in hits]))}
+        hits = [hit for hit in hits if hit[0] in keep]
+        if len(hits) < k:
+            hits = index.search(vector, k, allowed_ids=[row.id for row in in_category], exclude_ids=exclude_ids)
+        return hits[:k]
+    
+    return index.search(vector, k, exclude_ids=exclude_ids)
+
+def _requested_k():
+    """?k= clamped to 1..MAX_SIMILAR, or None if it is not an integer"""
+    try:
+        return max(1, min(int(request.args.get('k', 10)), MAX_SIMILAR))
+    except ValueError:
+        return None
+
+def _similar_reviews_response(db, vector, k, exclude_ids=()):
+    hits = _similar_review_hits(db, vector, k, exclude_ids)
+    
+    rows = db.query(Review, Product).outerjoin(Product, Product.id == Review.product_id).filter(
+        Review.id.in_([review_id for review_id, _ in hits])
+    ).all()
+    by_id = {review.id: (review, product) for review, product in rows}
+    
+    result = []
+    for review_id, similarity in hits:
+        if review_id not in by_id:
+            continue  # deleted since it was embedded
+        review, product = by_id[review_id]
+        result.append({
+            'id': review.id,
+            'similarity': round(similarity, 4),
+            'product_id': review.product_id,
+            'product_name': product.name if product else 'Unknown',
+            'product_category': product.category if product else 'Unknown',
+            'rating': review.rating,
+            'sentiment': review.sentiment,
+            'review_text': review.review_text,
+            'created_at': review.created_at.isoformat() if review.created_at else None
+        })
+    return {'k': k, 'search_backend': get_similarity_index().backend, 'reviews': result}
+
+@bp.route('/<review_id>/similar', methods=['GET'])
+@simple_auth_required
+def get_similar_reviews(review_id):
+    """Reviews closest to this one in sentence-embedding space"""
+    try:
+        k = _requested_k()
+        if k is None:
+            return jsonify({'error': 'k must be an integer'}), 400
+        if not nlp_pipeline:
+            return jsonify({'error': 'NLP pipeline not available'}), 503
+        db = get_db()
+        review = db.query(Review).filter_by(id=review_id).first()
+        if not review:
+            return jsonify({'error': 'Review not found'}), 404
+        
+        # Stored at ingest; encoded now for reviews that predate the embedding store
+        vector = nlp_pipeline.embed_reviews([review.id], [review.review_text])[0]
+        response = _similar_reviews_response(db, vector, k, exclude_ids=[review.id])
+        response['review_id'] = review.id
+        return jsonify(response)
+        
+    except Exception as e:
+        print(f"Similar reviews error: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': 'Failed to find similar reviews'}), 500
+
+@bp.route('/similar', methods=['GET'])
+@simple_auth_required
+def search_similar_reviews():
+    """Reviews closest to free text (?q=) in sentence-embedding space"""
+    try:
+        query = (request.args.get('q') or '').strip()
+        k = _requested_k()
+        if not query:
+            return jsonify({'error': 'q is required'}), 400
+        if k is None:
+            return jsonify({'error': 'k must be an integer'}), 400
+        if not nlp_pipeline:
+            return jsonify({'error': 'NLP pipeline not available'}), 503
+        db = get_db()
+        
+        vector = nlp_pipeline.encode_sentences([query])[0]
+        response = _similar_reviews_response(db, vector, k)
+        response['query'] = query
+        return jsonify(response)
+        
+    except Exception as e:
+        print(f"Similar reviews search error: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': 'Failed to search reviews'}), 500
+
 @bp.route('/<review_id>/nlp-details', methods=['GET'])
 @simple_auth_required
 def get_review_nlp_details(review_id):
@@ -240,6 +478,27 @@ def get_review_nlp_details(review_id):
         # Get product info
         product = db.query(Product).filter_by(id=review.product_id).first()
         
+        # Latest processing run of this review (submit or reprocess)
+        processing_log = db.query(ProcessingLog).filter_by(review_id=review.id).order_by(
+            ProcessingLog.created_at.desc()
+        ).first()
+        if processing_log:
+            steps = processing_log.processing_steps or {}
+            processing_details = {
+                'time': processing_log.processing_time,
+                'model': f"{processing_log.model_used} v{processing_log.model_version}",
+                'status': processing_log.stage,
+                'stages': steps.get('stages', {}),
+                'model_versions': steps.get('model_versions', {}),
+                'processed_at': processing_log.created_at.isoformat() if processing_log.created_at else None
+            }
+        else:
+            processing_details = {
+                'time': None,
+                'model': 'AdvancedNLPPipeline',
+                'status': 'unknown'
+            }
+        
         # Prepare detailed NLP analysis
         nlp_details = {
             'review_id': review.id,
@@ -258,16 +517,16 @@ def get_review_nlp_details(review_id):
                 'quality_metrics': {
                     'quality_score': float(review.quality_score) if review.quality_score else 0,
                     'authenticity_score': float(review.authenticity_score) if review.authenticity_score else 0,
-                    'spam_probability': 1 - float(review.authenticity_score) if review.authenticity_score else 0.5
+                    'spam_probability': float(review.spam_probability) if review.duplicate_analysis else (
+                        1 - float(review.authenticity_score) if review.authenticity_score else 0.5
+                    ),
+                    'duplicate_analysis': review.duplicate_analysis or {}
                 },
                 'keywords': review.keywords or [],
                 'entities': review.entities or {},
                 'competitor_mentions': review.competitor_mentions or [],
                 'emoji_analysis': review.emoji_analysis or {},
-                'processing': {
-                    'time': 0.5,  # Mock processing time
-                    'model': 'AdvancedNLPPipeline v2.0'
-                }
+                'processing': processing_details
             }
         }
         
@@ -448,8 +707,13 @@ def reprocess_review(review_id):
         if not product:
             return jsonify({'error': 'Product not found'}), 404
         
+        # Optional stage selection; fields of skipped stages are left untouched
+        nlp_profile = (request.get_json(silent=True) or {}).get('profile', DEFAULT_PROFILE)
+        if nlp_profile not in PIPELINE_PROFILES:
+            return jsonify({'error': f'Unknown profile: {nlp_profile}'}), 400
+        
         if nlp_pipeline:
-            print(f"Reprocessing review {review_id} with category context...")
+            print(f"Reprocessing review {review_id} with category context (profile: {nlp_profile})...")
             
             # Pass complete product info
             product_info = {
@@ -460,22 +724,21 @@ def reprocess_review(review_id):
                 'product_id': product.id
             }
             
-            nlp_results = nlp_pipeline.process_review(review.review_text, product_info)
+            trace = ProcessingTrace()
+            # A review is counted in the keyword tables on its first completed full pass
+            nlp_results = nlp_pipeline.process_review(
+                review.review_text, product_info, profile=nlp_profile, trace=trace,
+                update_keywords=review.processing_status != 'complete'
+            )
             
-            # Update review with new NLP results
-            review.processed_text = nlp_results.get('processed_text', review.review_text.lower())
-            review.sentiment = nlp_results.get('sentiment_analysis', {}).get('primary_sentiment', 'neutral')
-            review.sentiment_scores = nlp_results.get('sentiment_analysis', {}).get('sentiment_scores', {})
-            review.confidence_score = nlp_results.get('sentiment_analysis', {}).get('confidence', 0.5)
-            review.aspect_sentiments = nlp_results.get('aspect_sentiments', {})
-            review.entities = nlp_results.get('entities', {})
-            review.keywords = nlp_results.get('keywords', [])
-            review.emotion_scores = nlp_results.get('emotions', {}).get('emotion_scores', {})
-            review.emoji_analysis = nlp_results.get('emoji_analysis', {})
-            review.quality_score = nlp_results.get('quality_metrics', {}).get('quality_score', 0.5)
-            review.authenticity_score = nlp_results.get('quality_metrics', {}).get('authenticity_score', 0.5)
-            review.competitor_mentions = nlp_results.get('competitor_mentions', [])
+            # Update review with new NLP results (only the stages the profile ran)
+            updated_fields = review_fields_from_results(nlp_results)
+            for field, value in updated_fields.items():
+                setattr(review, field, value)
+            if status_for_profile(nlp_profile) == 'complete':
+                review.processing_status = 'complete'
             
+            db.add(build_processing_log(review.id, trace, nlp_results))
             db.commit()
             
             print(f"Review {review_id} reprocessed successfully")
@@ -483,6 +746,8 @@ def reprocess_review(review_id):
             return jsonify({
                 'message': 'Review reprocessed successfully',
                 'review_id': review_id,
+                'profile': nlp_profile,
+                'updated_fields': sorted(updated_fields),
                 'competitor_mentions_found': len(nlp_results.get('competitor_mentions', []))
             })
         else:
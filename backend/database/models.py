@@ -92,9 +92,18 @@ class Review(Base):
     authenticity_score = Column(Float, default=0)
     spam_probability = Column(Float, default=0)
     
+    # Near-duplicate detection: earliest matching review and its cluster
+    duplicate_of = Column(Integer, index=True)
+    duplicate_analysis = Column(JSON)  # {similarity, cluster_id, cluster_size, cluster_users, spam_ring, ...}
+    
     # Competitor analysis
     competitor_mentions = Column(JSON)  # list of competitor mentions
     
+    # NLP processing state: pending, processing, partial (cheap stages only), complete, failed
+    processing_status = Column(String(20), default='complete', index=True)
+    nlp_profile = Column(String(50))  # profile the next NLP pass runs with; the ingest pool requeues with it
+    processing_attempts = Column(Integer, default=0)  # NLP runs started, bounds retries of failed reviews
+    
     # Metadata
     verified_purchase = Column(Boolean, default=False)
     helpful_count = Column(Integer, default=0)
@@ -0,0 +1,76 @@
+# backend/database/processing_logs.py
+"""
+Builds ProcessingLog rows from NLP pipeline traces.
+
+Used by every path that runs the pipeline on a stored review, so the admin
+processing-queue and system-health endpoints see real latencies.
+"""
+from sqlalchemy import func
+
+from .models import ProcessingLog, Review
+
+# model_used of a run that computed every stage (see ProcessingTrace.log_fields)
+FULL_PASS_MODEL = 'AdvancedNLPPipeline:full'
+
+
+def confidence_scores_from_results(nlp_results):
+    """Headline model confidences of a pipeline result"""
+    scores = {}
+    if not nlp_results:
+        return scores
+
+    sentiment = nlp_results.get('sentiment_analysis')
+    if sentiment:
+        scores['sentiment'] = sentiment.get('confidence')
+
+    emotions = nlp_results.get('emotions')
+    if emotions and emotions.get('emotion_scores'):
+        scores['emotion'] = max(emotions['emotion_scores'].values())
+
+    aspects = nlp_results.get('aspect_sentiments')
+    if aspects:
+        mentioned = [a['confidence'] for a in aspects.values() if isinstance(a, dict) and a.get('mentioned')]
+        if mentioned:
+            scores['aspects'] = sum(mentioned) / len(mentioned)
+
+    return scores
+
+
+def build_processing_log(review_id, trace, nlp_results=None, error=None):
+    """
+    ProcessingLog for one review processed under ``trace``.
+
+    ``errors`` is only set on failure: the admin endpoints count rows with
+    a NULL ``errors`` column as successful.
+    """
+    log = ProcessingLog(
+        review_id=review_id,
+        confidence_scores=confidence_scores_from_results(nlp_results),
+        **trace.log_fields()
+    )
+    if error is not None:
+        log.stage = 'failed'
+        log.errors = [str(error)]
+    return log
+
+
+def reusable_reviews(db, review_ids):
+    """
+    {id: Review} for the given reviews whose analysis a near-duplicate may copy.
+
+    Only complete reviews whose latest ProcessingLog is a successful full
+    pass qualify; copies, cheap profiles and failed runs do not.
+    """
+    review_ids = set(review_ids)
+    if not review_ids:
+        return {}
+    latest = db.query(func.max(ProcessingLog.id)).filter(
+        ProcessingLog.review_id.in_(review_ids)
+    ).group_by(ProcessingLog.review_id)
+    reviews = db.query(Review).join(ProcessingLog, ProcessingLog.review_id == Review.id).filter(
+        ProcessingLog.id.in_(latest),
+        ProcessingLog.errors.is_(None),
+        ProcessingLog.model_used == FULL_PASS_MODEL,
+        Review.processing_status == 'complete'
+    )
+    return {review.id: review for review in reviews}
@@ -1,20 +1,26 @@
 # backend/nlp/advanced_pipeline.py - Complete updated version with emoji processing
-import torch
-from transformers import (
-    AutoTokenizer, 
-    AutoModelForSequenceClassification,
-    AutoModelForTokenClassification,
-    pipeline
-)
-from sentence_transformers import SentenceTransformer
-import spacy
-from bertopic import BERTopic
-from textblob import TextBlob
-import yake
+# torch, transformers, bertopic and yake are imported on first use, so importing
+# this module (e.g. from the API blueprints) stays cheap
 from collections import defaultdict
 import numpy as np
 import logging
+import threading
+import copy
 from .emoji_processor import EmojiProcessor  # Import our regex-based emoji processor
+from .model_registry import get_model_registry
+from .inference_backends import inference_device, DEFAULT_BACKEND
+from .review_context import ReviewContext, parse_review_contexts, STAGE_SPACY_COMPONENTS
+from .profiles import DEFAULT_PROFILE, TEXT_STAGES, resolve_stages, models_for_profile
+from .result_cache import get_result_cache, make_cache_key
+from .aspect_matcher import get_aspect_matcher
+from .competitor_matcher import get_competitor_matcher, is_comparison_favorable
+from .batching import TokenBudgetBatcher, token_lengths, DEFAULT_TOKEN_BUDGET
+from .instrumentation import ProcessingTrace
+from .micro_batching import MicroBatchExecutor, micro_batching_config
+from .subjectivity import get_subjectivity_scorer
+from .keyword_extractor import get_keyword_extractor, keyword_method
+from .embedding_store import get_embedding_store, embeddings_enabled
+from .topic_model_store import get_topic_model_store, topic_vectorizer
 import sys
 import os
 # Add the parent directory to the Python path
@@ -27,99 +33,438 @@ from config.competitors import get_competitors_for_product
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump whenever stage logic changes so cached results are not reused
+PIPELINE_VERSION = '2.3'
+
+# Aspects scored by ABSA, per product category
+DEFAULT_ASPECTS = ('quality', 'price', 'delivery', 'service', 'packaging')
+CATEGORY_ASPECTS = {
+    'Electronics': ('battery', 'screen', 'performance', 'camera', 'build quality'),
+    'Fashion': ('fit', 'material', 'style', 'comfort', 'color'),
+    'Beauty': ('effectiveness', 'texture', 'scent', 'packaging', 'ingredients'),
+    'Home': ('durability', 'design', 'functionality', 'assembly', 'size')
+}
+
 class AdvancedNLPPipeline:
-    def __init__(self):
+    def __init__(self, registry=None, cache=None, micro_batching=None):
         logger.info("Initializing Advanced NLP Pipeline...")
         
-        # Initialize emoji processor
-        self.emoji_processor = EmojiProcessor()
-        
-        # Load models
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        
-        # Sentiment Analysis - Using DistilBERT for efficiency
-        self.sentiment_tokenizer = AutoTokenizer.from_pretrained('distilbert-base-uncased-finetuned-sst-2-english')
-        self.sentiment_model = AutoModelForSequenceClassification.from_pretrained(
-            'distilbert-base-uncased-finetuned-sst-2-english'
-        ).to(self.device)
+        # Models are shared process-wide and loaded on first use
+        self.models = registry or get_model_registry()
         
-        # Aspect-Based Sentiment Analysis
-        self.absa_pipeline = pipeline(
-            "text-classification",
-            model="yangheng/deberta-v3-base-absa-v1.1",
-            device=0 if torch.cuda.is_available() else -1
-        )
+        # Optional NLPResultCache in front of process_reviews
+        self.cache = cache
         
-        # Entity Recognition
-        self.ner_pipeline = pipeline(
-            "ner",
-            model="dslim/bert-base-NER",
-            device=0 if torch.cuda.is_available() else -1
-        )
+        # Optional cross-request micro-batching ({'max_wait_ms', 'max_batch'}):
+        # one dispatcher thread per model coalesces concurrent callers
+        self.micro_batching = micro_batching
+        self._executors = {}
+        self._executors_lock = threading.Lock()
         
-        # Topic Modeling
-        self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.topic_model = BERTopic(
-            embedding_model=self.sentence_model,
-            nr_topics='auto',
-            min_topic_size=10
+        # Length-bucketed batching for the transformer stages
+        self.batcher = TokenBudgetBatcher(
+            max_tokens=int(os.environ.get('NLP_BATCH_TOKEN_BUDGET', DEFAULT_TOKEN_BUDGET))
         )
         
-        # Load spaCy for advanced text processing
-        self.nlp = spacy.load("en_core_web_sm")
+        # Initialize emoji processor
+        self.emoji_processor = EmojiProcessor()
         
-        # Keyword Extraction
-        self.kw_extractor = yake.KeywordExtractor(
-            lan="en",
-            n=3,  # max ngram size
-            dedupLim=0.7,
-            top=10
-        )
+        self._device = None
         
-        # Emotion Detection
-        self.emotion_pipeline = pipeline(
-            "text-classification",
-            model="j-hartmann/emotion-english-distilroberta-base",
-            device=0 if torch.cuda.is_available() else -1
-        )
+        # Keyword Extraction: corpus TF-IDF by default, per-review YAKE on request
+        self.keyword_method = keyword_method()
+        self._kw_extractor = None
         
-        # Zero-shot Classification for flexible aspect detection
-        self.zero_shot = pipeline(
-            "zero-shot-classification",
-            model="facebook/bart-large-mnli",
-            device=0 if torch.cuda.is_available() else -1
-        )
+        self._topic_model = None
         
         logger.info("Advanced NLP Pipeline initialized successfully!")
     
-    def process_review(self, review_text, product_info=None):
+    @property
+    def device(self):
+        if self._device is None:
+            self._device = inference_device(getattr(self.models, 'backend', DEFAULT_BACKEND))
+        return self._device
+    
+    @property
+    def kw_extractor(self):
+        if self._kw_extractor is None:
+            import yake
+            self._kw_extractor = yake.KeywordExtractor(
+                lan="en",
+                n=3,  # max ngram size
+                dedupLim=0.7,
+                top=10
+            )
+        return self._kw_extractor
+    
+    # Sentiment Analysis - Using DistilBERT for efficiency
+    @property
+    def sentiment_tokenizer(self):
+        return self.models.get('sentiment_tokenizer')
+    
+    @property
+    def sentiment_model(self):
+        return self.models.get('sentiment')
+    
+    # Aspect-Based Sentiment Analysis
+    @property
+    def absa_pipeline(self):
+        return self.models.get('absa')
+    
+    # Entity Recognition
+    @property
+    def ner_pipeline(self):
+        return self.models.get('ner')
+    
+    # Emotion Detection
+    @property
+    def emotion_pipeline(self):
+        return self.models.get('emotion')
+    
+    # Zero-shot Classification for flexible aspect detection
+    @property
+    def zero_shot(self):
+        return self.models.get('zero_shot')
+    
+    # Sentence embeddings for topic modeling
+    @property
+    def sentence_model(self):
+        return self.models.get('sentence')
+    
+    # spaCy for advanced text processing
+    @property
+    def nlp(self):
+        return self.models.get('spacy')
+    
+    # Topic Modeling (stateful, so one per pipeline instance)
+    @property
+    def topic_model(self):
+        if self._topic_model is None:
+            from bertopic import BERTopic
+            self._topic_model = BERTopic(
+                embedding_model=self.sentence_model,
+                vectorizer_model=topic_vectorizer(),
+                nr_topics='auto',
+                min_topic_size=10
+            )
+        return self._topic_model
+    
+    def process_review(self, review_text, product_info=None, profile=DEFAULT_PROFILE, trace=None, update_keywords=True):
         """Complete NLP processing for a single review"""
-        # First, analyze emojis
-        emoji_analysis = self.emoji_processor.analyze_emoji_sentiment(review_text)
-        
-        # Process text with emojis handled
-        processed_text_with_emojis = self.emoji_processor.replace_emojis_with_text(review_text)
-        processed_text_clean = self.preprocess_text(processed_text_with_emojis)
-        
-        results = {
-            'original_text': review_text,
-            'processed_text': processed_text_clean,
-            'emoji_analysis': emoji_analysis,
-            'sentiment_analysis': self.analyze_sentiment_with_emojis(review_text, emoji_analysis),
-            'aspect_sentiments': self.analyze_aspects(processed_text_with_emojis, product_info),
-            'entities': self.extract_entities(processed_text_with_emojis),
-            'emotions': self.detect_emotions_with_emojis(review_text, emoji_analysis),
-            'keywords': self.extract_keywords(processed_text_with_emojis),
-            'quality_metrics': self.assess_review_quality_with_emojis(review_text, emoji_analysis),
-            'competitor_mentions': self.detect_competitor_mentions(review_text),
-            'topics': []  # Will be filled by batch topic modeling
-        }
+        return self.process_reviews(
+            [review_text], [product_info], profile=profile, trace=trace, update_keywords=update_keywords
+        )[0]
+    
+    def process_reviews(self, review_texts, product_infos=None, batch_size=32, profile=DEFAULT_PROFILE, trace=None,
+                        update_keywords=True):
+        """Complete NLP processing for a batch of reviews
+        
+        Every transformer stage (sentiment, aspects, entities, emotions) runs
+        once over the whole batch with padded inputs, ``batch_size`` texts per
+        forward pass. Each returned dict has the same shape and values as
+        ``process_review`` for that text (up to float rounding from padding).
+        
+        ``profile`` names a stage selection from ``nlp.profiles`` (or is an
+        iterable of stage names); result keys of skipped stages are omitted
+        and their models are never loaded.
+        
+        With a result cache configured, reviews whose normalized text,
+        category and model versions were seen before are served from the
+        cache and only the rest go through the models.
+        
+        Pass a ``ProcessingTrace`` as ``trace`` to collect wall/CPU time per
+        stage, peak RSS delta and the model versions used.
+        
+        The keywords stage adds each text to the corpus phrase frequencies.
+        ``update_keywords`` is a flag for the whole batch or one flag per
+        review: a review should be counted once, on its first full pass,
+        so reprocessing passes False for reviews that were already counted.
+        """
+        stages = resolve_stages(profile)
+        review_texts = list(review_texts)
+        if product_infos is None:
+            product_infos = [None] * len(review_texts)
+        product_infos = list(product_infos)
+        if len(product_infos) != len(review_texts):
+            raise ValueError("product_infos must have one entry per review")
+        if not review_texts:
+            return []
+        if isinstance(update_keywords, bool):
+            update_keywords = [update_keywords] * len(review_texts)
+        update_keywords = list(update_keywords)
+        if len(update_keywords) != len(review_texts):
+            raise ValueError("update_keywords must have one entry per review")
+        
+        trace = trace or ProcessingTrace()
+        trace.profile = profile if isinstance(profile, str) else ','.join(stages)
+        trace.num_reviews = len(review_texts)
+        versions = self.model_versions(stages)
+        trace.model_versions = versions
+        
+        if self.cache is None:
+            results = self._process_reviews_uncached(
+                review_texts, product_infos, batch_size, stages, trace, update_keywords
+            )
+            trace.finish()
+            return results
+        
+        with trace.stage('cache_lookup'):
+            keys = [make_cache_key(text, info, stages, versions) for text, info in zip(review_texts, product_infos)]
+            results = [self.cache.get(key) for key in keys]
+        
+        # Compute each distinct missing key once, even if repeated in the batch
+        pending = {}
+        for i, (key, result) in enumerate(zip(keys, results)):
+            if result is None:
+                pending.setdefault(key, []).append(i)
+        
+        if pending:
+            first_indices = [indices[0] for indices in pending.values()]
+            computed = self._process_reviews_uncached(
+                [review_texts[i] for i in first_indices],
+                [product_infos[i] for i in first_indices],
+                batch_size,
+                stages,
+                trace,
+                # A text repeated in the batch is counted if any of its reviews should be
+                [any(update_keywords[i] for i in indices) for indices in pending.values()]
+            )
+            with trace.stage('cache_store'):
+                for (key, indices), result in zip(pending.items(), computed):
+                    self.cache.put(key, result)
+                    results[indices[0]] = result
+                    for i in indices[1:]:
+                        results[i] = copy.deepcopy(result)
+        
+        trace.cache_hits = len(review_texts) - sum(len(indices) for indices in pending.values())
+        for review_text, result in zip(review_texts, results):
+            result['original_text'] = review_text
+        
+        trace.finish()
+        return results
+    
+    def text_fields(self, review_texts, product_infos=None):
+        """
+        Processed text, emoji analysis and competitor mentions for each text.
+
+        A near-duplicate copies the model outputs of the review it matches;
+        these fields depend on its own wording, so they are computed for it.
+        Competitor mentions only score the comparison contexts found.
+        """
+        results = self.process_reviews(review_texts, product_infos, profile=TEXT_STAGES)
+        return [
+            {key: result[key] for key in ('processed_text', 'emoji_analysis', 'competitor_mentions')}
+            for result in results
+        ]
+    
+    def model_versions(self, profile=DEFAULT_PROFILE):
+        """Pipeline and model versions that determine a profile's output"""
+        versions = {'pipeline': PIPELINE_VERSION}
+        for name in models_for_profile(profile):
+            versions[name] = self.models.version(name)
+        if 'keywords' in resolve_stages(profile):
+            versions['keywords'] = self.keyword_method
+        return versions
+    
+    def _process_reviews_uncached(self, review_texts, product_infos, batch_size, stages, trace, update_keywords):
+        """Run the selected stages over a batch of reviews"""
+        # Analyze emojis and derive the text variants once per review,
+        # then parse each distinct variant a single time for all stages
+        with trace.stage('emoji_analysis'):
+            contexts = [
+                ReviewContext(text, self.emoji_processor, lambda text: self.nlp(text), product_info, stages)
+                for text, product_info in zip(review_texts, product_infos)
+            ]
+        if any(stage in STAGE_SPACY_COMPONENTS for stage in stages):
+            with trace.stage('spacy_parse'):
+                parse_review_contexts(self.nlp, contexts)
+        
+        texts_with_emojis = [context.text_with_emoji_tokens for context in contexts]
+        texts_without_emojis = [context.text_without_emojis for context in contexts]
+        
+        # One batched pass per transformer stage
+        if 'sentiment' in stages:
+            with trace.stage('sentiment'):
+                sentiment_probs = self._sentiment_probs_batch(texts_without_emojis, batch_size)
+            with trace.stage('subjectivity'):
+                subjectivities = self._subjectivity_batch(contexts)
+        if 'emotions' in stages:
+            with trace.stage('emotions'):
+                emotions = self._emotions_batch(texts_without_emojis, batch_size)
+        if 'entities' in stages:
+            with trace.stage('entities'):
+                bert_entities = self._ner_batch(texts_with_emojis, batch_size)
+        if 'aspects' in stages:
+            with trace.stage('aspects'):
+                aspect_sentiments = self._analyze_aspects_batch(texts_with_emojis, product_infos, batch_size, contexts)
+        if 'competitors' in stages:
+            with trace.stage('competitors'):
+                competitor_mentions = self._detect_competitor_mentions_batch(
+                    [context.text for context in contexts], product_infos, batch_size
+                )
+        
+        results = []
+        for i, context in enumerate(contexts):
+            review_text = context.text
+            emoji_analysis = context.emoji_analysis
+            result = {'original_text': review_text}
+            
+            if 'preprocess' in stages:
+                with trace.stage('preprocess'):
+                    result['processed_text'] = self.preprocess_text(context.text_with_emoji_tokens, context)
+            result['emoji_analysis'] = emoji_analysis
+            if 'sentiment' in stages:
+                with trace.stage('sentiment'):
+                    result['sentiment_analysis'] = self._combine_sentiment_with_emojis(
+                        context.text_without_emojis, sentiment_probs[i], emoji_analysis, subjectivities[i]
+                    )
+            if 'aspects' in stages:
+                result['aspect_sentiments'] = aspect_sentiments[i]
+            if 'entities' in stages:
+                with trace.stage('entities'):
+                    result['entities'] = self._merge_entities(context.doc(context.text_with_emoji_tokens), bert_entities[i])
+            if 'emotions' in stages:
+                with trace.stage('emotions'):
+                    result['emotions'] = self._combine_emotions_with_emojis(review_text, emotions[i], emoji_analysis)
+            if 'keywords' in stages:
+                result['keywords'] = None  # filled in below
+            if 'quality' in stages:
+                with trace.stage('quality'):
+                    result['quality_metrics'] = self.assess_review_quality_with_emojis(review_text, emoji_analysis, context)
+            if 'competitors' in stages:
+                result['competitor_mentions'] = competitor_mentions[i]
+            result['topics'] = []  # Will be filled by batch topic modeling
+            
+            results.append(result)
+        
+        # Keywords run last: they count the texts in the corpus tables, which
+        # should only happen once every other stage has succeeded
+        if 'keywords' in stages:
+            with trace.stage('keywords'):
+                keywords = self._keywords_batch(
+                    [context.text_with_emoji_tokens for context in contexts], product_infos, update_keywords
+                )
+            for result, review_keywords in zip(results, keywords):
+                result['keywords'] = review_keywords
         
         return results
     
-    def preprocess_text(self, text):
+    def warm_up(self, profile=DEFAULT_PROFILE):
+        """Load every model a profile needs ahead of the first request"""
+        for name in models_for_profile(profile):
+            self.models.get(name)
+    
+    def _executor(self, name, batch_fn, num_items):
+        """
+        Micro-batch executor for a model stage, or None to run on the calling thread.
+
+        Only calls smaller than ``max_batch`` are coalesced. A call that already
+        fills a batch (bulk reprocess, the ingest pool) gains nothing from the
+        dispatcher and keeps its own batch_size and token-budget buckets.
+        """
+        if self.micro_batching is None or num_items >= self.micro_batching['max_batch']:
+            return None
+        executor = self._executors.get(name)
+        if executor is None:
+            with self._executors_lock:
+                executor = self._executors.get(name)
+                if executor is None:
+                    max_batch = self.micro_batching['max_batch']
+                    executor = MicroBatchExecutor(
+                        name,
+                        lambda items: batch_fn(items, max_batch),
+                        max_batch=max_batch,
+                        max_wait_ms=self.micro_batching['max_wait_ms']
+                    )
+                    self._executors[name] = executor
+        return executor
+    
+    def _sentiment_probs_batch(self, texts, batch_size=32):
+        """Run the sentiment model over texts, returning [negative, positive] per text (None for blank text)"""
+        texts = list(texts)
+        executor = self._executor('sentiment', self._sentiment_probs_direct, len(texts))
+        if executor is not None:
+            # Coalesced with other request threads' texts into shared forwards
+            return executor.map(texts)
+        return self._sentiment_probs_direct(texts, batch_size)
+    
+    def _sentiment_probs_direct(self, texts, batch_size=32):
+        """Sentiment forward passes on the calling thread"""
+        probs = [None] * len(texts)
+        indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        
+        if not indices:
+            return probs
+        
+        def score(batch_texts):
+            inputs = self.sentiment_tokenizer(
+                batch_texts,
+                return_tensors="pt",
+                truncation=True,
+                max_length=512,
+                padding=True
+            )
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            
+            import torch
+            with torch.no_grad():
+                outputs = self.sentiment_model(**inputs)
+                batch_probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
+            
+            return batch_probs.tolist()
+        
+        # Length-bucketed batches under the token budget, returned in input order
+        batch_texts = [texts[i] for i in indices]
+        lengths = token_lengths(self.sentiment_tokenizer, batch_texts)
+        rows = self.batcher.run(batch_texts, lengths, score, stage='sentiment', max_batch_size=batch_size)
+        for i, row in zip(indices, rows):
+            probs[i] = row
+        
+        return probs
+    
+    def _run_batched_pipeline(self, pipe, inputs, batch_size, stage):
+        """Call a transformers pipeline over token-budget batches, keeping input order"""
+        inputs = list(inputs)
+        if not inputs:
+            return []
+        executor = self._executor(stage, lambda items, size: self._run_pipeline_direct(pipe, items, size, stage), len(inputs))
+        if executor is not None:
+            return executor.map(inputs)
+        return self._run_pipeline_direct(pipe, inputs, batch_size, stage)
+    
+    def _run_pipeline_direct(self, pipe, inputs, batch_size, stage):
+        """Pipeline calls on the calling thread"""
+        lengths = token_lengths(getattr(pipe, 'tokenizer', None), inputs)
+        return self.batcher.run(
+            inputs,
+            lengths,
+            lambda batch: pipe(batch, batch_size=len(batch)),
+            stage=stage,
+            max_batch_size=batch_size
+        )
+    
+    def _emotions_batch(self, texts, batch_size=32):
+        """Run the emotion model over texts, returning the pipeline output per text (None for blank text)"""
+        emotions = [None] * len(texts)
+        indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        
+        if indices:
+            outputs = self._run_batched_pipeline(self.emotion_pipeline, [texts[i] for i in indices], batch_size, 'emotions')
+            for i, output in zip(indices, outputs):
+                # A list input yields one top prediction dict per text
+                emotions[i] = [output]
+        
+        return emotions
+    
+    def _ner_batch(self, texts, batch_size=32):
+        """Run the BERT NER model over texts, returning the entity list per text"""
+        if not texts:
+            return []
+        return self._run_batched_pipeline(self.ner_pipeline, texts, batch_size, 'entities')
+    
+    def preprocess_text(self, text, context=None):
         """Advanced text preprocessing"""
-        doc = self.nlp(text)
+        doc = context.doc(text) if context else self.nlp(text)
         
         # Remove noise while preserving meaning
         tokens = []
@@ -135,6 +480,7 @@ class AdvancedNLPPipeline:
         inputs = self.sentiment_tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
         
+        import torch
         with torch.no_grad():
             outputs = self.sentiment_model(**inputs)
             probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
@@ -149,9 +495,8 @@ class AdvancedNLPPipeline:
         # Determine primary sentiment
         primary_sentiment = max(sentiment_scores, key=sentiment_scores.get)
         
-        # Calculate subjectivity using TextBlob
-        blob = TextBlob(text)
-        subjectivity = blob.sentiment.subjectivity
+        # TextBlob-compatible subjectivity
+        subjectivity = get_subjectivity_scorer().score_texts([text])[0]
         
         return {
             'primary_sentiment': primary_sentiment,
@@ -164,20 +509,26 @@ class AdvancedNLPPipeline:
         """Analyze sentiment considering both text and emojis"""
         # Get text-based sentiment
         text_without_emojis = self.emoji_processor.remove_emojis(text)
+        probs = self._sentiment_probs_batch([text_without_emojis])[0]
         
-        if text_without_emojis.strip():
-            # Analyze text sentiment
-            inputs = self.sentiment_tokenizer(text_without_emojis, return_tensors="pt", truncation=True, max_length=512)
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            with torch.no_grad():
-                outputs = self.sentiment_model(**inputs)
-                probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
-            
+        return self._combine_sentiment_with_emojis(text_without_emojis, probs, emoji_analysis)
+    
+    def _subjectivity_batch(self, contexts):
+        """TextBlob-compatible subjectivity of each review's emoji-free text"""
+        scorer = get_subjectivity_scorer()
+        # Reuse the spaCy parse when the quality stage already produced one
+        docs = [context.parsed_doc(context.text_without_emojis) for context in contexts]
+        if docs and all(doc is not None for doc in docs):
+            return scorer.score_docs(docs)
+        return scorer.score_texts([context.text_without_emojis for context in contexts])
+    
+    def _combine_sentiment_with_emojis(self, text_without_emojis, probs, emoji_analysis, subjectivity=None):
+        """Build the sentiment result from model probabilities and emoji analysis"""
+        if probs is not None:
             # Get sentiment scores
             sentiment_scores = {
-                'negative': float(probs[0][0]),
-                'positive': float(probs[0][1])
+                'negative': float(probs[0]),
+                'positive': float(probs[1])
             }
         else:
             # If only emojis, use neutral baseline
@@ -209,9 +560,8 @@ class AdvancedNLPPipeline:
         # Determine primary sentiment
         primary_sentiment = max(sentiment_scores, key=sentiment_scores.get)
         
-        # Calculate subjectivity using TextBlob
-        blob = TextBlob(text_without_emojis)
-        subjectivity = blob.sentiment.subjectivity
+        if subjectivity is None:
+            subjectivity = get_subjectivity_scorer().score_texts([text_without_emojis])[0]
         
         return {
             'primary_sentiment': primary_sentiment,
@@ -223,38 +573,54 @@ class AdvancedNLPPipeline:
     
     def analyze_aspects(self, text, product_info=None):
         """Advanced aspect-based sentiment analysis"""
-        # Define aspects based on product category
-        default_aspects = ['quality', 'price', 'delivery', 'service', 'packaging']
-        
+        return self._analyze_aspects_batch([text], [product_info])[0]
+    
+    def _aspects_for_product(self, product_info=None):
+        """Define aspects based on product category"""
         if product_info and 'category' in product_info:
-            category_aspects = {
-                'Electronics': ['battery', 'screen', 'performance', 'camera', 'build quality'],
-                'Fashion': ['fit', 'material', 'style', 'comfort', 'color'],
-                'Beauty': ['effectiveness', 'texture', 'scent', 'packaging', 'ingredients'],
-                'Home': ['durability', 'design', 'functionality', 'assembly', 'size']
-            }
-            aspects = category_aspects.get(product_info['category'], default_aspects)
-        else:
-            aspects = default_aspects
-        
-        # Zero-shot classification for aspect detection
-        aspect_results = {}
+            return CATEGORY_ASPECTS.get(product_info['category'], DEFAULT_ASPECTS)
         
+        return DEFAULT_ASPECTS
+    
+    def _aspect_pairs(self, text, aspects, context=None):
+        """Find (aspect, sentence) pairs where the aspect is mentioned in the sentence"""
         # Split text into sentences for better aspect detection
-        doc = self.nlp(text)
+        doc = context.doc(text) if context else self.nlp(text)
         sentences = [sent.text for sent in doc.sents]
         
+        # One compiled pass per sentence covers every aspect
+        return get_aspect_matcher(aspects).pairs(sentences)
+    
+    def _analyze_aspects_batch(self, texts, product_infos, batch_size=32, contexts=None):
+        """Aspect-based sentiment for many texts with a single batched ABSA call"""
+        if contexts is None:
+            contexts = [None] * len(texts)
+        review_aspects = [self._aspects_for_product(info) for info in product_infos]
+        review_pairs = [
+            self._aspect_pairs(text, aspects, context)
+            for text, aspects, context in zip(texts, review_aspects, contexts)
+        ]
+        
+        # Get sentiment for every (aspect, sentence) pair of every review at once
+        absa_inputs = [f"{aspect}: {sentence}" for pairs in review_pairs for aspect, sentence in pairs]
+        absa_outputs = self._run_batched_pipeline(self.absa_pipeline, absa_inputs, batch_size, 'aspects') if absa_inputs else []
+        
+        results = []
+        offset = 0
+        for aspects, pairs in zip(review_aspects, review_pairs):
+            labels = absa_outputs[offset:offset + len(pairs)]
+            offset += len(pairs)
+            results.append(self._aggregate_aspects(aspects, pairs, labels))
+        
+        return results
+    
+    def _aggregate_aspects(self, aspects, pairs, labels):
+        """Aggregate per-sentence ABSA labels into per-aspect results"""
+        aspect_results = {}
+        
         for aspect in aspects:
-            aspect_sentences = []
-            aspect_sentiments = []
-            
-            for sentence in sentences:
-                # Check if aspect is mentioned in sentence
-                if aspect.lower() in sentence.lower():
-                    aspect_sentences.append(sentence)
-                    # Get sentiment for this specific sentence
-                    sent_result = self.absa_pipeline(f"{aspect}: {sentence}")
-                    aspect_sentiments.append(sent_result[0])
+            aspect_sentences = [sentence for (pair_aspect, sentence) in pairs if pair_aspect == aspect]
+            aspect_sentiments = [label for (pair_aspect, _), label in zip(pairs, labels) if pair_aspect == aspect]
             
             if aspect_sentences:
                 # Aggregate sentiments for this aspect
@@ -279,8 +645,11 @@ class AdvancedNLPPipeline:
     
     def extract_entities(self, text):
         """Advanced entity extraction"""
-        # SpaCy NER
-        doc = self.nlp(text)
+        # SpaCy NER plus BERT NER for additional entities
+        return self._merge_entities(self.nlp(text), self.ner_pipeline(text))
+    
+    def _merge_entities(self, doc, bert_entities):
+        """Merge spaCy and BERT NER entities"""
         spacy_entities = {
             'brands': [],
             'products': [],
@@ -294,9 +663,6 @@ class AdvancedNLPPipeline:
             elif ent.label_ in ['GPE', 'LOC']:
                 spacy_entities['locations'].append(ent.text)
         
-        # BERT NER for additional entities
-        bert_entities = self.ner_pipeline(text)
-        
         # Combine and deduplicate
         all_entities = defaultdict(list)
         for entity in bert_entities:
@@ -336,9 +702,13 @@ class AdvancedNLPPipeline:
         # Remove emojis for text-based emotion detection
         text_without_emojis = self.emoji_processor.remove_emojis(text)
         
-        if text_without_emojis.strip():
-            emotions = self.emotion_pipeline(text_without_emojis)
-        else:
+        emotions = self._emotions_batch([text_without_emojis])[0]
+        
+        return self._combine_emotions_with_emojis(text, emotions, emoji_analysis)
+    
+    def _combine_emotions_with_emojis(self, text, emotions, emoji_analysis):
+        """Build the emotion result from model output and emoji analysis"""
+        if emotions is None:
             # Default neutral emotions if only emojis
             emotions = [{'label': 'neutral', 'score': 1.0}]
         
@@ -415,8 +785,29 @@ class AdvancedNLPPipeline:
         total_intensity = min(1.0, base_intensity + emoji_intensity)
         return float(total_intensity)
     
-    def extract_keywords(self, text):
+    def extract_keywords(self, text, product_info=None):
         """Extract keywords and key phrases"""
+        return self._keywords_batch([text], [product_info])[0]
+    
+    def count_keywords(self, review_texts, product_infos=None):
+        """Add reviews to the keyword corpus without scoring them (for workers that could only score)"""
+        if self.keyword_method == 'yake' or not review_texts:
+            return
+        product_infos = product_infos or [None] * len(review_texts)
+        get_keyword_extractor().update(
+            [self.emoji_processor.replace_emojis_with_text(text) for text in review_texts],
+            [info.get('category') if info else None for info in product_infos]
+        )
+    
+    def _keywords_batch(self, texts, product_infos, update=True):
+        """Keywords for many texts, scored against the category corpus (or by YAKE); update is a flag or one per text"""
+        if self.keyword_method == 'yake':
+            return [self._yake_keywords(text) for text in texts]
+        categories = [info.get('category') if info else None for info in product_infos]
+        return get_keyword_extractor().extract_batch(texts, categories, update=update)
+    
+    def _yake_keywords(self, text):
+        """Per-review YAKE keywords (lower score is better)"""
         keywords = self.kw_extractor.extract_keywords(text)
         
         # Format keywords with scores
@@ -470,7 +861,7 @@ class AdvancedNLPPipeline:
         authenticity_factors = {
             'has_pros_and_cons': self.check_balanced_review(text),
             'personal_experience': self.check_personal_experience(text),
-            'verified_language_patterns': self.check_language_patterns(text)
+            'verified_language_patterns': self.check_language_patterns(text, doc)
         }
         
         authenticity_score = sum(authenticity_factors.values()) / len(authenticity_factors)
@@ -483,10 +874,13 @@ class AdvancedNLPPipeline:
             'is_likely_fake': authenticity_score < 0.3
         }
     
-    def assess_review_quality_with_emojis(self, text, emoji_analysis):
+    def assess_review_quality_with_emojis(self, text, emoji_analysis, context=None):
         """Assess review quality considering emoji usage"""
         # Remove emojis for clean text analysis
-        text_clean = self.emoji_processor.remove_emojis(text)
+        if context:
+            text_clean = context.text_without_emojis
+        else:
+            text_clean = self.emoji_processor.remove_emojis(text)
         
         quality_factors = {}
         
@@ -501,7 +895,7 @@ class AdvancedNLPPipeline:
         quality_factors['emoji_to_word_ratio'] = emoji_analysis['emoji_count'] / max(word_count, 1)
         
         # Specificity check
-        doc = self.nlp(text_clean)
+        doc = context.doc(text_clean) if context else self.nlp(text_clean)
         
         # Count specific details (numbers, proper nouns, technical terms)
         specific_details = 0
@@ -532,7 +926,7 @@ class AdvancedNLPPipeline:
         authenticity_factors = {
             'has_pros_and_cons': self.check_balanced_review(text_clean),
             'personal_experience': self.check_personal_experience(text_clean),
-            'verified_language_patterns': self.check_language_patterns(text_clean),
+            'verified_language_patterns': self.check_language_patterns(text_clean, doc),
             'reasonable_emoji_usage': not quality_factors['excessive_emojis'] and quality_factors['emoji_to_word_ratio'] < 0.5
         }
         
@@ -568,9 +962,10 @@ class AdvancedNLPPipeline:
         
         return has_pronouns and has_experience
     
-    def check_language_patterns(self, text):
+    def check_language_patterns(self, text, doc=None):
         """Check for natural language patterns"""
-        doc = self.nlp(text)
+        if doc is None:
+            doc = self.nlp(text)
         
         # Check sentence variety
         sentence_lengths = [len(sent.text.split()) for sent in doc.sents]
@@ -584,97 +979,110 @@ class AdvancedNLPPipeline:
     
     def detect_competitor_mentions(self, text, product_category=None, product_subcategory=None):
         """Detect and analyze competitor mentions with category context"""
-        # Import competitor configuration
-        from config.competitors import get_competitors_for_product
-        
-        # Common competitor indicators
-        competitor_keywords = [
-            'compared to', 'versus', 'vs', 'better than', 'worse than',
-            'switched from', 'unlike', 'alternative to', 'instead of',
-            'prefer', 'chose over', 'replaced'
-        ]
-        
-        # Get category-specific competitors
-        known_competitors = get_competitors_for_product(product_category, product_subcategory)
-        
-        mentions = []
-        text_lower = text.lower()
-        
-        # Check for competitor keywords
-        for keyword in competitor_keywords:
-            if keyword in text_lower:
-                # Extract context around keyword
-                keyword_pos = text_lower.find(keyword)
-                start = max(0, keyword_pos - 100)
-                end = min(len(text), keyword_pos + len(keyword) + 100)
-                context = text[start:end]
-                
-                # Check for brand mentions in context
-                for competitor in known_competitors:
-                    if competitor.lower() in context.lower():
-                        # Analyze sentiment of comparison
-                        comparison_sentiment = self.analyze_sentiment(context)
-                        
-                        # Determine if favorable based on keyword and sentiment
-                        favorable = self._is_comparison_favorable(keyword, comparison_sentiment['primary_sentiment'])
-                        
-                        mentions.append({
-                            'competitor': competitor,
-                            'context': context.strip(),
-                            'comparison_type': keyword,
-                            'favorable_to_us': favorable
-                        })
-        
-        # Also check for direct mentions without comparison keywords
-        for competitor in known_competitors:
-            if competitor.lower() in text_lower and not any(m['competitor'] == competitor for m in mentions):
-                # Find all occurrences
-                import re
-                pattern = re.compile(r'\b' + re.escape(competitor) + r'\b', re.IGNORECASE)
+        product_info = {'category': product_category, 'subcategory': product_subcategory}
+        return self._detect_competitor_mentions_batch([text], [product_info])[0]
+    
+    def _detect_competitor_mentions_batch(self, texts, product_infos, batch_size=32):
+        """Competitor mentions for many texts, scoring every comparison context in one batched call"""
+        review_mentions = []
+        for text, product_info in zip(texts, product_infos):
+            product_info = product_info or {}
+            matcher = get_competitor_matcher(product_info.get('category'), product_info.get('subcategory'))
+            review_mentions.append(matcher.candidates(text))
+        
+        scored_texts = [m['scored_text'] for mentions in review_mentions for m in mentions]
+        probs = iter(self._sentiment_probs_batch(scored_texts, batch_size) if scored_texts else [])
+        
+        results = []
+        for mentions in review_mentions:
+            review_results = []
+            for mention in mentions:
+                sentiment = self._primary_sentiment(next(probs))
+                if mention['comparison_type'] == 'direct_mention':
+                    favorable = sentiment != 'positive'
+                else:
+                    # Determine if favorable based on keyword and sentiment
+                    favorable = is_comparison_favorable(mention['comparison_type'], sentiment)
                 
-                for match in pattern.finditer(text):
-                    pos = match.start()
-                    start = max(0, pos - 100)
-                    end = min(len(text), pos + len(competitor) + 100)
-                    context = text[start:end].strip()
-                    
-                    sentiment = self.analyze_sentiment(context)
-                    
-                    mentions.append({
-                        'competitor': competitor,
-                        'context': context,
-                        'comparison_type': 'direct_mention',
-                        'favorable_to_us': sentiment['primary_sentiment'] != 'positive'
-                    })
-                    break  # Only take first mention of each competitor
-        
-        return mentions[:5]  # Limit to 5 mentions to avoid overwhelming
-
-        def _is_comparison_favorable(self, keyword, sentiment):
-            """Determine if a comparison is favorable to us based on keyword and sentiment"""
-            negative_comparisons = ['better than', 'prefer', 'chose over', 'replaced']
-            positive_comparisons = ['worse than', 'switched from', 'unlike']
-            
-            if any(neg in keyword for neg in negative_comparisons):
-                # If they say competitor is "better than" us, it's unfavorable
-                return sentiment == 'negative'  # Unless the overall sentiment is negative
-            elif any(pos in keyword for pos in positive_comparisons):
-                # If they say competitor is "worse than" us, it's favorable
-                return True
-            else:
-                # For neutral keywords like "versus", "compared to"
-                return sentiment == 'positive'
+                review_results.append({
+                    'competitor': mention['competitor'],
+                    'context': mention['context'],
+                    'comparison_type': mention['comparison_type'],
+                    'favorable_to_us': favorable
+                })
+            results.append(review_results)
+        
+        return results
+    
+    def _primary_sentiment(self, probs):
+        """Primary sentiment label from [negative, positive] probabilities, as in analyze_sentiment"""
+        if probs is None:
+            return 'neutral'
+        sentiment_scores = {
+            'negative': float(probs[0]),
+            'positive': float(probs[1])
+        }
+        sentiment_scores['neutral'] = 1 - (sentiment_scores['positive'] + sentiment_scores['negative'])
+        return max(sentiment_scores, key=sentiment_scores.get)
+    
+    def encode_sentences(self, texts, batch_size=64):
+        """Unit-length sentence embeddings (float32, one row per text)"""
+        embeddings = self.sentence_model.encode(
+            list(texts),
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+    
+    def embed_reviews(self, review_ids, texts, batch_size=64, store=None):
+        """Stored embeddings for reviews, encoding only those the store does not have yet"""
+        if store is None:
+            store = get_embedding_store()
+        store.ensure_model(self.models.version('sentence'), self.sentence_model.get_sentence_embedding_dimension())
+        
+        text_by_id = dict(zip(review_ids, texts))
+        missing = list(dict.fromkeys(store.missing(review_ids)))
+        if missing:
+            store.append(missing, self.encode_sentences([text_by_id[i] or '' for i in missing], batch_size))
+        
+        return store.get(review_ids)[0]
+    
+    def assign_topics(self, review_ids, texts):
+        """
+        Review.topics for each review from the published topic model.
+        
+        The reviews are embedded (and stored, unless embeddings are
+        disabled) either way. A review's entry is None when no model is
+        published or it was fit with another sentence model.
+        """
+        model = get_topic_model_store().current()
+        usable = model is not None and model.embedding_model == self.models.version('sentence')
+        if embeddings_enabled():
+            embeddings = self.embed_reviews(review_ids, texts)
+        elif usable:
+            embeddings = self.encode_sentences(texts)
+        if not usable:
+            return [None] * len(texts)
+        return model.assign(texts, embeddings)
     
     def batch_process_topics(self, reviews):
         """Process topics for a batch of reviews"""
         if not reviews:
             return {}
         
-        # Extract texts
-        texts = [r['processed_text'] for r in reviews]
+        # Embeddings are of the raw review text (as stored at ingest), so the topics are fit on it too
+        texts = [r.get('review_text') or r['processed_text'] for r in reviews]
+        
+        # Stored embeddings when the reviews have ids, so nothing is encoded twice
+        if all(r.get('id') is not None for r in reviews):
+            embeddings = self.embed_reviews([r['id'] for r in reviews], texts)
+        else:
+            embeddings = self.encode_sentences(texts)
         
         # Fit topic model
-        topics, probs = self.topic_model.fit_transform(texts)
+        topics, probs = self.topic_model.fit_transform(texts, embeddings=embeddings)
         
         # Get topic info
         topic_info = self.topic_model.get_topic_info()
@@ -699,4 +1107,21 @@ class AdvancedNLPPipeline:
         return {
             'topic_info': topic_info.to_dict(),
             'num_topics': len(set(topics)) - 1  # Exclude outlier topic
-        }
\ No newline at end of file
+        }
+
+
+_shared_pipeline = None
+_shared_pipeline_lock = threading.Lock()
+
+
+def get_shared_pipeline():
+    """Return the process-wide AdvancedNLPPipeline (models load lazily on first use)"""
+    global _shared_pipeline
+    if _shared_pipeline is None:
+        with _shared_pipeline_lock:
+            if _shared_pipeline is None:
+                _shared_pipeline = AdvancedNLPPipeline(
+                    cache=get_result_cache(),
+                    micro_batching=micro_batching_config()
+                )
+    return _shared_pipeline
@@ -0,0 +1,57 @@
+# backend/nlp/aspect_matcher.py
+"""
+Single-pass aspect detection for aspect-based sentiment analysis.
+
+Matches a whole aspect list against a sentence with one compiled regex
+instead of one ``aspect in sentence`` scan per aspect. Semantics are the
+same case-insensitive substring test: overlapping aspects (e.g. "quality"
+inside "build quality") are both reported.
+"""
+import re
+from functools import lru_cache
+
+
+class AspectMatcher:
+    """Finds which of a fixed set of aspects occur in a piece of text"""
+
+    def __init__(self, aspects):
+        self.aspects = tuple(aspects)
+        terms = sorted({aspect.lower() for aspect in self.aspects}, key=len, reverse=True)
+
+        # Zero-width lookahead reports a match at every position, so overlapping
+        # terms are not consumed by an earlier match; longest term wins per position
+        self._pattern = re.compile('(?=(' + '|'.join(re.escape(term) for term in terms) + '))') if terms else None
+
+        # A matched term also contains every shorter term that is its substring
+        self._implied = {
+            term: {other for other in terms if other in term}
+            for term in terms
+        }
+
+    def find(self, text):
+        """Return the set of lowercased aspect terms mentioned in text"""
+        if self._pattern is None or not text:
+            return set()
+
+        found = set()
+        for match in self._pattern.finditer(text.lower()):
+            term = match.group(1)
+            if term not in found:
+                found |= self._implied[term]
+        return found
+
+    def pairs(self, sentences):
+        """(aspect, sentence) pairs in aspect order, then sentence order"""
+        sentence_terms = [self.find(sentence) for sentence in sentences]
+        return [
+            (aspect, sentence)
+            for aspect in self.aspects
+            for sentence, terms in zip(sentences, sentence_terms)
+            if aspect.lower() in terms
+        ]
+
+
+@lru_cache(maxsize=64)
+def get_aspect_matcher(aspects):
+    """Compiled matcher for an aspect tuple (one per product category)"""
+    return AspectMatcher(aspects)
@@ -1,10 +1,14 @@
 # backend/nlp/aspect_sentiment.py
-from transformers import pipeline
+from .resources import require_hf_model
+
+ABSA_MODEL = "yangheng/deberta-v3-base-absa-v1.1"
 
 class AspectSentimentAnalyzer:
     def __init__(self):
+        require_hf_model(ABSA_MODEL)
+        from transformers import pipeline
         self.classifier = pipeline("text-classification", 
-                                 model="yangheng/deberta-v3-base-absa-v1.1")
+                                 model=ABSA_MODEL)
     
     def analyze_aspects(self, review_text):
         # Extract aspects like: battery life, screen quality, price, durability
@@ -0,0 +1,153 @@
+# backend/nlp/batching.py
+"""
+Token-budget batching for the transformer stages.
+
+Reviews range from a few emoji to multi-paragraph essays, and a batch is
+padded to its longest member. Sorting inputs by token length and filling
+each batch up to a token budget (batch size x longest length) keeps padding
+low. The callers still get their outputs back in input order.
+"""
+import time
+import logging
+import threading
+import weakref
+from collections import deque, defaultdict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 8192
+DEFAULT_MAX_BATCH_SIZE = 64
+
+# Every batcher in this process, for the admin metrics
+_batchers = weakref.WeakSet()
+
+
+def token_lengths(tokenizer, texts, max_length=512):
+    """Token count of each text as the model will see it (truncated, with special tokens)"""
+    texts = list(texts)
+    if not texts:
+        return []
+    if tokenizer is None:
+        # No tokenizer to ask: whitespace tokens plus [CLS]/[SEP] is close enough to bucket on
+        return [min(len(text.split()) + 2, max_length) for text in texts]
+    encoded = tokenizer(texts, truncation=True, max_length=max_length)
+    return [len(ids) for ids in encoded['input_ids']]
+
+
+class TokenBudgetBatcher:
+    """Plans length-bucketed batches under a token budget and records padding efficiency"""
+
+    def __init__(self, max_tokens=DEFAULT_TOKEN_BUDGET, max_batch_size=DEFAULT_MAX_BATCH_SIZE, history=200):
+        self.max_tokens = max_tokens
+        self.max_batch_size = max_batch_size
+
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=history)
+        self._totals = defaultdict(lambda: {
+            'batches': 0, 'items': 0, 'real_tokens': 0, 'padded_tokens': 0, 'seconds': 0.0
+        })
+
+        _batchers.add(self)
+
+    def plan(self, lengths, max_batch_size=None):
+        """
+        Group item indices into batches.
+
+        Items are taken longest first, so each batch's padded width is the
+        length of its first item. Items are added while
+        (batch size + 1) x that width stays within the token budget. An item
+        longer than the budget gets a batch to itself.
+        """
+        max_batch_size = max_batch_size or self.max_batch_size
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+
+        batches = []
+        batch = []
+        width = 0
+        for i in order:
+            if batch and (len(batch) >= max_batch_size or (len(batch) + 1) * width > self.max_tokens):
+                batches.append(batch)
+                batch = []
+            if not batch:
+                width = max(lengths[i], 1)
+            batch.append(i)
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    def run(self, items, lengths, fn, stage='batch', max_batch_size=None):
+        """
+        Call ``fn(list_of_items)`` once per planned batch and return its outputs in input order.
+
+        ``fn`` must return one output per item it was given.
+        """
+        items = list(items)
+        outputs = [None] * len(items)
+
+        for batch in self.plan(lengths, max_batch_size):
+            start = time.perf_counter()
+            batch_outputs = fn([items[i] for i in batch])
+            seconds = time.perf_counter() - start
+
+            for i, output in zip(batch, batch_outputs):
+                outputs[i] = output
+
+            batch_lengths = [lengths[i] for i in batch]
+            self._record(stage, batch_lengths, seconds)
+
+        return outputs
+
+    def _record(self, stage, batch_lengths, seconds):
+        real_tokens = sum(batch_lengths)
+        padded_tokens = len(batch_lengths) * max(batch_lengths)
+        stats = {
+            'stage': stage,
+            'size': len(batch_lengths),
+            'max_length': max(batch_lengths),
+            'real_tokens': real_tokens,
+            'padded_tokens': padded_tokens,
+            'padding_efficiency': round(real_tokens / padded_tokens, 3) if padded_tokens else 1.0,
+            'seconds': round(seconds, 4),
+            'items_per_sec': round(len(batch_lengths) / seconds, 1) if seconds > 0 else None
+        }
+        logger.debug(
+            f"{stage} batch: {stats['size']} items x {stats['max_length']} tokens, "
+            f"efficiency {stats['padding_efficiency']:.2f}, {stats['items_per_sec']} items/s"
+        )
+
+        with self._lock:
+            self._recent.append(stats)
+            totals = self._totals[stage]
+            totals['batches'] += 1
+            totals['items'] += len(batch_lengths)
+            totals['real_tokens'] += real_tokens
+            totals['padded_tokens'] += padded_tokens
+            totals['seconds'] += seconds
+
+    def recent_batches(self):
+        """Per-batch stats of the most recent batches"""
+        with self._lock:
+            return list(self._recent)
+
+    def summary(self):
+        """Padding efficiency and throughput per stage since startup"""
+        with self._lock:
+            return {
+                stage: {
+                    'batches': t['batches'],
+                    'items': t['items'],
+                    'padding_efficiency': round(t['real_tokens'] / t['padded_tokens'], 3) if t['padded_tokens'] else 1.0,
+                    'items_per_sec': round(t['items'] / t['seconds'], 1) if t['seconds'] > 0 else None,
+                    'tokens_per_sec': round(t['real_tokens'] / t['seconds'], 1) if t['seconds'] > 0 else None
+                }
+                for stage, t in self._totals.items()
+            }
+
+
+def batcher_stats(recent=20):
+    """Per-stage summary and the last ``recent`` batches of every batcher in this process"""
+    return [
+        {'stages': batcher.summary(), 'recent_batches': batcher.recent_batches()[-recent:]}
+        for batcher in list(_batchers)
+    ]
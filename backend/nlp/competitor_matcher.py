@@ -0,0 +1,149 @@
+# backend/nlp/competitor_matcher.py
+"""
+Single-pass competitor mention detection.
+
+For each (category, subcategory) one compiled regex covers every comparison
+keyword and every competitor brand from ``config.competitors``, so a review
+is scanned once instead of once per keyword and once per brand. Candidate
+mentions follow the original rules; scoring their sentiment is left to the
+caller so contexts from a whole batch can go through the model together.
+"""
+import re
+from functools import lru_cache
+
+from config.competitors import get_competitors_for_product
+
+# Common competitor indicators
+COMPETITOR_KEYWORDS = (
+    'compared to', 'versus', 'vs', 'better than', 'worse than',
+    'switched from', 'unlike', 'alternative to', 'instead of',
+    'prefer', 'chose over', 'replaced'
+)
+
+# Characters of context kept on each side of a keyword or brand
+CONTEXT_WINDOW = 100
+
+MAX_MENTIONS = 5
+
+
+class CompetitorMatcher:
+    """Finds comparison keywords and competitor brands in one pass over a review"""
+
+    def __init__(self, competitors, keywords=COMPETITOR_KEYWORDS):
+        self.competitors = tuple(competitors)
+        self.keywords = tuple(keywords)
+
+        terms = sorted(
+            {term.lower() for term in self.keywords + self.competitors},
+            key=len, reverse=True
+        )
+        # Lookahead alternation matches at every position without consuming,
+        # so overlapping terms are all seen; the longest term wins per position
+        self._pattern = re.compile('(?=(' + '|'.join(re.escape(term) for term in terms) + '))')
+
+        # Shorter terms that start where a longer one does are its prefixes
+        self._prefixes = {
+            term: [other for other in terms if term.startswith(other)]
+            for term in terms
+        }
+
+        # Whole-word patterns for direct mentions, as before
+        self._word_patterns = {
+            competitor: re.compile(r'\b' + re.escape(competitor) + r'\b', re.IGNORECASE)
+            for competitor in self.competitors
+        }
+
+    def _term_positions(self, text_lower):
+        """Start offsets of every keyword/brand occurrence, keyed by lowercased term"""
+        positions = {}
+        for match in self._pattern.finditer(text_lower):
+            start = match.start()
+            for term in self._prefixes[match.group(1)]:
+                positions.setdefault(term, []).append(start)
+        return positions
+
+    def candidates(self, text):
+        """
+        Candidate mentions without sentiment, at most MAX_MENTIONS.
+
+        Each entry has competitor, context, comparison_type and, for keyword
+        comparisons, the unstripped context the sentiment should be scored on.
+        """
+        text_lower = text.lower()
+        positions = self._term_positions(text_lower)
+        if not positions:
+            return []
+
+        mentions = []
+
+        # Brands near the first occurrence of each comparison keyword
+        for keyword in self.keywords:
+            keyword_positions = positions.get(keyword)
+            if not keyword_positions:
+                continue
+
+            keyword_pos = keyword_positions[0]
+            start = max(0, keyword_pos - CONTEXT_WINDOW)
+            end = min(len(text), keyword_pos + len(keyword) + CONTEXT_WINDOW)
+            context = text[start:end]
+
+            for competitor in self.competitors:
+                term = competitor.lower()
+                if any(start <= pos and pos + len(term) <= end for pos in positions.get(term, ())):
+                    mentions.append({
+                        'competitor': competitor,
+                        'context': context.strip(),
+                        'comparison_type': keyword,
+                        'scored_text': context
+                    })
+                    if len(mentions) >= MAX_MENTIONS:
+                        return mentions
+
+        # Direct mentions without comparison keywords (first whole-word hit only)
+        mentioned = {m['competitor'] for m in mentions}
+        for competitor in self.competitors:
+            if competitor in mentioned or competitor.lower() not in positions:
+                continue
+
+            match = self._word_patterns[competitor].search(text)
+            if match is None:
+                continue
+
+            pos = match.start()
+            start = max(0, pos - CONTEXT_WINDOW)
+            end = min(len(text), pos + len(competitor) + CONTEXT_WINDOW)
+            context = text[start:end].strip()
+            mentions.append({
+                'competitor': competitor,
+                'context': context,
+                'comparison_type': 'direct_mention',
+                'scored_text': context
+            })
+            if len(mentions) >= MAX_MENTIONS:
+                break
+
+        return mentions
+
+
+@lru_cache(maxsize=128)
+def get_competitor_matcher(category=None, subcategory=None):
+    """Compiled matcher for a product category/subcategory"""
+    # Sorted so mention order does not depend on set iteration order
+    competitors = sorted(get_competitors_for_product(category, subcategory))
+    return CompetitorMatcher(competitors)
+
+
+def is_comparison_favorable(keyword, sentiment):
+    """Determine if a comparison is favorable to us based on keyword and sentiment"""
+    negative_comparisons = ['better than', 'prefer', 'chose over', 'replaced']
+    positive_comparisons = ['worse than', 'switched from', 'unlike']
+
+    if any(neg in keyword for neg in negative_comparisons):
+        # If they say competitor is "better than" us, it's unfavorable
+        return sentiment == 'negative'  # Unless the overall sentiment is negative
+    elif any(pos in keyword for pos in positive_comparisons):
+        # If they say competitor is "worse than" us, it's favorable
+        return True
+    else:
+        # For neutral keywords like "versus", "compared to"
+        return sentiment == 'positive'
@@ -0,0 +1,290 @@
+# backend/nlp/embedding_store.py
+"""
+On-disk store of review sentence embeddings.
+
+Each review is encoded once (at ingest or by scripts/backfill_embeddings.py).
+Topic modeling, similarity search and duplicate detection then read the
+stored vectors instead of re-encoding the corpus.
+
+Layout under EMBEDDINGS_DIR:
+
+    vectors.f16   float16 rows, memory-mapped for reads
+    ids.i64       int64 review id of each row (row-aligned with vectors)
+    meta.json     model version, dimension and committed row count
+
+Appends write the rows first and then bump the count in meta.json (atomic
+replace). Rows past the count are a torn write and are overwritten by the
+next append. Re-embedding a review appends a new row, and lookups return
+the newest one. When the embedding model version changes the store is
+emptied (into new files, since readers may still map the old ones), so
+only then is everything re-encoded.
+"""
+import os
+import json
+import logging
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within the process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_DIR = os.environ.get('NLP_EMBEDDINGS_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'embeddings'
+)
+
+VECTOR_DTYPE = np.float16
+ID_DTYPE = np.int64
+
+# Appended ids are looked up in a dict until this many, then merged into the sorted arrays
+_MERGE_THRESHOLD = 10000
+
+
+def embeddings_enabled():
+    """NLP_EMBEDDINGS_ENABLED=false skips embedding reviews at ingest"""
+    return os.environ.get('NLP_EMBEDDINGS_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+
+class EmbeddingStore:
+    """Append-only float16 embedding matrix keyed by review id"""
+
+    def __init__(self, directory=EMBEDDINGS_DIR):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, 'vectors.f16')
+        self.ids_path = os.path.join(directory, 'ids.i64')
+        self.meta_path = os.path.join(directory, 'meta.json')
+
+        self._lock = threading.RLock()
+        self._meta_mtime = None
+        self.meta = {'model_version': None, 'dim': None, 'count': 0}
+        self._vectors = None
+        self._ids = np.empty(0, dtype=ID_DTYPE)
+        self._sorted_ids = np.empty(0, dtype=ID_DTYPE)
+        self._sorted_rows = np.empty(0, dtype=np.int64)
+        self._recent = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self.refresh()
+
+    @property
+    def model_version(self):
+        return self.meta['model_version']
+
+    @property
+    def dim(self):
+        return self.meta['dim']
+
+    def __len__(self):
+        return self.meta['count']
+
+    def refresh(self):
+        """Pick up rows appended by other processes"""
+        try:
+            mtime = os.stat(self.meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if mtime == self._meta_mtime:
+                return
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            self._meta_mtime = mtime
+            self._load(meta)
+
+    def _load(self, meta):
+        self.meta = meta
+        count = meta['count']
+        if count and meta['dim']:
+            self._vectors = np.memmap(self.vectors_path, dtype=VECTOR_DTYPE, mode='r', shape=(count, meta['dim']))
+            self._ids = np.fromfile(self.ids_path, dtype=ID_DTYPE, count=count)
+        else:
+            self._vectors = None
+            self._ids = np.empty(0, dtype=ID_DTYPE)
+        self._index_rows(self._ids)
+
+    def _index_rows(self, ids):
+        """Sorted id -> newest row arrays for vectorized lookups"""
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        newest = np.append(sorted_ids[1:] != sorted_ids[:-1], True) if len(ids) else np.empty(0, dtype=bool)
+        self._sorted_ids = sorted_ids[newest]
+        self._sorted_rows = order[newest]
+        self._recent = {}
+
+    def rows(self, review_ids):
+        """Row of each review id (-1 if not stored)"""
+        self.refresh()
+        review_ids = np.asarray(review_ids, dtype=ID_DTYPE)
+        rows = np.full(len(review_ids), -1, dtype=np.int64)
+        with self._lock:
+            if len(self._sorted_ids) and len(review_ids):
+                position = np.searchsorted(self._sorted_ids, review_ids)
+                position = np.minimum(position, len(self._sorted_ids) - 1)
+                hit = self._sorted_ids[position] == review_ids
+                rows[hit] = self._sorted_rows[position[hit]]
+            if self._recent:
+                for i, review_id in enumerate(review_ids.tolist()):
+                    rows[i] = self._recent.get(review_id, rows[i])
+        return rows
+
+    def missing(self, review_ids):
+        """The review ids that have no stored embedding"""
+        rows = self.rows(review_ids)
+        return [review_id for review_id, row in zip(review_ids, rows) if row < 0]
+
+    def get(self, review_ids, dtype=np.float32):
+        """(matrix, found) for the review ids; rows of missing ids are zero"""
+        rows = self.rows(review_ids)
+        found = rows >= 0
+        matrix = np.zeros((len(rows), self.dim or 0), dtype=dtype)
+        if found.any():
+            with self._lock:
+                matrix[found] = self._vectors[rows[found]]
+        return matrix, found
+
+    def vectors(self):
+        """Every stored row (float16 memmap, may include superseded rows)"""
+        self.refresh()
+        with self._lock:
+            if self._vectors is None:
+                return np.empty((0, self.dim or 0), dtype=VECTOR_DTYPE)
+            return self._vectors
+
+    def review_ids(self):
+        """Review id of every stored row"""
+        self.refresh()
+        with self._lock:
+            return self._ids
+
+    def latest_rows(self):
+        """(review_ids, rows) with one newest row per review"""
+        self.refresh()
+        with self._lock:
+            ids = self._sorted_ids
+            rows = self._sorted_rows
+            if self._recent:
+                recent_ids = np.fromiter(self._recent, dtype=ID_DTYPE)
+                keep = ~np.isin(ids, recent_ids)
+                ids = np.concatenate([ids[keep], recent_ids])
+                rows = np.concatenate([rows[keep], np.fromiter(self._recent.values(), dtype=np.int64)])
+            return ids, rows
+
+    def ensure_model(self, model_version, dim):
+        """Empty the store if it was built with another model (returns True if it was reset)"""
+        self.refresh()
+        if self.model_version == model_version and self.dim == dim:
+            return False
+        with self._file_lock():
+            self.refresh()
+            if self.model_version == model_version and self.dim == dim:
+                return False
+            if len(self):
+                logger.warning(
+                    f"Embedding model changed ({self.model_version} -> {model_version}); "
+                    f"dropping {len(self)} stored embeddings"
+                )
+            # Commit the empty store first, so nothing maps the files while they are swapped
+            self._write_meta({'model_version': model_version, 'dim': dim, 'count': 0})
+            # Readers may still hold memmaps of the old files, and truncating a mapped
+            # file crashes them (SIGBUS); new files keep the old inodes intact
+            for path in (self.vectors_path, self.ids_path):
+                tmp_path = path + '.tmp'
+                open(tmp_path, 'wb').close()
+                os.replace(tmp_path, path)
+        return True
+
+    def append(self, review_ids, vectors):
+        """Append rows for review ids (vectors: n x dim, stored as float16)"""
+        review_ids = np.asarray(review_ids, dtype=ID_DTYPE)
+        vectors = np.asarray(vectors, dtype=VECTOR_DTYPE)
+        if not len(review_ids):
+            return
+        if vectors.shape != (len(review_ids), self.dim):
+            raise ValueError(f"Expected {len(review_ids)} x {self.dim} vectors, got {vectors.shape}")
+
+        with self._file_lock():
+            self.refresh()
+            count = len(self)
+            row_bytes = self.dim * np.dtype(VECTOR_DTYPE).itemsize
+            for path, data, offset in (
+                (self.vectors_path, vectors, count * row_bytes),
+                (self.ids_path, review_ids, count * np.dtype(ID_DTYPE).itemsize)
+            ):
+                with open(path, 'r+b') as f:
+                    f.truncate(offset)  # drop a torn write past the committed count
+                    f.seek(offset)
+                    f.write(np.ascontiguousarray(data).tobytes())
+            self._write_meta(dict(self.meta, count=count + len(review_ids)))
+
+    def copy(self, source_id, review_id):
+        """Store source_id's embedding for review_id too (a duplicate needs no encoding); False if it has none"""
+        vectors, found = self.get([source_id], dtype=VECTOR_DTYPE)
+        if found[0]:
+            self.append([review_id], vectors)
+        return bool(found[0])
+
+    def _write_meta(self, meta):
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+        with self._lock:
+            previous = self.meta['count'] if meta['model_version'] == self.model_version else 0
+            self._meta_mtime = os.stat(self.meta_path).st_mtime_ns
+            if previous and meta['count'] > previous and len(self._recent) + meta['count'] - previous < _MERGE_THRESHOLD:
+                # Small append: remap, and index only the new rows
+                self.meta = meta
+                self._vectors = np.memmap(self.vectors_path, dtype=VECTOR_DTYPE, mode='r', shape=(meta['count'], meta['dim']))
+                new_ids = np.fromfile(self.ids_path, dtype=ID_DTYPE, count=meta['count'] - previous,
+                                      offset=previous * np.dtype(ID_DTYPE).itemsize)
+                self._ids = np.concatenate([self._ids, new_ids])
+                for row, review_id in enumerate(new_ids.tolist(), start=previous):
+                    self._recent[review_id] = row
+            else:
+                self._load(meta)
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialize writers across threads and processes"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, '.lock'), 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def stats(self):
+        self.refresh()
+        ids, _ = self.latest_rows()
+        return {
+            'model_version': self.model_version,
+            'dim': self.dim,
+            'rows': len(self),
+            'reviews': len(ids),
+            'size_mb': round(len(self) * (self.dim or 0) * np.dtype(VECTOR_DTYPE).itemsize / 1024 / 1024, 1)
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_embedding_store():
+    """Process-wide store in EMBEDDINGS_DIR"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EmbeddingStore()
+    return _store
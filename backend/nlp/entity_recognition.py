@@ -1,11 +1,12 @@
 # backend/nlp/entity_recognition.py
 
-import spacy
 from collections import defaultdict
+from .spacy_provider import get_spacy
 
 class EntityRecognizer:
     def __init__(self):
-        self.nlp = spacy.load('en_core_web_sm')
+        # ents plus pos_/head for adjective-noun features
+        self.nlp = get_spacy(('tagger', 'attribute_ruler', 'parser', 'ner'))
         
         # Custom patterns for e-commerce entities
         self.product_patterns = [
@@ -22,8 +23,20 @@ class EntityRecognizer:
     
     def extract_entities(self, text):
         """Extract named entities from text"""
-        doc = self.nlp(text)
-        
+        return self._entities_from_doc(self.nlp(text), text)
+    
+    def extract_entities_batch(self, texts, docs=None, batch_size=256):
+        """
+        Entities for many texts, parsed with one ``nlp.pipe`` call.
+
+        ``docs`` may hold already parsed Docs for ``texts`` (NER, tagger and
+        parser run), e.g. shared with the other stages.
+        """
+        if docs is None:
+            docs = self.nlp.pipe(texts, batch_size=batch_size)
+        return [self._entities_from_doc(doc, text) for text, doc in zip(texts, docs)]
+    
+    def _entities_from_doc(self, doc, text):
         entities = {
             'products': [],
             'brands': [],
@@ -0,0 +1,164 @@
+# backend/nlp/inference_backends.py
+"""
+Selectable inference backends for the transformer stages.
+
+- ``torch``: PyTorch eager, as downloaded from the Hugging Face hub
+- ``torch-int8``: PyTorch with Linear layers dynamically quantized to int8 (CPU)
+- ``onnx``: ONNX Runtime via optimum (CPU), needs ``optimum[onnxruntime]``
+
+The backend is chosen with NLP_INFERENCE_BACKEND. Quantized weights and
+exported models are cached under backend/data/models, in a directory per
+checkpoint revision and torch/transformers version, so an upgrade of
+either builds a new artifact instead of loading a stale one.
+"""
+import os
+import logging
+
+from .resources import require_hf_model
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_BACKENDS = ('torch', 'torch-int8', 'onnx')
+DEFAULT_BACKEND = 'torch'
+
+BACKEND_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'models'
+)
+
+
+def get_inference_backend():
+    """Backend name from NLP_INFERENCE_BACKEND (defaults to torch)"""
+    backend = os.environ.get('NLP_INFERENCE_BACKEND', DEFAULT_BACKEND).strip().lower()
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(
+            f"Unknown NLP_INFERENCE_BACKEND '{backend}'. Available: {', '.join(INFERENCE_BACKENDS)}"
+        )
+    return backend
+
+
+def inference_device(backend=DEFAULT_BACKEND):
+    """torch device inputs must be moved to for a backend"""
+    import torch
+    if backend == 'torch' and torch.cuda.is_available():
+        return torch.device('cuda')
+    # Quantized and ONNX Runtime models run on CPU
+    return torch.device('cpu')
+
+
+def pipeline_device(backend=DEFAULT_BACKEND):
+    """``device`` argument for transformers.pipeline"""
+    return 0 if inference_device(backend).type == 'cuda' else -1
+
+
+def backend_version(model_id, backend):
+    """Registry version string; non-default backends are tagged so cached results differ"""
+    return model_id if backend == DEFAULT_BACKEND else f"{model_id}@{backend}"
+
+
+def _checkpoint_revision(model_id):
+    """Commit hash of the cached hub snapshot of a model ('local' for a directory)"""
+    if os.path.isdir(model_id):
+        return 'local'
+    from huggingface_hub import try_to_load_from_cache
+    config_path = try_to_load_from_cache(model_id, 'config.json')
+    if isinstance(config_path, str):
+        # <cache>/models--org--name/snapshots/<commit hash>/config.json
+        return os.path.basename(os.path.dirname(config_path))[:12]
+    return 'unknown'
+
+
+def _artifact_dir(model_id, backend):
+    import torch
+    import transformers
+    name = (
+        f"{model_id.replace('/', '--')}@{_checkpoint_revision(model_id)}"
+        f"-torch{torch.__version__}-transformers{transformers.__version__}"
+    )
+    return os.path.join(BACKEND_CACHE_DIR, backend, name)
+
+
+def _load_int8(model_class, model_id):
+    """
+    Dynamically quantized model.
+
+    The module is always rebuilt from the checkpoint with quantize_dynamic;
+    only its int8 state_dict is cached, and loaded into the rebuilt module.
+    If the cached weights no longer fit, they are replaced.
+    """
+    import torch
+
+    require_hf_model(model_id)
+    model = model_class.from_pretrained(model_id)
+    model.eval()
+    quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    path = os.path.join(_artifact_dir(model_id, 'torch-int8'), 'state_dict.pt')
+    if os.path.exists(path):
+        try:
+            quantized.load_state_dict(torch.load(path, weights_only=True))
+            return quantized
+        except Exception as e:
+            logger.warning(f"Cached int8 weights for {model_id} at {path} could not be loaded ({e}); rebuilding")
+            # The failed load may have replaced some of the weights
+            quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    torch.save(quantized.state_dict(), tmp_path)
+    os.replace(tmp_path, path)
+    logger.info(f"Cached int8 weights for {model_id} at {path}")
+    return quantized
+
+
+def _load_onnx(task, model_id):
+    """ONNX Runtime model, exported from the hub checkpoint on first use"""
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification, ORTModelForTokenClassification
+    except ImportError as e:
+        raise ImportError(
+            "The onnx inference backend needs optimum with ONNX Runtime: pip install 'optimum[onnxruntime]'"
+        ) from e
+
+    model_class = ORTModelForTokenClassification if task == 'ner' else ORTModelForSequenceClassification
+    require_hf_model(model_id)
+    path = _artifact_dir(model_id, 'onnx')
+    if os.path.exists(os.path.join(path, 'model.onnx')):
+        try:
+            return model_class.from_pretrained(path)
+        except Exception as e:
+            logger.warning(f"Cached ONNX model for {model_id} at {path} could not be loaded ({e}); exporting again")
+
+    model = model_class.from_pretrained(model_id, export=True)
+    model.save_pretrained(path)
+    logger.info(f"Exported ONNX model for {model_id} to {path}")
+    return model
+
+
+def load_model(task, model_id, backend=DEFAULT_BACKEND):
+    """Sequence (or, for ``ner``, token) classification model for a backend"""
+    if backend == 'onnx':
+        return _load_onnx(task, model_id)
+
+    from transformers import AutoModelForSequenceClassification, AutoModelForTokenClassification
+    model_class = AutoModelForTokenClassification if task == 'ner' else AutoModelForSequenceClassification
+
+    if backend == 'torch-int8':
+        return _load_int8(model_class, model_id)
+
+    require_hf_model(model_id)
+    return model_class.from_pretrained(model_id).to(inference_device(backend))
+
+
+def load_pipeline(task, model_id, backend=DEFAULT_BACKEND):
+    """transformers pipeline around a backend model"""
+    from transformers import pipeline, AutoTokenizer
+
+    if backend == DEFAULT_BACKEND:
+        require_hf_model(model_id)
+        return pipeline(task, model=model_id, device=pipeline_device(backend))
+
+    model = load_model(task, model_id, backend)
+    require_hf_model(model_id)
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    return pipeline(task, model=model, tokenizer=tokenizer, device=pipeline_device(backend))
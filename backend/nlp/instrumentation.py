@@ -0,0 +1,99 @@
+# backend/nlp/instrumentation.py
+"""
+Per-stage timing and resource usage for AdvancedNLPPipeline runs.
+
+A ProcessingTrace is passed into process_review(s) and filled in as the
+stages run. It records wall time (perf_counter) and CPU time (process_time)
+for each stage. It also samples RSS at every stage boundary, so the peak
+RSS delta covers model loads and large intermediate buffers. The result
+maps directly onto ProcessingLog columns.
+"""
+import time
+from contextlib import contextmanager
+
+from .model_registry import current_rss_bytes, MB
+
+
+class ProcessingTrace:
+    """Wall/CPU time per stage plus peak RSS delta for one pipeline call"""
+
+    def __init__(self):
+        self.stages = {}
+        self.model_versions = {}
+        self.profile = None
+        self.num_reviews = 0
+        self.cache_hits = 0
+
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._rss_start = current_rss_bytes()
+        self._rss_peak = self._rss_start
+        self.wall_seconds = None
+        self.cpu_seconds = None
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage; repeated entries for the same stage accumulate"""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0})
+            entry['wall_seconds'] += time.perf_counter() - wall_start
+            entry['cpu_seconds'] += time.process_time() - cpu_start
+            entry['calls'] += 1
+            self._rss_peak = max(self._rss_peak, current_rss_bytes())
+
+    def finish(self):
+        """Stop the overall clocks (idempotent) and return self"""
+        if self.wall_seconds is None:
+            self.wall_seconds = time.perf_counter() - self._wall_start
+            self.cpu_seconds = time.process_time() - self._cpu_start
+            self._rss_peak = max(self._rss_peak, current_rss_bytes())
+        return self
+
+    @property
+    def peak_rss_delta_mb(self):
+        return max(self._rss_peak - self._rss_start, 0) / MB
+
+    def summary(self):
+        """JSON-serializable breakdown, stored as ProcessingLog.processing_steps"""
+        self.finish()
+        return {
+            'profile': self.profile,
+            'num_reviews': self.num_reviews,
+            'cache_hits': self.cache_hits,
+            'wall_seconds': round(self.wall_seconds, 4),
+            'cpu_seconds': round(self.cpu_seconds, 4),
+            'peak_rss_delta_mb': round(self.peak_rss_delta_mb, 1),
+            'stages': {
+                name: {
+                    'wall_seconds': round(entry['wall_seconds'], 4),
+                    'cpu_seconds': round(entry['cpu_seconds'], 4),
+                    'calls': entry['calls']
+                }
+                for name, entry in self.stages.items()
+            },
+            'model_versions': self.model_versions
+        }
+
+    def log_fields(self, per_review=True):
+        """
+        Keyword arguments for a ProcessingLog row.
+
+        Batched stages serve every review in the call, so with ``per_review``
+        the processing time is the amortized share of one review.
+        """
+        self.finish()
+        share = max(self.num_reviews, 1) if per_review else 1
+        return {
+            'stage': 'complete',
+            'processing_time': self.wall_seconds / share,
+            'model_used': f"AdvancedNLPPipeline:{self.profile}"[:100],
+            'model_version': str(self.model_versions.get('pipeline', ''))[:20],
+            'processing_steps': self.summary(),
+            # CPU utilisation of the call in percent (can exceed 100 with intra-op threads)
+            'cpu_usage': round(self.cpu_seconds / self.wall_seconds * 100, 1) if self.wall_seconds else 0.0,
+            'memory_usage': round(self.peak_rss_delta_mb, 1)
+        }
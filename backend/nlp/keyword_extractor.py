@@ -0,0 +1,430 @@
+# backend/nlp/keyword_extractor.py
+"""
+Corpus-aware keyword extraction for batches of reviews.
+
+YAKE scores each review against its own statistics only. On 15-word
+reviews that mostly surfaces filler. CorpusKeywordExtractor instead keeps
+document frequencies of 1-3 word phrases per product category (plus a
+global table). The tables grow incrementally as reviews are processed.
+A batch is scored in one numpy pass with TF-IDF against the review's
+category.
+
+Phrases seen in fewer than ``min_df`` documents are dropped once the
+corpus is warm, which removes typos and one-off word salad. Categories
+with few documents fall back to the global table. Scores are
+higher-is-better (YAKE's are lower-is-better); consumers only count
+keyword strings.
+
+Every process keeps the tables in memory and shares them through
+``KEYWORD_STATS_PATH``. A background thread flushes every
+``NLP_KEYWORD_STATS_FLUSH_SECONDS`` (default 60): under a file lock it
+reads the snapshot, adds only the documents this process counted since
+its last flush, writes the result back and adopts it, so processes pick
+up each other's counts instead of overwriting them. The request and
+ingest threads never write the file.
+
+scripts/build_keyword_stats.py rebuilds the tables from stored reviews
+and writes them as a new snapshot generation. Running processes reload
+it on their next flush and drop counts still pending against the old
+generation, which the rebuild already includes.
+"""
+import os
+import re
+import gzip
+import json
+import time
+import uuid
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from collections import Counter
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: flushes are only serialized within the process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_STATS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'cache', 'keyword_stats.json.gz'
+)
+
+GLOBAL = '*'
+
+DEFAULT_FLUSH_SECONDS = 60
+
+# Words, plus the punctuation that ends a phrase
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'_-]*|[.,;:!?()\[\]\"\n/]")
+_NUMBER_RE = re.compile(r"^[0-9][0-9'_-]*$")
+
+# Emoji placeholders from EmojiProcessor.replace_emojis_with_text
+_EMOJI_TOKENS = re.compile(r"^(?:\w+_)?emoji$")
+
+
+_stop_words = None
+
+
+def stop_words():
+    """spaCy's English stop words, imported on first use (importing spacy takes seconds)"""
+    global _stop_words
+    if _stop_words is None:
+        from spacy.lang.en.stop_words import STOP_WORDS
+        _stop_words = STOP_WORDS
+    return _stop_words
+
+
+def keyword_flush_seconds():
+    """Seconds between merges into KEYWORD_STATS_PATH, from NLP_KEYWORD_STATS_FLUSH_SECONDS (0 disables)"""
+    return float(os.environ.get('NLP_KEYWORD_STATS_FLUSH_SECONDS', DEFAULT_FLUSH_SECONDS))
+
+
+def keyword_method():
+    """'corpus' (default) or 'yake', from NLP_KEYWORD_EXTRACTOR"""
+    method = os.environ.get('NLP_KEYWORD_EXTRACTOR', 'corpus').lower()
+    return method if method in ('corpus', 'yake') else 'corpus'
+
+
+def candidate_phrases(text, max_ngram=3):
+    """Every 1..max_ngram word phrase (repeats included) not starting or ending with a stop word"""
+    stop = stop_words()
+    phrases = []
+    segment = []
+    for token in _TOKEN_RE.findall((text or '').lower()) + ['.']:
+        if token[0].isalnum() and not _EMOJI_TOKENS.match(token):
+            segment.append(token)
+            continue
+        for start in range(len(segment)):
+            first = segment[start]
+            if first in stop or _NUMBER_RE.match(first):
+                continue
+            for end in range(start + 1, min(start + max_ngram, len(segment)) + 1):
+                last = segment[end - 1]
+                if last in stop or _NUMBER_RE.match(last) or (end - start == 1 and len(first) < 3):
+                    continue
+                phrases.append(' '.join(segment[start:end]))
+        segment = []
+    return phrases
+
+
+class _Table:
+    """Document count plus per-phrase document frequency"""
+
+    def __init__(self, docs=0, df=None):
+        self.docs = docs
+        self.df = Counter(df or {})
+
+    def add(self, other):
+        self.docs += other.docs
+        self.df.update(other.df)
+
+
+class CorpusKeywordExtractor:
+    """Batch TF-IDF keyword extraction against incrementally updated category statistics"""
+
+    def __init__(self, max_ngram=3, top=10, min_df=2, min_category_docs=50,
+                 max_terms=500000, path=KEYWORD_STATS_PATH, flush_seconds=None):
+        self.max_ngram = max_ngram
+        self.top = top
+        self.min_df = min_df
+        self.min_category_docs = min_category_docs
+        self.max_terms = max_terms
+        self.path = path
+        self.flush_seconds = keyword_flush_seconds() if flush_seconds is None else flush_seconds
+
+        self._tables = {GLOBAL: _Table()}
+        # Documents counted since the last flush, per table
+        self._pending = {}
+        # Snapshot the tables were read from: its generation and file mtime
+        self._generation = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+        if path and os.path.exists(path):
+            self.load(path)
+        self._ensure_flusher()
+
+    def update(self, texts, categories=None):
+        """Add documents to the frequency tables"""
+        self._update([set(candidate_phrases(text, self.max_ngram)) for text in texts],
+                     categories or [None] * len(texts))
+
+    def extract_batch(self, texts, categories=None, update=True):
+        """
+        Top keywords for each text as [{'keyword', 'score', 'word_count'}].
+
+        With ``update`` the texts are first added to the corpus, as they
+        are when reviews arrive. It is one flag for every text or a list
+        with one flag per text.
+        """
+        categories = list(categories) if categories is not None else [None] * len(texts)
+        phrases_per_text = [candidate_phrases(text, self.max_ngram) for text in texts]
+        counted = [update] * len(texts) if isinstance(update, bool) else list(update)
+        if any(counted):
+            self._update(
+                [set(phrases) for phrases, count in zip(phrases_per_text, counted) if count],
+                [category for category, count in zip(categories, counted) if count]
+            )
+
+        # One id per distinct phrase in the batch, then (text, phrase) counts
+        vocabulary = {}
+        text_ids = []
+        phrase_ids = []
+        for i, phrases in enumerate(phrases_per_text):
+            text_ids.extend([i] * len(phrases))
+            phrase_ids.extend(vocabulary.setdefault(phrase, len(vocabulary)) for phrase in phrases)
+        if not phrase_ids:
+            return [[] for _ in texts]
+
+        terms = list(vocabulary)
+        pairs = np.array(text_ids, dtype=np.int64) * len(terms) + np.array(phrase_ids, dtype=np.int64)
+        pairs, tf = np.unique(pairs, return_counts=True)
+        text_of = pairs // len(terms)
+        term_of = pairs % len(terms)
+
+        df, docs = self._frequencies(terms, term_of, [categories[i] for i in text_of])
+        word_counts = np.array([term.count(' ') + 1 for term in terms], dtype=np.int64)[term_of]
+
+        idf = np.log((docs + 1.0) / (df + 1.0)) + 1.0
+        scores = (1.0 + np.log(tf)) * idf * np.sqrt(word_counts)
+        # Rare phrases are mostly typos once the corpus has some history
+        keep = (df >= self.min_df) | (docs < self.min_category_docs)
+        scores = np.where(keep, scores, -np.inf)
+
+        order = np.lexsort((-scores, text_of))
+        results = [[] for _ in texts]
+        for position in order:
+            score = scores[position]
+            if not np.isfinite(score):
+                continue
+            keywords = results[text_of[position]]
+            if len(keywords) >= self.top:
+                continue
+            term = terms[term_of[position]]
+            if self._covered(term, keywords):
+                continue
+            keywords.append({'keyword': term, 'score': round(float(score), 4), 'word_count': int(word_counts[position])})
+        return results
+
+    @staticmethod
+    def _covered(term, keywords):
+        """A phrase adds nothing if a better-scored keyword already contains all its words"""
+        words = set(term.split())
+        return any(words <= set(keyword['keyword'].split()) for keyword in keywords)
+
+    def _frequencies(self, terms, term_of, pair_categories):
+        """Document frequency and corpus size per (text, phrase) pair, category first"""
+        df = np.empty(len(term_of), dtype=np.float64)
+        docs = np.empty(len(term_of), dtype=np.float64)
+        with self._lock:
+            global_table = self._tables[GLOBAL]
+            for category in set(pair_categories):
+                table = self._tables.get(category)
+                if table is None or table.docs < self.min_category_docs:
+                    table = global_table
+                mask = np.array([c == category for c in pair_categories], dtype=bool)
+                counts = table.df
+                df[mask] = [counts.get(terms[t], 0) for t in term_of[mask]]
+                docs[mask] = table.docs
+        return df, docs
+
+    def _update(self, phrase_sets, categories):
+        delta = {GLOBAL: _Table()}
+        for phrases, category in zip(phrase_sets, categories):
+            for name in (GLOBAL, category) if category else (GLOBAL,):
+                table = delta.setdefault(name, _Table())
+                table.docs += 1
+                table.df.update(phrases)
+        with self._lock:
+            for name, table in delta.items():
+                self._tables.setdefault(name, _Table()).add(table)
+                self._pending.setdefault(name, _Table()).add(table)
+            for table in self._tables.values():
+                if len(table.df) > self.max_terms:
+                    self._prune(table)
+        self._ensure_flusher()
+
+    def _ensure_flusher(self):
+        # Threads do not survive fork: a child that counts documents starts its own
+        if not self.path or not self.flush_seconds or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name='keyword-stats-flush', daemon=True).start()
+        atexit.register(self._flush_quietly)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self._flush_quietly()
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not flush keyword statistics: {e}")
+
+    def _prune(self, table):
+        """Drop the rarest phrases until the table is back under 3/4 of max_terms"""
+        threshold = 1
+        while len(table.df) > self.max_terms * 3 // 4:
+            for phrase in [p for p, count in table.df.items() if count <= threshold]:
+                del table.df[phrase]
+            threshold += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {'docs': table.docs, 'phrases': len(table.df)}
+                for name, table in self._tables.items()
+            }
+
+    def flush(self):
+        """Merge the documents counted since the last flush into the shared snapshot and adopt it"""
+        if not self.path:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            # Without a snapshot yet, this process's tables become the first one
+            own_tables = None if os.path.exists(self.path) else self._copy_tables()
+        if not pending and self._file_mtime(self.path) == self._mtime:
+            return
+
+        with self._file_lock(self.path):
+            payload = self._read(self.path)
+            if payload is None:
+                if own_tables is None:
+                    with self._lock:
+                        own_tables = self._copy_tables()
+                tables = own_tables
+                generation = uuid.uuid4().hex
+                pending = {}
+            else:
+                tables = self._tables_from(payload)
+                generation = payload.get('generation')
+                # A process that started before any snapshot existed merges into the first one
+                if self._generation is not None and generation != self._generation and pending:
+                    logger.info(
+                        f"Keyword statistics were rebuilt; dropping {pending[GLOBAL].docs} "
+                        f"documents counted against the previous snapshot"
+                    )
+                    pending = {}
+            for name, table in pending.items():
+                tables.setdefault(name, _Table()).add(table)
+            for table in tables.values():
+                if len(table.df) > self.max_terms:
+                    self._prune(table)
+            if payload is None or pending:
+                self._write(self.path, tables, generation)
+            mtime = self._file_mtime(self.path)
+
+        with self._lock:
+            # Documents counted while the file was merged stay pending, on top of the snapshot
+            for name, table in self._pending.items():
+                tables.setdefault(name, _Table()).add(table)
+            self._tables = tables
+            self._generation = generation
+            self._mtime = mtime
+
+    def save(self, path=None):
+        """Write the tables as a new snapshot generation, replacing whatever other processes merged"""
+        path = path or self.path
+        with self._lock:
+            tables = self._copy_tables()
+            self._pending = {}
+        generation = uuid.uuid4().hex
+        with self._file_lock(path):
+            self._write(path, tables, generation)
+        if path == self.path:
+            self._generation = generation
+            self._mtime = self._file_mtime(path)
+
+    def load(self, path=None):
+        path = path or self.path
+        payload = self._read(path)
+        if payload is None:
+            return
+        with self._lock:
+            self._tables = self._tables_from(payload)
+            self._pending = {}
+            self._generation = payload.get('generation')
+            self._mtime = self._file_mtime(path)
+        logger.info(f"Loaded keyword statistics for {self._tables[GLOBAL].docs} documents")
+
+    def _read(self, path):
+        """Snapshot payload, or None when it is missing, unreadable or built for other n-grams"""
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load keyword statistics from {path}: {e}")
+            return None
+        if payload.get('max_ngram') != self.max_ngram:
+            logger.warning(f"Ignoring keyword statistics built for {payload.get('max_ngram')}-grams")
+            return None
+        return payload
+
+    def _copy_tables(self):
+        return {name: _Table(t.docs, t.df) for name, t in self._tables.items()}
+
+    @staticmethod
+    def _tables_from(payload):
+        tables = {name: _Table(t['docs'], t['df']) for name, t in payload['tables'].items()}
+        tables.setdefault(GLOBAL, _Table())
+        return tables
+
+    def _write(self, path, tables, generation):
+        payload = {
+            'max_ngram': self.max_ngram,
+            'generation': generation,
+            'tables': {name: {'docs': t.docs, 'df': dict(t.df)} for name, t in tables.items()}
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _file_mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @contextmanager
+    def _file_lock(self, path):
+        """Serialize snapshot writers across processes"""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_keyword_extractor():
+    """Process-wide extractor (loads the saved tables on first use)"""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = CorpusKeywordExtractor()
+    return _extractor
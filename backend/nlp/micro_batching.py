@@ -0,0 +1,150 @@
+# backend/nlp/micro_batching.py
+"""
+Cross-request micro-batching for the transformer models.
+
+Flask serves requests on many threads, and each submit used to call the
+shared models at batch size 1, with every call contending for torch's
+intra-op threads. A MicroBatchExecutor owns one model. Request threads
+enqueue their texts and get futures back. A single dispatcher thread
+coalesces whatever arrives within ``max_wait_ms`` (or up to ``max_batch``
+items) into one batched call.
+"""
+import os
+import time
+import queue
+import logging
+import threading
+import weakref
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WAIT_MS = 5
+DEFAULT_MAX_BATCH = 32
+
+# Every executor in this process, for the admin metrics
+_executors = weakref.WeakSet()
+
+
+def micro_batching_config():
+    """Executor settings from NLP_MICROBATCH_* (None when disabled)"""
+    if os.environ.get('NLP_MICROBATCH_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        return None
+    return {
+        'max_wait_ms': float(os.environ.get('NLP_MICROBATCH_MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS)),
+        'max_batch': int(os.environ.get('NLP_MICROBATCH_MAX_BATCH', DEFAULT_MAX_BATCH))
+    }
+
+
+class MicroBatchExecutor:
+    """Coalesces concurrent single-item requests into batched calls of ``batch_fn``"""
+
+    def __init__(self, name, batch_fn, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self.total_wait_seconds = 0.0
+        self.total_batch_seconds = 0.0
+        self.last_batch_size = 0
+
+        _executors.add(self)
+
+    def _ensure_started(self):
+        # Threads do not survive fork: a child process starts its own dispatcher
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._dispatch_loop, name=f"microbatch-{self.name}", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def submit(self, item):
+        """Queue one item; the Future resolves to batch_fn's output for it"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        return future
+
+    def map(self, items):
+        """Outputs for items in order, batched together with other callers' items"""
+        futures = [self.submit(item) for item in items]
+        return [future.result() for future in futures]
+
+    def _collect(self):
+        """First item blocks; then take arrivals until max_batch or max_wait after the first"""
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                # Drain what is already queued even once the wait is over
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch_loop(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _, _ in batch]
+            futures = [future for _, future, _ in batch]
+
+            start = time.perf_counter()
+            try:
+                outputs = self.batch_fn(items)
+                if len(outputs) != len(items):
+                    raise RuntimeError(f"{self.name}: batch_fn returned {len(outputs)} outputs for {len(items)} items")
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Micro-batch {self.name} failed: {e}")
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            finally:
+                seconds = time.perf_counter() - start
+                self.batches += 1
+                self.items += len(items)
+                self.last_batch_size = len(items)
+                self.total_batch_seconds += seconds
+                self.total_wait_seconds += sum(start - enqueued for _, _, enqueued in batch)
+
+            for future, output in zip(futures, outputs):
+                future.set_result(output)
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'queue_depth': self._queue.qsize() if self._queue is not None and self._pid == os.getpid() else 0,
+            'max_queue_depth': self.max_queue_depth,
+            'batches': self.batches,
+            'items': self.items,
+            'errors': self.errors,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0,
+            'last_batch_size': self.last_batch_size,
+            'avg_wait_ms': round(self.total_wait_seconds / self.items * 1000, 2) if self.items else 0,
+            'avg_batch_ms': round(self.total_batch_seconds / self.batches * 1000, 2) if self.batches else 0,
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait * 1000
+        }
+
+
+def executor_stats():
+    """Stats of every micro-batch executor in this process"""
+    return {executor.name: executor.stats() for executor in list(_executors)}
@@ -0,0 +1,211 @@
+# backend/nlp/model_registry.py
+"""
+Process-wide registry of NLP models.
+
+Every blueprint shares one registry, so each model is loaded at most once per
+worker process, and only when a stage first needs it.
+"""
+import os
+import threading
+import time
+import logging
+
+from .inference_backends import (
+    DEFAULT_BACKEND, get_inference_backend, backend_version, load_model, load_pipeline
+)
+from .resources import require_hf_model
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Hugging Face / spaCy identifiers for every model the pipeline can use
+MODEL_IDS = {
+    'sentiment': 'distilbert-base-uncased-finetuned-sst-2-english',
+    'absa': 'yangheng/deberta-v3-base-absa-v1.1',
+    'ner': 'dslim/bert-base-NER',
+    'emotion': 'j-hartmann/emotion-english-distilroberta-base',
+    'zero_shot': 'facebook/bart-large-mnli',
+    'sentence': 'all-MiniLM-L6-v2',
+    'spacy': 'en_core_web_sm',
+}
+
+
+def current_rss_bytes():
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Non-Linux fallback: peak RSS is the best we can do
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _parameter_bytes(model):
+    """Bytes held by torch parameters and buffers of a model or HF pipeline"""
+    module = getattr(model, 'model', model)
+    if not hasattr(module, 'parameters'):
+        return None
+    total = 0
+    for tensor in list(module.parameters()) + list(module.buffers()):
+        total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def _load_sentiment_tokenizer():
+    require_hf_model(MODEL_IDS['sentiment'])
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(MODEL_IDS['sentiment'])
+
+
+def _sentiment_model_loader(backend):
+    def load():
+        return load_model('sentiment', MODEL_IDS['sentiment'], backend)
+    return load
+
+
+def _hf_pipeline_loader(task, name, backend=DEFAULT_BACKEND):
+    def load():
+        return load_pipeline(task, MODEL_IDS[name], backend)
+    return load
+
+
+def _load_sentence_model():
+    require_hf_model(MODEL_IDS['sentence'])
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_IDS['sentence'])
+
+
+def _load_spacy():
+    # Same instance the legacy NLPPipeline components get from the provider
+    from .spacy_provider import get_spacy
+    return get_spacy(name=MODEL_IDS['spacy'])
+
+
+class ModelRegistry:
+    """Lazily loads named models once and hands out the shared instances"""
+
+    def __init__(self, backend=DEFAULT_BACKEND):
+        # Inference backend of the transformer stages (see nlp.inference_backends)
+        self.backend = backend
+        self._loaders = {}
+        self._versions = {}
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def register(self, name, loader, version=None):
+        """Register a zero-argument loader for a model name"""
+        with self._lock:
+            self._loaders[name] = loader
+            self._versions[name] = version
+
+    def get(self, name):
+        """Return the shared model, loading it on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # Per-model lock: concurrent first requests wait for a single load
+        with load_lock:
+            if name in self._models:
+                return self._models[name]
+
+            logger.info(f"Loading model '{name}'...")
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            model = self._loaders[name]()
+            load_seconds = time.perf_counter() - start
+            rss_delta = current_rss_bytes() - rss_before
+            parameter_bytes = _parameter_bytes(model)
+
+            self._stats[name] = {
+                'load_seconds': round(load_seconds, 2),
+                'rss_delta_mb': round(max(rss_delta, 0) / MB, 1),
+                'parameter_mb': round(parameter_bytes / MB, 1) if parameter_bytes is not None else None,
+                'loaded_at': time.time()
+            }
+            self._models[name] = model
+            logger.info(f"Model '{name}' loaded in {load_seconds:.1f}s (+{rss_delta / MB:.0f} MB RSS)")
+
+            return model
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def unload(self, name):
+        """Drop a resident model so its memory can be reclaimed"""
+        with self._lock:
+            self._models.pop(name, None)
+            self._stats.pop(name, None)
+
+    def version(self, name):
+        return self._versions.get(name)
+
+    def resident_models(self):
+        """Describe every registered model and the memory of those resident"""
+        report = []
+        for name in sorted(self._loaders):
+            entry = {
+                'name': name,
+                'version': self._versions.get(name),
+                'loaded': name in self._models
+            }
+            entry.update(self._stats.get(name, {}))
+            report.append(entry)
+        return report
+
+    def memory_summary(self):
+        """Totals across resident models plus current process RSS"""
+        resident = [self._stats[name] for name in list(self._models) if name in self._stats]
+        return {
+            'resident_models': len(resident),
+            'registered_models': len(self._loaders),
+            'inference_backend': self.backend,
+            'parameter_mb': round(sum(s['parameter_mb'] or 0 for s in resident), 1),
+            'rss_delta_mb': round(sum(s['rss_delta_mb'] for s in resident), 1),
+            'process_rss_mb': round(current_rss_bytes() / MB, 1)
+        }
+
+
+def build_default_registry(backend=None):
+    """
+    Create a registry with loaders for every pipeline model (nothing is loaded yet).
+
+    ``backend`` (default: NLP_INFERENCE_BACKEND) applies to the sentiment,
+    ABSA, NER and emotion models; zero-shot and sentence embeddings stay on torch.
+    """
+    backend = backend or get_inference_backend()
+    registry = ModelRegistry(backend)
+    registry.register('sentiment_tokenizer', _load_sentiment_tokenizer, MODEL_IDS['sentiment'])
+    registry.register('sentiment', _sentiment_model_loader(backend), backend_version(MODEL_IDS['sentiment'], backend))
+    registry.register('absa', _hf_pipeline_loader('text-classification', 'absa', backend), backend_version(MODEL_IDS['absa'], backend))
+    registry.register('ner', _hf_pipeline_loader('ner', 'ner', backend), backend_version(MODEL_IDS['ner'], backend))
+    registry.register('emotion', _hf_pipeline_loader('text-classification', 'emotion', backend), backend_version(MODEL_IDS['emotion'], backend))
+    registry.register('zero_shot', _hf_pipeline_loader('zero-shot-classification', 'zero_shot'), MODEL_IDS['zero_shot'])
+    registry.register('sentence', _load_sentence_model, MODEL_IDS['sentence'])
+    registry.register('spacy', _load_spacy, MODEL_IDS['spacy'])
+    return registry
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """Return the process-wide model registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = build_default_registry()
+    return _registry
@@ -0,0 +1,359 @@
+# backend/nlp/near_duplicates.py
+"""
+Near-duplicate and spam-ring detection with MinHash LSH.
+
+Each review is reduced to word 3-gram shingles of its normalized text
+(lowercased words and emoji, the tokens processed_text keeps). The check
+runs before the NLP stages, which are what produce processed_text. The
+shingles are MinHashed into a NUM_PERM signature, and the signature is
+split into BANDS bands. Reviews sharing any band are candidates, and the
+fraction of equal signature values estimates their Jaccard similarity.
+
+Band keys of indexed reviews are kept in sorted numpy arrays, plus a dict
+for rows added since the last merge. A lookup is BANDS binary searches and
+a small signature comparison, so it stays well under a millisecond with
+millions of indexed reviews (scripts/benchmark_near_duplicates.py).
+
+Matches join the earlier review's cluster. A cluster is tracked by its
+size and the distinct users and products it spans. Text repeated across
+RING_MIN_USERS or more users or products is flagged as a spam ring. The
+spam probability grows with the similarity and the cluster's spread.
+
+Like the keyword statistics, the index is per process. It is snapshotted
+to DUPLICATE_INDEX_PATH every ``save_every`` reviews and loaded at start;
+scripts/build_duplicate_index.py rebuilds it from stored reviews.
+"""
+import os
+import re
+import zlib
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'cache', 'near_duplicates.npz'
+)
+
+NUM_PERM = 64
+BANDS = 8
+SHINGLE_SIZE = 3
+
+# Shorter reviews ("Great product!") repeat naturally and are not checked
+MIN_TOKENS = 6
+
+# Estimated Jaccard similarity at which reviews count as near-duplicates
+DUPLICATE_THRESHOLD = float(os.environ.get('NLP_DUPLICATE_THRESHOLD', 0.8))
+# ... and at which a processed duplicate's NLP results are reused
+REUSE_THRESHOLD = float(os.environ.get('NLP_DUPLICATE_REUSE_THRESHOLD', 0.9))
+RING_MIN_USERS = 3
+
+# Newest rows per band considered as candidates (a big cluster shares one band key)
+_MAX_CANDIDATES_PER_BAND = 64
+_MERGE_THRESHOLD = 20000
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+# Words and emoji; other punctuation is dropped
+_TOKEN_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)?|[^\w\s.,!?;:'\"()\[\]/&*#@%+=<>~`^|\\-]")
+
+
+def duplicate_detection_enabled():
+    """NLP_DUPLICATE_DETECTION=false turns off duplicate checks at ingest"""
+    return os.environ.get('NLP_DUPLICATE_DETECTION', 'true').lower() not in ('0', 'false', 'no')
+
+
+class NearDuplicateIndex:
+    """Incremental MinHash LSH index of reviews with cluster tracking"""
+
+    def __init__(self, threshold=DUPLICATE_THRESHOLD, num_perm=NUM_PERM, bands=BANDS,
+                 path=DUPLICATE_INDEX_PATH, save_every=1000, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.path = path
+        self.save_every = save_every
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._shingle_mix = rng.randint(1, 1 << 62, size=SHINGLE_SIZE, dtype=np.uint64) | np.uint64(1)
+        self._band_mix = rng.randint(1, 1 << 62, size=num_perm // bands, dtype=np.uint64) | np.uint64(1)
+
+        self._lock = threading.Lock()
+        self._owner_pid = os.getpid()
+        self._unsaved = 0
+        self._reset()
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def _reset(self, capacity=1024):
+        self._count = 0
+        self._signatures = np.zeros((capacity, self.num_perm), dtype=np.uint32)
+        self._review_ids = np.zeros(capacity, dtype=np.int64)
+        self._users = np.zeros(capacity, dtype=np.int64)
+        self._products = np.zeros(capacity, dtype=np.int64)
+        self._clusters = np.zeros(capacity, dtype=np.int64)
+        self._user_codes = {}
+        self._product_codes = {}
+        self._cluster_stats = {}
+        self._band_keys = [np.empty(0, dtype=np.uint64) for _ in range(self.bands)]
+        self._band_rows = [np.empty(0, dtype=np.int64) for _ in range(self.bands)]
+        self._pending = [{} for _ in range(self.bands)]
+        self._pending_rows = 0
+
+    def __len__(self):
+        return self._count
+
+    # Signatures
+
+    def signature(self, text):
+        """MinHash signature (uint32[num_perm]) of a review's word shingles, None if it is too short"""
+        tokens = _TOKEN_RE.findall((text or '').lower())
+        if len(tokens) < MIN_TOKENS:
+            return None
+        token_hashes = np.fromiter((zlib.crc32(token.encode()) for token in tokens), dtype=np.uint64, count=len(tokens))
+        shingles = sum(
+            token_hashes[i:len(tokens) - SHINGLE_SIZE + 1 + i] * self._shingle_mix[i]
+            for i in range(SHINGLE_SIZE)
+        ) >> np.uint64(32)
+        hashed = (np.outer(self._a, shingles) + self._b[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def _band_hashes(self, signatures):
+        rows = signatures.reshape(len(signatures), self.bands, -1).astype(np.uint64)
+        return (rows * self._band_mix).sum(axis=2)
+
+    # Lookup and insertion
+
+    def query(self, signature):
+        """Best earlier match as {'row', 'review_id', 'similarity'}, or None below the threshold"""
+        keys = self._band_hashes(signature[None, :])[0]
+        with self._lock:
+            candidates = []
+            for band, key in enumerate(keys):
+                band_keys = self._band_keys[band]
+                start = np.searchsorted(band_keys, key, side='left')
+                end = np.searchsorted(band_keys, key, side='right')
+                if end > start:
+                    candidates.append(self._band_rows[band][max(start, end - _MAX_CANDIDATES_PER_BAND):end])
+                pending = self._pending[band].get(int(key))
+                if pending:
+                    candidates.append(np.array(pending[-_MAX_CANDIDATES_PER_BAND:], dtype=np.int64))
+            if not candidates:
+                return None
+            rows = np.unique(np.concatenate(candidates))
+            similarities = (self._signatures[rows] == signature).mean(axis=1)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            row = int(rows[best])
+            return {'row': row, 'review_id': int(self._review_ids[row]), 'similarity': float(similarities[best])}
+
+    def check(self, text):
+        """(signature, best earlier match or None) for a review about to be ingested"""
+        signature = self.signature(text)
+        return signature, self.query(signature) if signature is not None else None
+
+    def add(self, review_id, signature, user_id=None, product_id=None, match=None):
+        """Index a review (``match`` from check) and return its duplicate analysis"""
+        if signature is None:
+            return self._analysis(int(review_id), None, None)
+        with self._lock:
+            if self._count == len(self._review_ids):
+                self._grow()
+            row = self._count
+            self._signatures[row] = signature
+            self._review_ids[row] = review_id
+            self._users[row] = self._code(self._user_codes, user_id)
+            self._products[row] = self._code(self._product_codes, product_id)
+            cluster = int(self._clusters[match['row']]) if match else int(review_id)
+            self._clusters[row] = cluster
+            self._count += 1
+
+            for band, key in enumerate(self._band_hashes(signature[None, :])[0].tolist()):
+                self._pending[band].setdefault(key, []).append(row)
+            self._pending_rows += 1
+            if self._pending_rows >= _MERGE_THRESHOLD:
+                self._merge_pending()
+
+            stats = None
+            if match:
+                stats = self._cluster_stats.get(cluster)
+                if stats is None:
+                    first = match['row']
+                    stats = self._cluster_stats[cluster] = [1, {int(self._users[first])}, {int(self._products[first])}]
+                stats[0] += 1
+                stats[1].add(int(self._users[row]))
+                stats[2].add(int(self._products[row]))
+            analysis = self._analysis(cluster, match, stats)
+
+            self._unsaved += 1
+            save = self.path and self.save_every and self._unsaved >= self.save_every
+
+        if save and os.getpid() == self._owner_pid:
+            try:
+                self.save()
+            except OSError as e:
+                logger.warning(f"Could not save near-duplicate index: {e}")
+        return analysis
+
+    def observe(self, review_id, text, user_id=None, product_id=None):
+        """check + add for a review that already has an id"""
+        signature, match = self.check(text)
+        return self.add(review_id, signature, user_id, product_id, match)
+
+    def _analysis(self, cluster, match, stats):
+        if not match:
+            return {
+                'duplicate_of': None, 'similarity': 0.0, 'cluster_id': cluster, 'cluster_size': 1,
+                'cluster_users': 1, 'cluster_products': 1, 'spam_ring': False, 'spam_probability': 0.0
+            }
+        size, users, products = stats[0], len(stats[1]), len(stats[2])
+        spread = 1.0 - 1.0 / max(users, products)
+        return {
+            'duplicate_of': match['review_id'],
+            'similarity': round(match['similarity'], 4),
+            'cluster_id': cluster,
+            'cluster_size': size,
+            'cluster_users': users,
+            'cluster_products': products,
+            'spam_ring': max(users, products) >= RING_MIN_USERS,
+            # A repost by the same user is weak evidence; the same text from many accounts is strong
+            'spam_probability': round(match['similarity'] * (0.4 + 0.6 * spread), 4)
+        }
+
+    @staticmethod
+    def _code(codes, value):
+        """Dense int code of a user or product id (-1 for None)"""
+        if value is None:
+            return -1
+        return codes.setdefault(str(value), len(codes))
+
+    def _grow(self):
+        capacity = 2 * len(self._review_ids)
+        for name in ('_review_ids', '_users', '_products', '_clusters'):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+        signatures = np.zeros((capacity, self.num_perm), dtype=np.uint32)
+        signatures[:len(self._signatures)] = self._signatures
+        self._signatures = signatures
+
+    def _merge_pending(self):
+        """Fold the pending band dicts into the sorted arrays (an insert, not a re-sort)"""
+        for band in range(self.bands):
+            pending = self._pending[band]
+            keys = np.fromiter((key for key, rows in pending.items() for _ in rows), dtype=np.uint64)
+            rows = np.fromiter((row for rows in pending.values() for row in rows), dtype=np.int64)
+            order = np.lexsort((rows, keys))
+            keys, rows = keys[order], rows[order]
+            # side='right' keeps rows ascending within a key: newest last
+            positions = np.searchsorted(self._band_keys[band], keys, side='right')
+            self._band_keys[band] = np.insert(self._band_keys[band], positions, keys)
+            self._band_rows[band] = np.insert(self._band_rows[band], positions, rows)
+            self._pending[band] = {}
+        self._pending_rows = 0
+
+    def _rebuild_bands(self):
+        keys = self._band_hashes(self._signatures[:self._count])
+        rows = np.arange(self._count, dtype=np.int64)
+        for band in range(self.bands):
+            order = np.lexsort((rows, keys[:, band]))
+            self._band_keys[band] = keys[order, band]
+            self._band_rows[band] = rows[order]
+        self._pending = [{} for _ in range(self.bands)]
+        self._pending_rows = 0
+
+    def _rebuild_cluster_stats(self):
+        n = self._count
+        clusters, inverse, sizes = np.unique(self._clusters[:n], return_inverse=True, return_counts=True)
+        self._cluster_stats = {}
+        for row in np.flatnonzero(sizes[inverse] > 1).tolist():
+            stats = self._cluster_stats.setdefault(int(self._clusters[row]), [0, set(), set()])
+            stats[0] += 1
+            stats[1].add(int(self._users[row]))
+            stats[2].add(int(self._products[row]))
+
+    # Persistence
+
+    def stats(self):
+        with self._lock:
+            clusters = self._cluster_stats.values()
+            return {
+                'reviews': self._count,
+                'duplicate_clusters': len(self._cluster_stats),
+                'duplicates': sum(stats[0] - 1 for stats in clusters),
+                'spam_rings': sum(1 for stats in clusters if max(len(stats[1]), len(stats[2])) >= RING_MIN_USERS),
+                'threshold': self.threshold
+            }
+
+    def save(self, path=None):
+        """Atomically write the signatures and cluster assignments"""
+        path = path or self.path
+        with self._lock:
+            n = self._count
+            payload = {
+                'num_perm': np.array(self.num_perm),
+                'signatures': self._signatures[:n].copy(),
+                'review_ids': self._review_ids[:n].copy(),
+                'users': self._users[:n].copy(),
+                'products': self._products[:n].copy(),
+                'clusters': self._clusters[:n].copy(),
+                'user_ids': np.array(list(self._user_codes), dtype=str),
+                'product_ids': np.array(list(self._product_codes), dtype=str)
+            }
+            self._unsaved = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **payload)
+        os.replace(tmp_path, path)
+
+    def load(self, path=None):
+        path = path or self.path
+        try:
+            with np.load(path) as data:
+                if int(data['num_perm']) != self.num_perm:
+                    logger.warning(f"Ignoring near-duplicate index built with {int(data['num_perm'])} permutations")
+                    return
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load near-duplicate index from {path}: {e}")
+            return
+        with self._lock:
+            n = len(arrays['review_ids'])
+            self._reset(capacity=max(1024, 2 * n))
+            self._count = n
+            self._signatures[:n] = arrays['signatures']
+            self._review_ids[:n] = arrays['review_ids']
+            self._users[:n] = arrays['users']
+            self._products[:n] = arrays['products']
+            self._clusters[:n] = arrays['clusters']
+            self._user_codes = {user_id: code for code, user_id in enumerate(arrays['user_ids'].tolist())}
+            self._product_codes = {product_id: code for code, product_id in enumerate(arrays['product_ids'].tolist())}
+            self._rebuild_bands()
+            self._rebuild_cluster_stats()
+        logger.info(f"Loaded near-duplicate index with {n} reviews")
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_duplicate_index():
+    """Process-wide index (loads the saved snapshot on first use)"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = NearDuplicateIndex()
+    return _index
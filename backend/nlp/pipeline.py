@@ -2,12 +2,19 @@
 
 from datetime import datetime
 import pandas as pd
+import numpy as np
 import json
 from .preprocessing import TextPreprocessor
 from .sentiment_analysis import SentimentAnalyzer
 from .topic_extraction import TopicExtractor
 from .entity_recognition import EntityRecognizer
 from .trend_analysis import TrendAnalyzer
+from .instrumentation import ProcessingTrace
+
+SENTIMENT_LABELS = ['negative', 'neutral', 'positive']
+
+# Texts per forward pass in the batched sentiment stage
+SENTIMENT_BATCH_SIZE = 32
 
 class NLPPipeline:
     def __init__(self):
@@ -90,6 +97,7 @@ class NLPPipeline:
             # Stage 5: Calculate processing time
             end_time = datetime.now()
             processing_time = (end_time - start_time).total_seconds()
+            processing_record['processing_time'] = processing_time
             
             # Compile final result
             result = {
@@ -118,42 +126,167 @@ class NLPPipeline:
             raise e
     
     def process_batch(self, reviews_df, batch_size=100):
-        """Process multiple reviews in batches"""
-        results = []
-        total_reviews = len(reviews_df)
+        """Process multiple reviews in batches; the chunks of iter_batches in one DataFrame"""
+        chunks = list(self.iter_batches(reviews_df, batch_size=batch_size))
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
+    
+    def iter_batches(self, reviews, batch_size=1000):
+        """
+        Process reviews chunk by chunk, yielding one DataFrame per chunk.
+
+        ``reviews`` is a DataFrame or an iterable of DataFrames (e.g.
+        ``pd.read_csv(path, chunksize=...)``), with ``review_text`` and
+        optionally ``review_id`` columns. Each stage runs once per chunk over
+        its distinct cleaned texts, and results go straight into typed
+        columns, so memory is bounded by the chunk size however many rows
+        are streamed through.
+
+        Columns: review_id, original_text, cleaned_text, processed_text,
+        token_count (int32), sentiment (categorical), sentiment_confidence
+        (float32), sentiment_stars (int8), explanation, entities and aspects
+        (JSON text, as stored on Review), aspect_<category> counts (int16)
+        and processing_time (float32, the chunk time shared per review).
+
+        If a chunk fails, its reviews are retried one at a time and the
+        failing ones are skipped, as the per-review path did.
+        """
+        if isinstance(reviews, pd.DataFrame):
+            total = len(reviews)
+            frames = (reviews.iloc[i:i + batch_size] for i in range(0, total, batch_size))
+            num_batches = (total + batch_size - 1) // batch_size
+        else:
+            frames = (
+                frame.iloc[i:i + batch_size]
+                for frame in reviews
+                for i in range(0, len(frame), batch_size)
+            )
+            num_batches = None
         
-        for i in range(0, total_reviews, batch_size):
-            batch = reviews_df.iloc[i:i+batch_size]
-            batch_results = []
-            
-            print(f"Processing batch {i//batch_size + 1} of {total_reviews//batch_size + 1}")
-            
-            for _, review in batch.iterrows():
-                try:
-                    result = self.process_single_review(review.to_dict(), verbose=False)
-                    batch_results.append(result)
-                except Exception as e:
-                    print(f"Error processing review {review.get('review_id', 'Unknown')}: {str(e)}")
-                    continue
-            
-            results.extend(batch_results)
+        for batch_number, batch in enumerate(frames, 1):
+            if num_batches is not None:
+                print(f"Processing batch {batch_number} of {num_batches}")
+            try:
+                result = self._process_chunk(batch, batch_number)
+            except Exception as e:
+                print(f"Error processing batch {batch_number}, retrying its reviews one by one: {str(e)}")
+                rows = []
+                for j in range(len(batch)):
+                    try:
+                        rows.append(self._process_chunk(batch.iloc[j:j + 1], batch_number))
+                    except Exception as row_error:
+                        review_id = batch['review_id'].iloc[j] if 'review_id' in batch else 'Unknown'
+                        print(f"Error processing review {review_id}: {str(row_error)}")
+                        self.processing_history.append({
+                            'review_id': review_id,
+                            'timestamp': datetime.now().isoformat(),
+                            'error': str(row_error)
+                        })
+                result = pd.concat(rows, ignore_index=True) if rows else None
+            if result is not None:
+                yield result
+    
+    def _process_chunk(self, batch, batch_number):
+        """Run every stage once over a chunk and return its typed columns"""
+        trace = ProcessingTrace()
+        trace.num_reviews = len(batch)
+        texts = batch['review_text'].tolist()
+        
+        with trace.stage('preprocessing'):
+            preprocessed = self.preprocessor.preprocess_batch(texts, extract_features=False)
+        
+        # Every later stage is a function of the cleaned text, so each distinct text is analysed once
+        cleaned = preprocessed['cleaned']
+        unique = list(dict.fromkeys(cleaned))
+        index = {text: i for i, text in enumerate(unique)}
+        rows = np.fromiter((index[text] for text in cleaned), dtype=np.int64, count=len(cleaned))
+        
+        # One parse with NER, tagger and parser serves explanations, entities and aspects
+        # (aspects parse the lowercased text, which is usually the cleaned text already)
+        with trace.stage('parsing'):
+            aspect_texts = [text.lower() for text in unique if text]
+            parse_texts = list(dict.fromkeys(unique + aspect_texts))
+            docs = dict(zip(parse_texts, self.entity_recognizer.nlp.pipe(parse_texts)))
         
-        return pd.DataFrame(results)
+        with trace.stage('sentiment_analysis'):
+            sentiments = self.sentiment_analyzer.predict_batch(unique, batch_size=SENTIMENT_BATCH_SIZE)
+            explanations = self.sentiment_analyzer.get_sentiment_explanations_batch(
+                unique, docs=[docs[text] for text in unique]
+            )
+        
+        with trace.stage('entity_recognition'):
+            entities = self.entity_recognizer.extract_entities_batch(
+                unique, docs=[docs[text] for text in unique]
+            )
+        
+        with trace.stage('aspect_extraction'):
+            aspects = self.topic_extractor.extract_aspects_batch(
+                unique, docs=[docs[text] for text in aspect_texts]
+            )
+        del docs
+        
+        with trace.stage('columns'):
+            columns = self._result_columns(batch, preprocessed, rows, sentiments, explanations, entities, aspects)
+        
+        summary = trace.summary()
+        columns['processing_time'] = np.full(len(batch), summary['wall_seconds'] / max(len(batch), 1), dtype=np.float32)
+        self.processing_history.append({
+            'batch': batch_number,
+            'reviews': len(batch),
+            'distinct_texts': len(unique),
+            'timestamp': datetime.now().isoformat(),
+            'processing_time': summary['wall_seconds'],
+            'stages': summary['stages']
+        })
+        return pd.DataFrame(columns)
+    
+    def _result_columns(self, batch, preprocessed, rows, sentiments, explanations, entities, aspects):
+        """Columns for a chunk from per-distinct-text results; ``rows`` maps each review to its text"""
+        def take(values, dtype=object):
+            column = np.empty(len(values), dtype=dtype)
+            column[:] = values
+            return column[rows]
+        
+        review_ids = batch['review_id'].tolist() if 'review_id' in batch else ['NEW'] * len(batch)
+        
+        columns = {
+            'review_id': review_ids,
+            'original_text': batch['review_text'].tolist(),
+            'cleaned_text': preprocessed['cleaned'],
+            'processed_text': preprocessed['processed'],
+            'token_count': np.fromiter((len(tokens) for tokens in preprocessed['tokens']), dtype=np.int32, count=len(rows)),
+            'sentiment': pd.Categorical.from_codes(
+                take([SENTIMENT_LABELS.index(result['sentiment']) for result in sentiments], np.int8),
+                categories=SENTIMENT_LABELS
+            ),
+            'sentiment_confidence': take([result['confidence'] for result in sentiments], np.float32),
+            'sentiment_stars': take([result['raw_score'] for result in sentiments], np.int8),
+            'explanation': take([json.dumps(explanation) for explanation in explanations]),
+            'entities': take([json.dumps(entity) for entity in entities]),
+            'aspects': take([json.dumps(aspect) for aspect in aspects]),
+        }
+        
+        for category in list(self.topic_extractor.aspect_categories) + ['other']:
+            columns[f'aspect_{category}'] = take([len(aspect.get(category, ())) for aspect in aspects], np.int16)
+        
+        return columns
     
     def get_processing_stats(self):
         """Get statistics about processing history"""
         if not self.processing_history:
             return {}
         
+        # Batch records cover several reviews; single-review records count once
+        timed = [h for h in self.processing_history if 'processing_time' in h]
         stats = {
-            'total_processed': len(self.processing_history),
-            'successful': len([h for h in self.processing_history if 'error' not in h]),
-            'failed': len([h for h in self.processing_history if 'error' in h]),
-            'average_processing_time': np.mean([
-                h.get('processing_time', 0) 
-                for h in self.processing_history 
-                if 'processing_time' in h
-            ])
+            'total_processed': sum(h.get('reviews', 1) for h in self.processing_history),
+            'successful': sum(h.get('reviews', 1) for h in self.processing_history if 'error' not in h),
+            'failed': sum(h.get('reviews', 1) for h in self.processing_history if 'error' in h),
+            'average_processing_time': (
+                sum(h['processing_time'] for h in timed) / sum(h.get('reviews', 1) for h in timed)
+                if timed else 0.0
+            )
         }
         
-        return stats
\ No newline at end of file
+        return stats
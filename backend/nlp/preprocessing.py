@@ -2,35 +2,28 @@
 
 import re
 import string
-import contractions
-import emoji
-import nltk
-import spacy
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
 import logging
+from .resources import require_nltk
+from .spacy_provider import get_spacy
+from .text_normalization import URL_PATTERN, EMAIL_PATTERN, get_text_normalizer
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+# spaCy components preprocessing reads (lemma_, is_stop, is_punct)
+SPACY_COMPONENTS = ('tagger', 'attribute_ruler', 'lemmatizer')
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+POSITIVE_WORDS = {'excellent', 'amazing', 'love', 'perfect', 'great', 'good', 'nice', 'wonderful'}
+NEGATIVE_WORDS = {'terrible', 'awful', 'hate', 'disappointed', 'poor', 'bad', 'worst', 'horrible'}
 
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet')
+# NLTK data is fetched at build time (scripts/fetch_nlp_resources.py), never on import
+NLTK_DATA = ('punkt', 'stopwords')
 
 class TextPreprocessor:
     def __init__(self):
-        # Initialize spaCy model
-        self.nlp = spacy.load('en_core_web_sm')
+        require_nltk(*NLTK_DATA)
+        from nltk.corpus import stopwords
+        from nltk.stem import WordNetLemmatizer
+
+        # Shared spaCy model, parser and NER disabled
+        self.nlp = get_spacy(SPACY_COMPONENTS)
         
         # Initialize NLTK components
         self.stop_words = set(stopwords.words('english'))
@@ -45,9 +38,13 @@ class TextPreprocessor:
         self.stop_words.update(self.custom_stop_words)
         
         # Compile regex patterns
-        self.url_pattern = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
-        self.email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+        self.normalizer = get_text_normalizer()
+        self.url_pattern = URL_PATTERN
+        self.email_pattern = EMAIL_PATTERN
         self.number_pattern = re.compile(r'\b\d+\b')
+        self.digit_pattern = re.compile(r'\d')
+        self.uppercase_pattern = re.compile(r'[A-Z]')
+        self.punctuation_pattern = re.compile(r'[^\w\s]')
         
     def preprocess(self, text, extract_features=True):
         """Main preprocessing function"""
@@ -83,26 +80,44 @@ class TextPreprocessor:
             'features': features
         }
     
+    def preprocess_batch(self, texts, extract_features=True, batch_size=256, n_process=1):
+        """
+        Preprocess many texts at once; returns columns instead of per-text dicts.
+
+        Cleaned texts are streamed through ``nlp.pipe`` (parser and NER are
+        disabled in the shared model's view), and identical texts are analysed once.
+
+        Returns {'cleaned': [...], 'processed': [...], 'tokens': [...],
+        'features': {column: [...]}}, every list in input order. ``tokens``
+        are the spaCy lemmas kept by the stop-word and length filters, not
+        NLTK word_tokenize output as in ``preprocess``: they differ where
+        NLTK would split a lemma further, and ``features['word_count']``
+        and ``avg_word_length`` are computed from them.
+        """
+        originals = [str(text).strip() if text and isinstance(text, str) else '' for text in texts]
+        cleaned = [self._basic_cleaning(text) if text else '' for text in originals]
+
+        unique = list(dict.fromkeys(text for text in cleaned if text))
+        analysed = {'': ('', [])}
+        docs = self.nlp.pipe(unique, batch_size=batch_size, n_process=n_process)
+        for text, doc in zip(unique, docs):
+            lemmas = [token.lemma_ for token in doc if not token.is_punct and not token.is_stop and not token.is_space]
+            tokens = [lemma for lemma in lemmas if lemma not in self.stop_words and len(lemma) > 2]
+            analysed[text] = (' '.join(lemmas), tokens)
+
+        results = {
+            'cleaned': cleaned,
+            'processed': [analysed[text][0] for text in cleaned],
+            'tokens': [analysed[text][1] for text in cleaned],
+            'features': {}
+        }
+        if extract_features:
+            results['features'] = self._extract_feature_columns(originals, results['tokens'])
+        return results
+
     def _basic_cleaning(self, text):
-        """Basic text cleaning"""
-        text = text.lower()
-        text = self.url_pattern.sub('', text)
-        text = self.email_pattern.sub('', text)
-        # Remove emojis using Unicode regex (best effort)
-        import re
-        emoji_pattern = re.compile(
-            "["
-            "\U0001F600-\U0001F64F"  # emoticons
-            "\U0001F300-\U0001F5FF"  # symbols & pictographs
-            "\U0001F680-\U0001F6FF"  # transport & map symbols
-            "\U0001F1E0-\U0001F1FF"  # flags (iOS)
-            "\U00002700-\U000027BF"  # Dingbats
-            "\U000024C2-\U0001F251"
-            "]+", flags=re.UNICODE)
-        text = emoji_pattern.sub(r'', text)
-        text = contractions.fix(text)
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        """Basic text cleaning: lowercase, strip URLs/emails/emojis, expand contractions"""
+        return self.normalizer.clean(text)
     
     def _advanced_cleaning(self, text):
         """Advanced text cleaning with spaCy"""
@@ -123,6 +138,7 @@ class TextPreprocessor:
             return []
         
         # Use NLTK tokenizer
+        from nltk.tokenize import word_tokenize
         tokens = word_tokenize(text)
         
         # Remove stop words and short tokens
@@ -136,25 +152,45 @@ class TextPreprocessor:
             'length': len(original_text),
             'word_count': len(tokens),
             'avg_word_length': sum(len(token) for token in tokens) / len(tokens) if tokens else 0,
-            'has_numbers': bool(re.search(r'\d', original_text)),
-            'has_uppercase': bool(re.search(r'[A-Z]', original_text)),
-            'has_punctuation': bool(re.search(r'[^\w\s]', original_text)),
+            'has_numbers': bool(self.digit_pattern.search(original_text)),
+            'has_uppercase': bool(self.uppercase_pattern.search(original_text)),
+            'has_punctuation': bool(self.punctuation_pattern.search(original_text)),
             'sentiment_indicators': self._extract_sentiment_indicators(original_text)
         }
         
         return features
     
+    def _extract_feature_columns(self, original_texts, token_lists):
+        """Columnar _extract_features; sentiment indicators are flattened into their own columns"""
+        columns = {
+            'length': [len(text) for text in original_texts],
+            'word_count': [len(tokens) for tokens in token_lists],
+            'avg_word_length': [
+                sum(len(token) for token in tokens) / len(tokens) if tokens else 0
+                for tokens in token_lists
+            ],
+            'has_numbers': [bool(self.digit_pattern.search(text)) for text in original_texts],
+            'has_uppercase': [bool(self.uppercase_pattern.search(text)) for text in original_texts],
+            'has_punctuation': [bool(self.punctuation_pattern.search(text)) for text in original_texts],
+            'positive_count': [],
+            'negative_count': [],
+            'positive_words': [],
+            'negative_words': []
+        }
+        for text in original_texts:
+            indicators = self._extract_sentiment_indicators(text)
+            for key in ('positive_count', 'negative_count', 'positive_words', 'negative_words'):
+                columns[key].append(indicators[key])
+        return columns
+    
     def _extract_sentiment_indicators(self, text):
         """Extract sentiment-related indicators"""
-        positive_words = {'excellent', 'amazing', 'love', 'perfect', 'great', 'good', 'nice', 'wonderful'}
-        negative_words = {'terrible', 'awful', 'hate', 'disappointed', 'poor', 'bad', 'worst', 'horrible'}
-        
         text_lower = text.lower()
         words = set(text_lower.split())
         
         return {
-            'positive_count': len(words.intersection(positive_words)),
-            'negative_count': len(words.intersection(negative_words)),
-            'positive_words': list(words.intersection(positive_words)),
-            'negative_words': list(words.intersection(negative_words))
+            'positive_count': len(words.intersection(POSITIVE_WORDS)),
+            'negative_count': len(words.intersection(NEGATIVE_WORDS)),
+            'positive_words': list(words.intersection(POSITIVE_WORDS)),
+            'negative_words': list(words.intersection(NEGATIVE_WORDS))
         }
\ No newline at end of file
@@ -0,0 +1,156 @@
+# backend/nlp/process_pool.py
+"""
+Multi-core execution of AdvancedNLPPipeline with one copy of the weights.
+
+The parent loads every model a profile needs and moves the torch
+parameters into shared memory. It then forks N workers. Each worker
+inherits the already-built pipeline, so the weights are mapped rather
+than loaded N times. Workers pull review chunks from the pool's task
+queue. Each runs torch with a small intra-op thread count so N workers
+do not oversubscribe the cores.
+
+Linux/macOS only (needs the fork start method).
+"""
+import os
+import logging
+import multiprocessing
+
+from .profiles import DEFAULT_PROFILE, models_for_profile, resolve_stages
+
+logger = logging.getLogger(__name__)
+
+# Pipeline inherited by forked workers (set in the parent right before forking)
+_worker_pipeline = None
+
+
+def _init_worker(torch_threads):
+    import torch
+    torch.set_num_threads(torch_threads)
+
+
+def _process_chunk(args):
+    texts, product_infos, batch_size, profile = args
+    # Workers only score keywords; the parent counts the reviews in its own tables
+    return _worker_pipeline.process_reviews(
+        texts, product_infos, batch_size=batch_size, profile=profile, update_keywords=False
+    )
+
+
+def process_memory(pid):
+    """RSS, PSS and private memory of a process in MB (PSS splits shared pages between sharers)"""
+    fields = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return None
+    private_kb = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return {
+        'pid': pid,
+        'rss_mb': round(fields.get('Rss', 0) / 1024, 1),
+        'pss_mb': round(fields.get('Pss', 0) / 1024, 1),
+        'private_mb': round(private_kb / 1024, 1)
+    }
+
+
+def _share_model_memory(pipeline, profile):
+    """Move torch parameters of the profile's models into shared memory"""
+    for name in models_for_profile(profile):
+        model = pipeline.models.get(name)
+        module = getattr(model, 'model', model)
+        if hasattr(module, 'share_memory'):
+            module.share_memory()
+
+
+class PipelineProcessPool:
+    """Pool of forked workers running a parent-loaded AdvancedNLPPipeline"""
+
+    def __init__(self, num_workers=None, profile=DEFAULT_PROFILE, pipeline=None, torch_threads=1, chunk_size=16):
+        global _worker_pipeline
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("PipelineProcessPool needs the 'fork' start method")
+
+        if pipeline is None:
+            from .advanced_pipeline import AdvancedNLPPipeline
+            pipeline = AdvancedNLPPipeline()
+
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.profile = profile
+        self.chunk_size = chunk_size
+        self.pipeline = pipeline
+
+        # Load everything before forking; anything loaded later would be per worker
+        pipeline.warm_up(profile)
+        _share_model_memory(pipeline, profile)
+
+        # Fast tokenizers' own thread pool does not survive fork
+        os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+        _worker_pipeline = pipeline
+        context = multiprocessing.get_context('fork')
+        self._pool = context.Pool(self.num_workers, initializer=_init_worker, initargs=(torch_threads,))
+        logger.info(f"Started {self.num_workers} pipeline workers (profile {profile})")
+
+    def process_reviews(self, review_texts, product_infos=None, batch_size=32, profile=None, trace=None,
+                        update_keywords=True):
+        """
+        Same contract as AdvancedNLPPipeline.process_reviews, spread over the workers.
+
+        Workers score keywords against the tables as they were at fork time.
+        Updates made in a worker would die with it, so the parent adds the
+        reviews selected by ``update_keywords`` to its own tables afterwards.
+        """
+        profile = profile or self.profile
+        review_texts = list(review_texts)
+        if product_infos is None:
+            product_infos = [None] * len(review_texts)
+        product_infos = list(product_infos)
+
+        chunks = [
+            (review_texts[i:i + self.chunk_size], product_infos[i:i + self.chunk_size], batch_size, profile)
+            for i in range(0, len(review_texts), self.chunk_size)
+        ]
+
+        if trace is not None:
+            trace.profile = profile
+            trace.num_reviews = len(review_texts)
+            trace.model_versions = self.pipeline.model_versions(profile)
+            with trace.stage('process_pool'):
+                chunk_results = self._pool.map(_process_chunk, chunks)
+            trace.finish()
+        else:
+            chunk_results = self._pool.map(_process_chunk, chunks)
+
+        if 'keywords' in resolve_stages(profile):
+            counted = [update_keywords] * len(review_texts) if isinstance(update_keywords, bool) else list(update_keywords)
+            self.pipeline.count_keywords(
+                [text for text, count in zip(review_texts, counted) if count],
+                [info for info, count in zip(product_infos, counted) if count]
+            )
+
+        return [result for chunk in chunk_results for result in chunk]
+
+    def embed_reviews(self, review_ids, texts, batch_size=64):
+        """Embeddings are stored by the parent (one writer, one copy of the sentence model)"""
+        return self.pipeline.embed_reviews(review_ids, texts, batch_size)
+
+    def assign_topics(self, review_ids, texts):
+        return self.pipeline.assign_topics(review_ids, texts)
+
+    def worker_memory(self):
+        """Memory of each live worker process"""
+        return [m for m in (process_memory(p.pid) for p in multiprocessing.active_children()) if m]
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,98 @@
+# backend/nlp/profiles.py
+"""
+Named stage selections for AdvancedNLPPipeline.
+
+A profile decides which stages run and therefore which models get loaded:
+a caller that only needs sentiment never pays for ABSA, NER or emotion.
+"""
+
+# Every stage in the order process_reviews runs them
+PIPELINE_STAGES = (
+    'preprocess',
+    'sentiment',
+    'aspects',
+    'entities',
+    'emotions',
+    'keywords',
+    'quality',
+    'competitors',
+)
+
+# Result key each stage fills in the per-review output
+STAGE_RESULT_KEYS = {
+    'preprocess': 'processed_text',
+    'sentiment': 'sentiment_analysis',
+    'aspects': 'aspect_sentiments',
+    'entities': 'entities',
+    'emotions': 'emotions',
+    'keywords': 'keywords',
+    'quality': 'quality_metrics',
+    'competitors': 'competitor_mentions',
+}
+
+# Registry models each stage needs
+STAGE_MODELS = {
+    'preprocess': ('spacy',),
+    'sentiment': ('sentiment_tokenizer', 'sentiment'),
+    'aspects': ('spacy', 'absa'),
+    'entities': ('spacy', 'ner'),
+    'emotions': ('emotion',),
+    'keywords': (),
+    'quality': ('spacy',),
+    'competitors': ('sentiment_tokenizer', 'sentiment'),
+}
+
+PIPELINE_PROFILES = {
+    # Everything, as stored on a fully analyzed review
+    'full': PIPELINE_STAGES,
+    # Cheap stages for the submit path: DistilBERT plus spaCy small, no large models
+    'ingest-fast': ('preprocess', 'sentiment', 'quality'),
+    # Refresh only the sentiment fields after a sentiment model upgrade
+    'reprocess-sentiment-only': ('sentiment',),
+}
+
+DEFAULT_PROFILE = 'full'
+
+# Stages whose output follows a review's exact wording; a near-duplicate that
+# copies another review's model outputs still computes these for its own text
+TEXT_STAGES = ('preprocess', 'competitors')
+
+
+def resolve_stages(profile=None):
+    """Return the stage tuple for a profile name or an explicit iterable of stages"""
+    if profile is None:
+        profile = DEFAULT_PROFILE
+
+    if isinstance(profile, str):
+        if profile not in PIPELINE_PROFILES:
+            raise ValueError(
+                f"Unknown NLP profile '{profile}'. Available: {', '.join(sorted(PIPELINE_PROFILES))}"
+            )
+        return PIPELINE_PROFILES[profile]
+
+    stages = tuple(profile)
+    unknown = [stage for stage in stages if stage not in PIPELINE_STAGES]
+    if unknown:
+        raise ValueError(f"Unknown NLP stages: {', '.join(unknown)}")
+    # Keep pipeline order regardless of how the caller listed them
+    return tuple(stage for stage in PIPELINE_STAGES if stage in stages)
+
+
+def status_for_profile(profile=None):
+    """
+    processing_status for a review analyzed under a profile.
+
+    'complete' only when every stage ran; otherwise 'partial', and the
+    review still needs a DEFAULT_PROFILE pass.
+    """
+    return 'complete' if set(resolve_stages(profile)) == set(PIPELINE_STAGES) else 'partial'
+
+
+def models_for_profile(profile=None):
+    """Registry model names a profile will load"""
+    models = []
+    for stage in resolve_stages(profile):
+        for name in STAGE_MODELS[stage]:
+            if name not in models:
+                models.append(name)
+    return models
@@ -0,0 +1,105 @@
+# backend/nlp/resources.py
+"""
+Offline checks for the data files and models the NLP stages need.
+
+Nothing here downloads. Each require_* call looks for a resource on disk and
+raises ResourceUnavailable straight away if it is missing, instead of letting
+NLTK, spaCy or the Hugging Face hub try the network on a worker's first
+request. Resources are fetched ahead of time (in the Docker build) with
+``python scripts/fetch_nlp_resources.py``.
+
+With NLP_OFFLINE=1 (the default) the Hugging Face libraries are also put in
+offline mode, unless HF_HUB_OFFLINE / TRANSFORMERS_OFFLINE are already set.
+NLP_OFFLINE=0 skips the Hugging Face checks and lets the hub download on
+demand; NLTK data and spaCy models are always checked, since neither library
+downloads them on load.
+"""
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+FETCH_COMMAND = 'python scripts/fetch_nlp_resources.py'
+
+# NLTK resource name -> data paths that satisfy it (newer NLTK reads punkt_tab)
+NLTK_RESOURCES = {
+    'punkt': ('tokenizers/punkt_tab/english/', 'tokenizers/punkt'),
+    'stopwords': ('corpora/stopwords',),
+    'wordnet': ('corpora/wordnet',),
+}
+
+
+class ResourceUnavailable(LookupError):
+    """A model or data file is not available locally"""
+
+
+def offline_mode():
+    """Whether NLP_OFFLINE asks for local-only resources (default on)"""
+    return os.environ.get('NLP_OFFLINE', '1').strip().lower() not in ('0', 'false', 'no')
+
+
+if offline_mode():
+    # Read by huggingface_hub / transformers at import, so set before either is imported
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+
+_found = set()
+_lock = threading.Lock()
+
+
+def _missing(kind, name, detail=''):
+    return ResourceUnavailable(
+        f"{kind} '{name}' is not available locally{detail}. "
+        f"Run `{FETCH_COMMAND}` from backend/ to fetch the NLP resources."
+    )
+
+
+def require_nltk(*names):
+    """Check NLTK data packages (keys of NLTK_RESOURCES) are installed"""
+    for name in names:
+        if ('nltk', name) in _found:
+            continue
+        import nltk
+        for path in NLTK_RESOURCES.get(name, (name,)):
+            try:
+                nltk.data.find(path)
+                break
+            except LookupError:
+                continue
+        else:
+            raise _missing('NLTK data', name, f" (searched {', '.join(nltk.data.path)})")
+        with _lock:
+            _found.add(('nltk', name))
+
+
+def require_spacy_model(name):
+    """Check a spaCy model is installed as a package or present as a directory"""
+    if ('spacy', name) in _found:
+        return
+    import spacy
+    if not (spacy.util.is_package(name) or os.path.isdir(name)):
+        raise _missing('spaCy model', name)
+    with _lock:
+        _found.add(('spacy', name))
+
+
+def _hf_repo_ids(model_id):
+    # sentence-transformers resolves bare names like all-MiniLM-L6-v2 under its own org
+    if '/' in model_id:
+        return [model_id]
+    return [model_id, f"sentence-transformers/{model_id}"]
+
+
+def require_hf_model(model_id):
+    """Check a Hugging Face model is in the local hub cache (or is a local directory)"""
+    if ('hf', model_id) in _found or not offline_mode() or os.path.isdir(model_id):
+        return
+    from huggingface_hub import try_to_load_from_cache
+    for repo_id in _hf_repo_ids(model_id):
+        if isinstance(try_to_load_from_cache(repo_id, 'config.json'), str):
+            break
+    else:
+        raise _missing('Hugging Face model', model_id)
+    with _lock:
+        _found.add(('hf', model_id))
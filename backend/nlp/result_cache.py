@@ -0,0 +1,201 @@
+# backend/nlp/result_cache.py
+"""
+Content-addressed cache for AdvancedNLPPipeline results.
+
+Keys hash the normalized review text together with the product category,
+the stage selection and the model/pipeline versions, so a model upgrade or a
+different profile never serves stale results. Lookups go through an
+in-memory LRU first and then a local SQLite file that survives restarts.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'cache', 'nlp_results.sqlite'
+)
+
+_whitespace_pattern = re.compile(r'\s+')
+
+
+def normalize_for_cache(text):
+    """Canonical form used for cache keys: NFC unicode, collapsed and trimmed whitespace"""
+    if not text:
+        return ''
+    return _whitespace_pattern.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def make_cache_key(text, product_info, stages, versions):
+    """Hash of everything that can change a review's NLP result"""
+    product_info = product_info or {}
+    payload = json.dumps([
+        normalize_for_cache(text),
+        product_info.get('category'),
+        product_info.get('subcategory'),
+        list(stages),
+        sorted(versions.items())
+    ], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _json_default(value):
+    # numpy scalars (e.g. bools from np.var comparisons) -> plain Python
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class NLPResultCache:
+    """Two-tier (memory LRU + SQLite) cache of per-review NLP results"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_memory_entries=10000, max_disk_entries=1000000):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self._writes_since_prune = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _connection(self):
+        """SQLite connection for this process (reopened after fork)"""
+        if self.path is None:
+            return None
+        if self._conn is None or self._conn_pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS nlp_results ('
+                'key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+            conn.commit()
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _remember(self, key, payload):
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return a fresh copy of the cached result, or None"""
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return json.loads(payload)
+
+            conn = self._connection()
+            row = None
+            if conn is not None:
+                try:
+                    row = conn.execute('SELECT result FROM nlp_results WHERE key = ?', (key,)).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"NLP cache read failed: {e}")
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            self._remember(key, row[0])
+            return json.loads(row[0])
+
+    def put(self, key, result):
+        """Store a result in both tiers"""
+        payload = json.dumps(result, default=_json_default, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, payload)
+            self.writes += 1
+
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO nlp_results (key, result, created_at) VALUES (?, ?, ?)',
+                    (key, payload, time.time())
+                )
+                conn.commit()
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= 1000:
+                    self._prune(conn)
+            except sqlite3.Error as e:
+                logger.warning(f"NLP cache write failed: {e}")
+
+    def _prune(self, conn):
+        """Drop the oldest rows once the disk tier grows past max_disk_entries"""
+        self._writes_since_prune = 0
+        count = conn.execute('SELECT COUNT(*) FROM nlp_results').fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            conn.execute(
+                'DELETE FROM nlp_results WHERE key IN '
+                '(SELECT key FROM nlp_results ORDER BY created_at LIMIT ?)',
+                (excess,)
+            )
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            conn = self._connection()
+            if conn is not None:
+                conn.execute('DELETE FROM nlp_results')
+                conn.commit()
+
+    def stats(self):
+        """Hit/miss counters for the admin health payload"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'enabled': True,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0,
+            'memory_entries': len(self._memory),
+            'path': self.path
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Process-wide result cache configured from the environment (None when disabled)"""
+    global _cache
+    if os.environ.get('NLP_CACHE_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = NLPResultCache(
+                    path=os.environ.get('NLP_CACHE_PATH', DEFAULT_CACHE_PATH),
+                    max_memory_entries=int(os.environ.get('NLP_CACHE_MEMORY_ENTRIES', 10000)),
+                    max_disk_entries=int(os.environ.get('NLP_CACHE_DISK_ENTRIES', 1000000))
+                )
+    return _cache
@@ -0,0 +1,92 @@
+# backend/nlp/review_context.py
+"""
+Per-review analysis context shared by the AdvancedNLPPipeline stages.
+
+A review is looked at in two text variants (emojis replaced by words, emojis
+stripped). The context derives both once and keeps one spaCy Doc per distinct
+variant, so every stage reuses the same parse instead of calling nlp() again.
+"""
+from collections import defaultdict
+
+# spaCy components each stage reads from its Doc
+STAGE_SPACY_COMPONENTS = {
+    'preprocess': {'tok2vec', 'tagger', 'attribute_ruler', 'lemmatizer'},  # lemma_, is_stop
+    'aspects': {'tok2vec', 'parser'},  # sentence boundaries
+    'entities': {'tok2vec', 'ner'},  # ents
+    'quality': {'tok2vec', 'tagger', 'attribute_ruler', 'parser', 'ner'},  # pos_, ent_type_, sents
+}
+
+# Only these are ever disabled; any other component in the loaded model always runs
+_KNOWN_COMPONENTS = set().union(*STAGE_SPACY_COMPONENTS.values())
+
+# Which text variant each stage parses
+STAGE_TEXT_VARIANT = {
+    'preprocess': 'text_with_emoji_tokens',
+    'aspects': 'text_with_emoji_tokens',
+    'entities': 'text_with_emoji_tokens',
+    'quality': 'text_without_emojis',
+}
+
+
+class ReviewContext:
+    """Text variants, emoji analysis and cached spaCy Docs for one review"""
+
+    def __init__(self, text, emoji_processor, nlp, product_info=None, stages=None):
+        self.text = text
+        self.product_info = product_info
+        self.stages = tuple(stages) if stages is not None else tuple(STAGE_SPACY_COMPONENTS)
+
+        self.emoji_analysis = emoji_processor.analyze_emoji_sentiment(text)
+        self.text_with_emoji_tokens = emoji_processor.replace_emojis_with_text(text)
+        self.text_without_emojis = emoji_processor.remove_emojis(text)
+
+        self._nlp = nlp
+        self._docs = {}
+
+    def spacy_requirements(self):
+        """Map each text variant this review needs parsed to the components its stages use"""
+        requirements = defaultdict(set)
+        for stage in self.stages:
+            if stage in STAGE_SPACY_COMPONENTS:
+                text = getattr(self, STAGE_TEXT_VARIANT[stage])
+                requirements[text].update(STAGE_SPACY_COMPONENTS[stage])
+        return requirements
+
+    def set_doc(self, text, doc):
+        self._docs[text] = doc
+
+    def parsed_doc(self, text):
+        """The cached Doc for a text variant, or None if it has not been parsed"""
+        return self._docs.get(text)
+
+    def doc(self, text):
+        """Return the cached Doc for a text variant, parsing it on first request"""
+        doc = self._docs.get(text)
+        if doc is None:
+            doc = self._nlp(text)
+            self._docs[text] = doc
+        return doc
+
+
+def parse_review_contexts(nlp, contexts, batch_size=64):
+    """Parse every distinct text variant of the contexts once with nlp.pipe
+
+    Texts are grouped by the set of components their stages need, and each
+    group runs through ``nlp.pipe`` with the other components disabled.
+    Identical texts across reviews in the batch share a single Doc.
+    """
+    groups = defaultdict(lambda: defaultdict(list))
+    for context in contexts:
+        for text, components in context.spacy_requirements().items():
+            disabled = tuple(
+                name for name in nlp.pipe_names
+                if name in _KNOWN_COMPONENTS and name not in components
+            )
+            groups[disabled][text].append(context)
+
+    for disabled, contexts_by_text in groups.items():
+        texts = list(contexts_by_text)
+        docs = nlp.pipe(texts, disable=list(disabled), batch_size=batch_size)
+        for text, doc in zip(texts, docs):
+            for context in contexts_by_text[text]:
+                context.set_doc(text, doc)
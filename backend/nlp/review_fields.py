@@ -0,0 +1,119 @@
+# backend/nlp/review_fields.py
+"""
+Mapping from AdvancedNLPPipeline results to Review model columns.
+
+Only stages present in the result produce columns, so a partial profile
+(e.g. ``reprocess-sentiment-only``) never overwrites fields it did not compute.
+"""
+
+
+def review_fields_from_results(nlp_results):
+    """Return {Review column: value} for every stage present in nlp_results"""
+    fields = {}
+
+    if 'processed_text' in nlp_results:
+        fields['processed_text'] = nlp_results['processed_text']
+
+    if 'sentiment_analysis' in nlp_results:
+        sentiment = nlp_results['sentiment_analysis']
+        fields['sentiment'] = sentiment.get('primary_sentiment', 'neutral')
+        fields['sentiment_scores'] = sentiment.get('sentiment_scores', {})
+        fields['confidence_score'] = sentiment.get('confidence', 0.5)
+
+    if 'aspect_sentiments' in nlp_results:
+        fields['aspect_sentiments'] = nlp_results['aspect_sentiments']
+
+    if 'entities' in nlp_results:
+        fields['entities'] = nlp_results['entities']
+
+    if 'keywords' in nlp_results:
+        fields['keywords'] = nlp_results['keywords']
+
+    if 'emotions' in nlp_results:
+        fields['emotion_scores'] = nlp_results['emotions'].get('emotion_scores', {})
+
+    if 'emoji_analysis' in nlp_results:
+        fields['emoji_analysis'] = nlp_results['emoji_analysis']
+
+    if 'quality_metrics' in nlp_results:
+        quality = nlp_results['quality_metrics']
+        fields['quality_score'] = quality.get('quality_score', 0.5)
+        fields['authenticity_score'] = quality.get('authenticity_score', 0.5)
+
+    if 'competitor_mentions' in nlp_results:
+        fields['competitor_mentions'] = nlp_results['competitor_mentions']
+
+    return fields
+
+
+def duplicate_fields(analysis):
+    """Review columns for a near-duplicate analysis from NearDuplicateIndex.add"""
+    return {
+        'spam_probability': analysis['spam_probability'],
+        'duplicate_of': analysis['duplicate_of'],
+        'duplicate_analysis': analysis
+    }
+
+
+def nlp_results_from_review(review):
+    """
+    Pipeline-shaped results rebuilt from a processed Review's columns.
+
+    Used to give a near-duplicate the analysis of the review it copies
+    instead of running the models again.
+    """
+    emotion_scores = review.emotion_scores or {}
+    return {
+        'processed_text': review.processed_text,
+        'sentiment_analysis': {
+            'primary_sentiment': review.sentiment or 'neutral',
+            'sentiment_scores': review.sentiment_scores or {},
+            'confidence': review.confidence_score if review.confidence_score is not None else 0.5
+        },
+        'aspect_sentiments': review.aspect_sentiments or {},
+        'entities': review.entities or {},
+        'keywords': review.keywords or [],
+        'emotions': {
+            'primary_emotion': max(emotion_scores, key=emotion_scores.get) if emotion_scores else 'neutral',
+            'emotion_scores': emotion_scores
+        },
+        'emoji_analysis': review.emoji_analysis or {},
+        'quality_metrics': {
+            'quality_score': review.quality_score if review.quality_score is not None else 0.5,
+            'authenticity_score': review.authenticity_score if review.authenticity_score is not None else 0.5
+        },
+        'competitor_mentions': review.competitor_mentions or [],
+        'topics': review.topics or []
+    }
+
+
+def product_info_from_product(product):
+    """Pipeline ``product_info`` for a Product row (None when the product is missing)"""
+    if product is None:
+        return None
+    return {
+        'category': product.category,
+        'subcategory': product.subcategory,
+        'brand': product.brand,
+        'product_name': product.name,
+        'product_id': product.id
+    }
+
+
+def format_nlp_analysis(nlp_results):
+    """Shape of the NLP results sent to the frontend on submit and over Socket.IO"""
+    sentiment = nlp_results.get('sentiment_analysis', {})
+    return {
+        'sentiment': {
+            'primary_sentiment': sentiment.get('primary_sentiment', 'neutral'),
+            'confidence': sentiment.get('confidence', 0.5),
+            'sentiment_scores': sentiment.get('sentiment_scores', {})
+        },
+        'aspects': nlp_results.get('aspect_sentiments', {}),
+        'emotions': nlp_results.get('emotions', {}),
+        'quality': nlp_results.get('quality_metrics', {}),
+        'keywords': nlp_results.get('keywords', []),
+        'entities': nlp_results.get('entities', {}),
+        'competitor_mentions': nlp_results.get('competitor_mentions', []),
+        'topics': nlp_results.get('topics', [])
+    }
@@ -1,27 +1,27 @@
 # backend/nlp/sentiment_analysis.py
 
-import torch
-import spacy
-from transformers import (
-    AutoTokenizer, 
-    AutoModelForSequenceClassification,
-    pipeline
-)
+# transformers is imported when a transformer model is built, not on import
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
-import joblib
+from .resources import require_hf_model
+from .spacy_provider import get_spacy
+
+SENTIMENT_MODEL = 'nlptown/bert-base-multilingual-uncased-sentiment'
+
+EXPLANATION_POSITIVE_WORDS = {'excellent', 'amazing', 'love', 'perfect', 'great'}
+EXPLANATION_NEGATIVE_WORDS = {'terrible', 'awful', 'hate', 'disappointed', 'poor'}
 
 class SentimentAnalyzer:
     def __init__(self, model_type='transformer'):
         self.model_type = model_type
         
-        # Initialize spaCy model
-        self.nlp = spacy.load('en_core_web_sm')
+        # Shared spaCy model; explanations only need tokens and noun chunks
+        self.nlp = get_spacy(('tagger', 'attribute_ruler', 'parser'))
         
         if model_type == 'transformer':
             # Use pre-trained BERT for sentiment analysis
-            self.model_name = 'nlptown/bert-base-multilingual-uncased-sentiment'
+            self.model_name = SENTIMENT_MODEL
+            require_hf_model(self.model_name)
+            from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
             self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
             self.sentiment_pipeline = pipeline(
@@ -38,32 +38,34 @@ class SentimentAnalyzer:
         if self.model_type == 'transformer':
             # Get prediction
             result = self.sentiment_pipeline(text[:512])[0]  # Truncate for BERT
-            
-            # Convert 5-star rating to sentiment
-            stars = int(result['label'].split()[0])
-            if stars >= 4:
-                sentiment = 'positive'
-                confidence = result['score']
-            elif stars <= 2:
-                sentiment = 'negative'
-                confidence = result['score']
-            else:
-                sentiment = 'neutral'
-                confidence = result['score']
-            
-            return {
-                'sentiment': sentiment,
-                'confidence': confidence,
-                'raw_score': stars,
-                'details': result
-            }
+            return self._sentiment_from_stars(result)
+    
+    def _sentiment_from_stars(self, result):
+        """Map a 1-5 star pipeline output to sentiment, confidence and raw score"""
+        # Convert 5-star rating to sentiment
+        stars = int(result['label'].split()[0])
+        if stars >= 4:
+            sentiment = 'positive'
+        elif stars <= 2:
+            sentiment = 'negative'
+        else:
+            sentiment = 'neutral'
+        
+        return {
+            'sentiment': sentiment,
+            'confidence': result['score'],
+            'raw_score': stars,
+            'details': result
+        }
     
-    def predict_batch(self, texts):
-        """Predict sentiment for multiple texts"""
-        results = []
-        for text in texts:
-            results.append(self.predict_sentiment(text))
-        return results
+    def predict_batch(self, texts, batch_size=32):
+        """Predict sentiment for multiple texts; one pipeline call, batch_size texts per forward pass"""
+        if self.model_type != 'transformer':
+            return [self.predict_sentiment(text) for text in texts]
+        if not texts:
+            return []
+        outputs = self.sentiment_pipeline([text[:512] for text in texts], batch_size=batch_size)
+        return [self._sentiment_from_stars(output) for output in outputs]
     
     def fine_tune_model(self, texts, labels):
         """Fine-tune the model on domain-specific data"""
@@ -74,19 +76,28 @@ class SentimentAnalyzer:
     def get_sentiment_explanations(self, text):
         """Get explanations for sentiment prediction"""
         # Use attention weights or LIME/SHAP for explanations
-        doc = self.nlp(text)
-        
+        return self._explanation_from_doc(self.nlp(text))
+    
+    def get_sentiment_explanations_batch(self, texts, docs=None, batch_size=256):
+        """
+        Explanations for many texts, parsed with one ``nlp.pipe`` call.
+
+        ``docs`` may hold already parsed Docs for ``texts`` (with at least
+        the tagger and parser run), e.g. shared with the other stages.
+        """
+        if docs is None:
+            docs = self.nlp.pipe(texts, batch_size=batch_size)
+        return [self._explanation_from_doc(doc) for doc in docs]
+    
+    def _explanation_from_doc(self, doc):
         # Simple keyword-based explanation
-        positive_words = {'excellent', 'amazing', 'love', 'perfect', 'great'}
-        negative_words = {'terrible', 'awful', 'hate', 'disappointed', 'poor'}
-        
-        found_positive = [token.text for token in doc if token.text in positive_words]
-        found_negative = [token.text for token in doc if token.text in negative_words]
+        found_positive = [token.text for token in doc if token.text in EXPLANATION_POSITIVE_WORDS]
+        found_negative = [token.text for token in doc if token.text in EXPLANATION_NEGATIVE_WORDS]
         
         explanation = {
             'positive_indicators': found_positive,
             'negative_indicators': found_negative,
-            'key_phrases': self._extract_key_phrases(text)
+            'key_phrases': [chunk.text for chunk in doc.noun_chunks]
         }
         
         return explanation
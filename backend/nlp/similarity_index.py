@@ -0,0 +1,244 @@
+# backend/nlp/similarity_index.py
+"""
+Approximate nearest-neighbour search over stored review embeddings.
+
+SimilarityIndex keeps an HNSW graph (hnswlib, inner product on the
+unit-length sentence embeddings, so scores are cosine similarities) keyed
+by review id. It is built incrementally: every search first adds the rows
+appended to the EmbeddingStore since the last sync, and a re-embedded
+review replaces its old vector. The graph is saved under
+SIMILARITY_INDEX_DIR every ``save_every`` new rows, so a restarted process
+only adds what arrived since. A change of sentence model rebuilds it.
+
+Searches restricted to a small set of reviews (one product) are answered
+exactly from the store, larger sets through a filtered graph search.
+Without hnswlib installed every search is exact.
+"""
+import os
+import json
+import logging
+import threading
+
+import numpy as np
+
+from .embedding_store import get_embedding_store
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_INDEX_DIR = os.environ.get('NLP_SIMILARITY_INDEX_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'similarity_index'
+)
+
+# Filters allowing at most this many reviews are searched exactly
+EXACT_SEARCH_LIMIT = 5000
+
+# Rows scored per block in exact search (bounds the float32 copy of the float16 store)
+_EXACT_BLOCK = 65536
+_ADD_BLOCK = 100000
+
+
+def exact_search(store, vector, k, allowed_ids=None, exclude_ids=()):
+    """Brute-force top-k (review_id, similarity) over the newest row of each stored review"""
+    ids, rows = store.latest_rows()
+    keep = np.ones(len(ids), dtype=bool)
+    if allowed_ids is not None:
+        keep &= np.isin(ids, np.fromiter(allowed_ids, dtype=np.int64))
+    if len(exclude_ids):
+        keep &= ~np.isin(ids, np.fromiter(exclude_ids, dtype=np.int64))
+    ids, rows = ids[keep], rows[keep]
+    if not len(ids) or k <= 0:
+        return []
+
+    order = np.argsort(rows)  # sequential reads from the memmap
+    ids, rows = ids[order], rows[order]
+    vectors = store.vectors()
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+
+    best_ids = np.empty(0, dtype=np.int64)
+    best_scores = np.empty(0, dtype=np.float32)
+    for offset in range(0, len(rows), _EXACT_BLOCK):
+        block = rows[offset:offset + _EXACT_BLOCK]
+        scores = np.asarray(vectors[block], dtype=np.float32) @ vector
+        best_ids = np.concatenate([best_ids, ids[offset:offset + _EXACT_BLOCK]])
+        best_scores = np.concatenate([best_scores, scores])
+        if len(best_scores) > k:
+            top = np.argpartition(-best_scores, k - 1)[:k]
+            best_ids, best_scores = best_ids[top], best_scores[top]
+
+    top = np.argsort(-best_scores, kind='stable')
+    return [(int(best_ids[i]), float(best_scores[i])) for i in top]
+
+
+class SimilarityIndex:
+    """Incrementally synced, persisted HNSW index over an EmbeddingStore"""
+
+    def __init__(self, store=None, directory=SIMILARITY_INDEX_DIR, M=16, ef_construction=200,
+                 ef_search=64, save_every=10000):
+        self.store = get_embedding_store() if store is None else store
+        self.directory = directory
+        self.index_path = os.path.join(directory, 'index.bin')
+        self.meta_path = os.path.join(directory, 'meta.json')
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.save_every = save_every
+
+        self._lock = threading.RLock()
+        self._index = None
+        self._unsaved = 0
+        self.meta = {'model_version': None, 'dim': None, 'indexed_rows': 0}
+
+        if hnswlib is None:
+            logger.warning("hnswlib not installed; similar-review search is exact (brute force)")
+        else:
+            self._load()
+
+    @property
+    def backend(self):
+        return 'hnsw' if hnswlib is not None else 'exact'
+
+    def _load(self):
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.store.refresh()
+        if meta.get('model_version') != self.store.model_version or meta.get('indexed_rows', 0) > len(self.store):
+            logger.info("Saved similarity index is stale; it will be rebuilt")
+            return
+        index = hnswlib.Index(space='ip', dim=meta['dim'])
+        try:
+            index.load_index(self.index_path, max_elements=max(meta['indexed_rows'], 1))
+        except RuntimeError as e:
+            logger.warning(f"Could not load similarity index: {e}")
+            return
+        self._index = index
+        self.meta = meta
+        logger.info(f"Loaded similarity index with {index.get_current_count()} reviews")
+
+    def _reset(self):
+        dim = self.store.dim
+        self._index = hnswlib.Index(space='ip', dim=dim)
+        self._index.init_index(max_elements=max(len(self.store), 1024), M=self.M, ef_construction=self.ef_construction)
+        self.meta = {'model_version': self.store.model_version, 'dim': dim, 'indexed_rows': 0}
+
+    def sync(self):
+        """Add rows appended to the store since the last sync; returns how many were added"""
+        if hnswlib is None:
+            return 0
+        self.store.refresh()
+        with self._lock:
+            count = len(self.store)
+            if not count:
+                return 0
+            if (self._index is None or self.meta['model_version'] != self.store.model_version
+                    or self.meta['indexed_rows'] > count):
+                self._reset()
+            start = self.meta['indexed_rows']
+            if start == count:
+                return 0
+
+            needed = self._index.get_current_count() + count - start
+            if needed > self._index.get_max_elements():
+                self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+
+            ids = self.store.review_ids()
+            vectors = self.store.vectors()
+            for offset in range(start, count, _ADD_BLOCK):
+                end = min(offset + _ADD_BLOCK, count)
+                self._index.add_items(np.asarray(vectors[offset:end], dtype=np.float32), ids[offset:end])
+            self.meta['indexed_rows'] = count
+
+            self._unsaved += count - start
+            if self.save_every and self._unsaved >= self.save_every:
+                try:
+                    self.save()
+                except OSError as e:
+                    logger.warning(f"Could not save similarity index: {e}")
+            return count - start
+
+    def search(self, vector, k=10, allowed_ids=None, exclude_ids=()):
+        """
+        Top-k (review_id, similarity) for a query embedding.
+
+        ``allowed_ids`` restricts results to those reviews; ``exclude_ids``
+        drops reviews (e.g. the query review itself).
+        """
+        exclude_ids = set(exclude_ids)
+        if allowed_ids is not None:
+            allowed_ids = set(allowed_ids) - exclude_ids
+            if len(allowed_ids) <= EXACT_SEARCH_LIMIT:
+                return exact_search(self.store, vector, k, allowed_ids)
+        if hnswlib is None:
+            return exact_search(self.store, vector, k, allowed_ids, exclude_ids)
+
+        self.sync()
+        with self._lock:
+            if self._index is None or not self._index.get_current_count():
+                return []
+            available = len(allowed_ids) if allowed_ids is not None else self._index.get_current_count() - len(exclude_ids)
+            k = min(k, available)
+            if k <= 0:
+                return []
+            if allowed_ids is not None:
+                accept = allowed_ids.__contains__
+            elif exclude_ids:
+                accept = lambda label: label not in exclude_ids
+            else:
+                accept = None
+            self._index.set_ef(max(self.ef_search, k))
+            try:
+                labels, distances = self._index.knn_query(
+                    np.asarray(vector, dtype=np.float32).reshape(1, -1), k=k, num_threads=1, filter=accept
+                )
+            except RuntimeError:
+                # Filter too selective for the graph search to find k results
+                return exact_search(self.store, vector, k, allowed_ids, exclude_ids)
+        return [(int(label), 1.0 - float(distance)) for label, distance in zip(labels[0], distances[0])]
+
+    def save(self):
+        """Atomically write the graph and its metadata"""
+        with self._lock:
+            if self._index is None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self.index_path + '.tmp'
+            self._index.save_index(tmp_path)
+            os.replace(tmp_path, self.index_path)
+            meta = dict(self.meta, M=self.M, ef_construction=self.ef_construction)
+            with open(self.meta_path + '.tmp', 'w') as f:
+                json.dump(meta, f)
+            os.replace(self.meta_path + '.tmp', self.meta_path)
+            self._unsaved = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.backend,
+                'indexed_rows': self.meta['indexed_rows'],
+                'reviews': self._index.get_current_count() if self._index is not None else 0,
+                'store_rows': len(self.store),
+                'M': self.M,
+                'ef_search': self.ef_search
+            }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_similarity_index():
+    """Process-wide index over the shared embedding store"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SimilarityIndex(ef_search=int(os.environ.get('NLP_SIMILARITY_EF', 64)))
+    return _index
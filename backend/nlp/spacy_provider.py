@@ -0,0 +1,155 @@
+# backend/nlp/spacy_provider.py
+"""
+Process-wide shared spaCy models.
+
+Each model is loaded once per process. Components ask for the pipeline
+components they actually read and get a SpacyView: the shared Language with
+every other known component disabled for their calls. Views only pass
+``disable=`` to ``nlp()`` and ``nlp.pipe()``, so they never change the
+shared pipeline and are safe to use from several threads.
+"""
+import threading
+import time
+import logging
+
+from .model_registry import MODEL_IDS, MB, current_rss_bytes
+from .resources import require_spacy_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPACY_MODEL = MODEL_IDS['spacy']
+
+# Components a requested component reads from; tok2vec is added for any component listening to it
+COMPONENT_REQUIRES = {
+    'lemmatizer': {'tagger', 'attribute_ruler'},  # rule lemmatizer needs token.pos
+}
+
+# Only these are ever disabled; any other component in the loaded model always runs
+KNOWN_COMPONENTS = {'tok2vec', 'tagger', 'attribute_ruler', 'lemmatizer', 'parser', 'senter', 'ner'}
+
+
+class SpacyView:
+    """A shared Language that runs only a subset of its components"""
+
+    def __init__(self, nlp, disabled):
+        self.nlp = nlp
+        self.disabled = tuple(disabled)
+
+    @property
+    def pipe_names(self):
+        return [name for name in self.nlp.pipe_names if name not in self.disabled]
+
+    def __call__(self, text, disable=(), **kwargs):
+        return self.nlp(text, disable=list(self.disabled) + list(disable), **kwargs)
+
+    def pipe(self, texts, disable=(), **kwargs):
+        return self.nlp.pipe(texts, disable=list(self.disabled) + list(disable), **kwargs)
+
+    def __getattr__(self, name):
+        # vocab, make_doc, get_pipe, ... come from the shared Language
+        return getattr(self.nlp, name)
+
+
+def required_components(nlp, components):
+    """Close a set of component names over COMPONENT_REQUIRES and tok2vec listeners"""
+    required = set(components)
+    pending = list(required)
+    while pending:
+        for name in COMPONENT_REQUIRES.get(pending.pop(), ()):
+            if name not in required:
+                required.add(name)
+                pending.append(name)
+
+    if 'tok2vec' in nlp.pipe_names and 'tok2vec' not in required:
+        listeners = getattr(nlp.get_pipe('tok2vec'), 'listening_components', None)
+        if listeners is None or required & set(listeners):
+            required.add('tok2vec')
+    return required
+
+
+class SpacyProvider:
+    """Loads each spaCy model once and hands out the shared instance or views of it"""
+
+    def __init__(self):
+        self._models = {}
+        self._stats = {}
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def load(self, name=DEFAULT_SPACY_MODEL):
+        """The shared Language for a model name, loaded on first use"""
+        nlp = self._models.get(name)
+        if nlp is not None:
+            return nlp
+        with self._lock:
+            if name in self._models:
+                return self._models[name]
+            require_spacy_model(name)
+            import spacy
+            logger.info(f"Loading spaCy model '{name}'...")
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            nlp = spacy.load(name)
+            load_seconds = time.perf_counter() - start
+            rss_delta = current_rss_bytes() - rss_before
+            self._stats[name] = {
+                'load_seconds': round(load_seconds, 2),
+                'rss_delta_mb': round(max(rss_delta, 0) / MB, 1),
+                'pipe_names': list(nlp.pipe_names)
+            }
+            self._models[name] = nlp
+            logger.info(f"spaCy model '{name}' loaded in {load_seconds:.1f}s (+{rss_delta / MB:.0f} MB RSS)")
+            return nlp
+
+    def get(self, components=None, name=DEFAULT_SPACY_MODEL):
+        """
+        The shared model restricted to ``components`` (plus what they depend on).
+
+        With ``components=None`` the full Language itself is returned.
+        """
+        nlp = self.load(name)
+        if components is None:
+            return nlp
+        required = required_components(nlp, components)
+        disabled = tuple(
+            component for component in nlp.pipe_names
+            if component in KNOWN_COMPONENTS and component not in required
+        )
+        if not disabled:
+            return nlp
+        key = (name, disabled)
+        view = self._views.get(key)
+        if view is None:
+            view = self._views.setdefault(key, SpacyView(nlp, disabled))
+        return view
+
+    def is_loaded(self, name=DEFAULT_SPACY_MODEL):
+        return name in self._models
+
+    def stats(self):
+        return {
+            'models': {name: dict(stats) for name, stats in self._stats.items()},
+            'views': [
+                {'model': name, 'disabled': list(disabled)}
+                for name, disabled in self._views
+            ]
+        }
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_spacy_provider():
+    """Return the process-wide spaCy provider"""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = SpacyProvider()
+    return _provider
+
+
+def get_spacy(components=None, name=DEFAULT_SPACY_MODEL):
+    """Shortcut for get_spacy_provider().get(components, name)"""
+    return get_spacy_provider().get(components, name)
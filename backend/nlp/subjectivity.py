@@ -0,0 +1,246 @@
+# backend/nlp/subjectivity.py
+"""
+Batch subjectivity scoring compatible with TextBlob.
+
+TextBlob(text).sentiment.subjectivity tokenizes the text in pure Python.
+It then walks the tokens through a modifier/negation state machine
+("very good" is one assessment scored s(good) * intensity(very)) and
+averages the subjectivity of the assessments.
+
+SubjectivityScorer uses the same lexicon, turned into arrays once per
+process. It replays that state machine with cumulative sums over all
+tokens of a batch, so a batch costs a few numpy passes instead of one
+TextBlob per review. Tokens come from one compiled regex that mimics
+pattern's tokenizer (``score_texts``), or from spaCy Docs the pipeline
+has already parsed (``score_docs``).
+
+Tolerance against TextBlob: ``score_texts`` reproduces the scores
+exactly (|delta| < 1e-9) on the review dataset and on fuzzed text, except
+for abbreviations like "a." that pattern keeps as one token. spaCy splits
+hyphenated words and "(!)", so ``score_docs`` differs on those (up to the
+full score of that review). It matches exactly on the review dataset.
+scripts/benchmark_subjectivity.py reports the agreement of both paths.
+"""
+import re
+import threading
+
+import numpy as np
+
+# pattern.en tokenizer: these split off the start/end of a token...
+_PUNCTUATION = ".,;:!?()[]{}`\"@#$^&*+-|=~_'"
+# ...and these are always tokens of their own (they are padded with spaces)
+_QUOTES = "'\"“”‘’"
+
+_P = re.escape(_PUNCTUATION + _QUOTES)
+_Q = re.escape(_QUOTES)
+# "don't" -> "do n't" -> "do n ' t", as pattern's contraction replacements do
+_CONTRACTION_RE = re.compile(r"n't")
+_SARCASM_RE = re.compile(r"\(\s?!\s?\)")
+
+NEGATIONS = ('no', 'not', 'never')
+SARCASM = '(!)'
+
+# spaCy keeps contractions together; pattern splits the apostrophe off, so
+# these only count with the length of what follows it
+_CONTRACTION_LENGTHS = {
+    "n't": 1, "n’t": 1, "'s": 1, "'d": 1, "'m": 1, "’s": 1, "’d": 1, "’m": 1,
+    "'ll": 2, "'re": 2, "'ve": 2, "’ll": 2, "’re": 2, "’ve": 2
+}
+
+
+class SubjectivityScorer:
+    """TextBlob subjectivity for whole batches of texts or spaCy Docs"""
+
+    def __init__(self, lexicon=None):
+        if lexicon is None:
+            from textblob.en import sentiment as lexicon
+
+        words = sorted(lexicon.keys())  # first access loads the XML
+        self.index = {word: i for i, word in enumerate(words)}
+        scores = np.array([lexicon[word][None] for word in words], dtype=np.float64).reshape(-1, 3)
+        self.subjectivity = scores[:, 1]
+        self.intensity = scores[:, 2]
+        self.is_modifier = np.array(['RB' in lexicon[word] for word in words], dtype=bool)
+        self.ends_ly = np.array([word.endswith('ly') for word in words], dtype=bool)
+
+        # pattern re-joins emoticons after splitting punctuation off; alphabetic
+        # ones ("xD") are then skipped when scoring
+        from textblob._text import EMOTICONS
+        faces = sorted({e for group in EMOTICONS.values() for e in group}, key=len, reverse=True)
+        self.emoticons = frozenset(e.lower() for e in faces if len(e) <= 5 and not e.isalpha())
+        emoticon_re = '|'.join(re.escape(e) for e in faces)
+        self._token_re = re.compile(
+            rf"\(!\)|(?:{emoticon_re})(?=[\s{_P}]|$)|\.{{3,}}|[^\s{_P}](?:[^\s{_Q}]*[^\s{_P}])?|\S"
+        )
+        self._hashes = None
+
+    def tokenize(self, text):
+        """Lowercased tokens as pattern.en's tokenizer would produce them (for scoring)"""
+        text = _SARCASM_RE.sub(' (!) ', _CONTRACTION_RE.sub(" n't", text))
+        return [token.lower() for token in self._token_re.findall(text)]
+
+    def score_texts(self, texts):
+        """Subjectivity of each text (TextBlob(text).sentiment.subjectivity)"""
+        tokens_per_text = [self.tokenize(text or '') for text in texts]
+        tokens = [token for text_tokens in tokens_per_text for token in text_tokens]
+        lengths = np.fromiter((len(tokens) for tokens in tokens_per_text), dtype=np.int64, count=len(texts))
+
+        index = self.index
+        negations = NEGATIONS
+        emoticons = self.emoticons
+        count = len(tokens)
+        lex = np.fromiter((index.get(token, -1) for token in tokens), dtype=np.int64, count=count)
+        token_len = np.fromiter((len(token) for token in tokens), dtype=np.int64, count=count)
+        negation = np.fromiter((token in negations for token in tokens), dtype=bool, count=count)
+        sentinel = np.fromiter((token in emoticons or token == SARCASM for token in tokens), dtype=bool, count=count)
+
+        return self._score(lengths, lex, token_len, negation, sentinel)
+
+    def score_docs(self, docs):
+        """Subjectivity of each parsed spaCy Doc, using its token arrays directly"""
+        from spacy.attrs import LOWER, LENGTH, IS_SPACE
+
+        hashes = self._lexicon_hashes()
+        arrays = [doc.to_array([LOWER, LENGTH, IS_SPACE]) for doc in docs]
+        arrays = [array[array[:, 2] == 0] if len(array) else array.reshape(0, 3) for array in arrays]
+        lengths = np.array([len(array) for array in arrays], dtype=np.int64)
+        if lengths.sum() == 0:
+            return [0.0] * len(docs)
+        stacked = np.concatenate(arrays)
+        lower = stacked[:, 0]
+        token_len = stacked[:, 1].astype(np.int64)
+
+        position = np.searchsorted(hashes['words'], lower)
+        position[position == len(hashes['words'])] = 0
+        found = hashes['words'][position] == lower
+        lex = np.where(found, hashes['order'][position], -1)
+
+        contraction = np.isin(lower, hashes['contractions'])
+        if contraction.any():
+            token_len[contraction] = [hashes['contraction_lengths'][h] for h in lower[contraction]]
+        negation = np.isin(lower, hashes['negations'])
+        sentinel = np.isin(lower, hashes['emoticons'])
+
+        return self._score(lengths, lex, token_len, negation, sentinel)
+
+    def _lexicon_hashes(self):
+        """spaCy string hashes of the lexicon words, sorted for searchsorted"""
+        if self._hashes is None:
+            from spacy.strings import hash_string
+            words = np.array([hash_string(word) for word in self.index], dtype=np.uint64)
+            order = np.argsort(words)
+            self._hashes = {
+                'words': words[order],
+                'order': np.array(list(self.index.values()), dtype=np.int64)[order],
+                'negations': np.array([hash_string(w) for w in NEGATIONS], dtype=np.uint64),
+                'emoticons': np.array([hash_string(e) for e in self.emoticons], dtype=np.uint64),
+                'contractions': np.array([hash_string(c) for c in _CONTRACTION_LENGTHS], dtype=np.uint64),
+                'contraction_lengths': {hash_string(c): n for c, n in _CONTRACTION_LENGTHS.items()}
+            }
+        return self._hashes
+
+    def _score(self, lengths, lex, token_len, negation, sentinel):
+        """
+        Replay pattern's Sentiment.assessments over the flattened tokens.
+
+        lengths: tokens per text; lex: lexicon index per token (-1 unknown);
+        token_len: token length; negation: unknown negation word;
+        sentinel: emoticon or "(!)" (a fixed s=1.0 assessment).
+        """
+        num_texts = len(lengths)
+        count = len(lex)
+        if count == 0:
+            return [0.0] * num_texts
+
+        idx = np.arange(count)
+        text_id = np.repeat(np.arange(num_texts), lengths)
+        text_start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+        known = lex >= 0
+        lex_safe = np.where(known, lex, 0)
+        unknown = ~known
+        negation = negation & unknown
+        sentinel = sentinel & unknown
+
+        # Modifier ("very", any RB word) in effect before each token: the last
+        # known word, if it is a modifier and no long unknown word came after it.
+        # A long negation keeps an "-ly" modifier ("really not good").
+        prev_known = _previous(np.where(known, idx, -1), text_start)
+        has_prev = prev_known >= 0
+        prev_safe = np.where(has_prev, prev_known, 0)
+        hard_reset = np.cumsum(unknown & (token_len > 2) & ~negation)
+        negation_reset = np.cumsum(negation & (token_len > 2))
+        resets = _between(hard_reset, prev_safe, idx)
+        negation_resets = _between(negation_reset, prev_safe, idx)
+        prev_ly = known[prev_safe] & self.ends_ly[lex_safe[prev_safe]]
+        modifier_active = (
+            has_prev & known[prev_safe] & self.is_modifier[lex_safe[prev_safe]]
+            & (resets == 0) & (prev_ly | (negation_resets == 0))
+        )
+
+        # Negation in effect before each token: the last token that sets or
+        # clears it is a negation not absorbed by an "-ly" modifier
+        consumed = negation & modifier_active & prev_ly
+        sets_negation = known | negation | (unknown & (token_len > 1))
+        prev_setter = _previous(np.where(sets_negation, idx, -1), text_start)
+        setter_safe = np.where(prev_setter >= 0, prev_setter, 0)
+        negation_active = (prev_setter >= 0) & negation[setter_safe] & ~consumed[setter_safe]
+
+        # Assessments: a known word starts one unless a modifier is in effect,
+        # in which case it folds into the previous one; emoticons always start one
+        merged = known & modifier_active
+        head = (known & ~merged) | sentinel
+        element = head | merged
+
+        positions = np.flatnonzero(element)
+        if len(positions) == 0:
+            return [0.0] * num_texts
+
+        intensity = np.where(known, self.intensity[lex_safe], 1.0)
+        intensity = np.where(known & negation_active, 1.0 / intensity, intensity)
+        subjectivity = np.where(known, self.subjectivity[lex_safe], 1.0)
+
+        # A merged word scores s(word) * intensity of the element before it
+        prev_element = np.concatenate(([0], positions[:-1]))
+        element_s = np.where(
+            head[positions],
+            subjectivity[positions],
+            np.clip(subjectivity[positions] * intensity[prev_element], -1.0, 1.0)
+        )
+
+        # Each assessment keeps the score of its last element
+        group = np.cumsum(head[positions]) - 1
+        last_of_group = np.append(group[1:] != group[:-1], True)
+        assessment_s = element_s[last_of_group]
+        assessment_text = text_id[positions[last_of_group]]
+
+        totals = np.bincount(assessment_text, weights=assessment_s, minlength=num_texts)
+        counts = np.bincount(assessment_text, minlength=num_texts)
+        return (totals / np.maximum(counts, 1)).tolist()
+
+
+def _previous(marked, text_start):
+    """Index of the last marked token strictly before each token in the same text (-1 if none)"""
+    last = np.maximum.accumulate(marked)
+    previous = np.concatenate(([-1], last[:-1]))
+    return np.where(previous >= text_start, previous, -1)
+
+
+def _between(cumulative, start, end):
+    """Count of flagged tokens strictly between start and end, from an inclusive cumsum"""
+    before_end = np.concatenate(([0], cumulative[:-1]))[end]
+    return before_end - cumulative[start]
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def get_subjectivity_scorer():
+    """Process-wide scorer (builds the lexicon arrays on first use)"""
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                _scorer = SubjectivityScorer()
+    return _scorer
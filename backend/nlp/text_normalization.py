@@ -0,0 +1,301 @@
+# backend/nlp/text_normalization.py
+"""
+Text normalization shared by every NLP module.
+
+TextNormalizer derives all text variants the pipelines use from one call:
+
+- cleaned: TextPreprocessor's cleaning (lowercased, URLs, emails and
+  emoticon-range emojis removed, contractions expanded, whitespace collapsed)
+- without_emojis: EmojiProcessor.remove_emojis
+- with_emoji_tokens: EmojiProcessor.replace_emojis_with_text
+- emojis: the emoji runs EmojiProcessor.extract_emojis finds
+
+The emoji variants come from a single scan for emoji runs, and pure-ASCII
+text skips that scan. Contractions are expanded with one regex compiled
+as a trie from the ``contractions`` package's tables, not with
+``contractions.fix``. Outputs are identical to the functions they replace
+(``python scripts/benchmark_text_normalization.py`` checks this).
+"""
+import re
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# Emojis TextPreprocessor strips while cleaning (best effort)
+CLEANING_EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    "\U00002700-\U000027BF"  # Dingbats
+    "\U000024C2-\U0001F251"
+    "]+", flags=re.UNICODE)
+
+# Emoji runs EmojiProcessor extracts, removes and replaces
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    "\U00002500-\U00002BEF"  # chinese char
+    "\U00002702-\U000027B0"
+    "\U00002702-\U000027B0"
+    "\U000024C2-\U0001F251"
+    "\U0001f926-\U0001f937"
+    "\U00010000-\U0010ffff"
+    "\u2640-\u2642"
+    "\u2600-\u2B55"
+    "\u200d"
+    "\u23cf"
+    "\u23e9"
+    "\u231a"
+    "\ufe0f"  # dingbats
+    "\u3030"
+    "]+",
+    flags=re.UNICODE
+)
+
+# Emoji sentiment mapping
+EMOJI_SENTIMENTS = {
+    # Positive emojis
+    '😀': 'positive', '😃': 'positive', '😄': 'positive', '😁': 'positive',
+    '😆': 'positive', '😅': 'positive', '😂': 'positive', '🤣': 'positive',
+    '😊': 'positive', '😇': 'positive', '🙂': 'positive', '🙃': 'positive',
+    '😉': 'positive', '😌': 'positive', '😍': 'positive', '🥰': 'positive',
+    '😘': 'positive', '😗': 'positive', '😙': 'positive', '😚': 'positive',
+    '😋': 'positive', '😛': 'positive', '😜': 'positive', '🤪': 'positive',
+    '😝': 'positive', '🤗': 'positive', '🤩': 'positive', '🥳': 'positive',
+    '👍': 'positive', '👌': 'positive', '✌️': 'positive', '🤟': 'positive',
+    '🤘': 'positive', '💪': 'positive', '👏': 'positive', '🙌': 'positive',
+    '❤️': 'positive', '🧡': 'positive', '💛': 'positive', '💚': 'positive',
+    '💙': 'positive', '💜': 'positive', '🖤': 'positive', '🤍': 'positive',
+    '🤎': 'positive', '💕': 'positive', '💖': 'positive', '✨': 'positive',
+    '⭐': 'positive', '🌟': 'positive', '💫': 'positive', '🎉': 'positive',
+    '🎊': 'positive', '🎈': 'positive', '🎁': 'positive', '🏆': 'positive',
+
+    # Negative emojis
+    '😞': 'negative', '😔': 'negative', '😟': 'negative', '😕': 'negative',
+    '🙁': 'negative', '☹️': 'negative', '😣': 'negative', '😖': 'negative',
+    '😫': 'negative', '😩': 'negative', '🥺': 'negative', '😢': 'negative',
+    '😭': 'negative', '😤': 'negative', '😠': 'negative', '😡': 'negative',
+    '🤬': 'negative', '😰': 'negative', '😥': 'negative', '😓': 'negative',
+    '🤯': 'negative', '😱': 'negative', '😨': 'negative', '👎': 'negative',
+    '💔': 'negative', '🚫': 'negative', '❌': 'negative', '⛔': 'negative',
+    '🛑': 'negative',
+
+    # Neutral emojis
+    '😐': 'neutral', '😑': 'neutral', '😶': 'neutral', '🙄': 'neutral',
+    '🤔': 'neutral', '🤨': 'neutral', '😏': 'neutral', '😒': 'neutral',
+    '😬': 'neutral', '🤐': 'neutral', '😷': 'neutral', '🤒': 'neutral',
+    '🤕': 'neutral', '😵': 'neutral', '🥴': 'neutral', '😪': 'neutral',
+    '😴': 'neutral', '💤': 'neutral', '🤷': 'neutral', '🤦': 'neutral'
+}
+
+# Replacement text for each emoji run in with_emoji_tokens
+EMOJI_TOKENS = {emoji: f' {sentiment}_emoji ' for emoji, sentiment in EMOJI_SENTIMENTS.items()}
+UNKNOWN_EMOJI_TOKEN = ' emoji '
+
+# contractions.fix matches only between characters outside this class
+_WORD_BOUNDARY = '[A-Za-z0-9_]'
+
+NormalizedText = namedtuple('NormalizedText', ['cleaned', 'without_emojis', 'with_emoji_tokens', 'emojis'])
+
+
+def trie_pattern(words):
+    """Regex alternation over ``words`` factored as a trie; prefers the longest word"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+def _match_case(word, replacement):
+    """textsearch's case transfer: the replacement takes the case pattern of the matched word"""
+    if word == word.upper():
+        return replacement.upper()
+    if word == word.title():
+        return replacement.title()
+    if word == word.lower():
+        return replacement.lower()
+    if word == word[0].upper() + word[1:].lower():
+        return replacement[0].upper() + replacement[1:].lower()
+    return replacement
+
+
+def emoji_sentiment_analysis(emojis):
+    """EmojiProcessor.analyze_emoji_sentiment from already extracted emoji runs"""
+    if not emojis:
+        return {
+            'has_emojis': False,
+            'emoji_count': 0,
+            'emoji_sentiment': None,
+            'emoji_sentiment_score': 0
+        }
+
+    sentiment_counts = {'positive': 0, 'negative': 0, 'neutral': 0}
+    for emoji in emojis:
+        sentiment_counts[EMOJI_SENTIMENTS.get(emoji, 'neutral')] += 1
+
+    total_emojis = sum(sentiment_counts.values())
+    return {
+        'has_emojis': True,
+        'emoji_count': total_emojis,
+        'emoji_sentiment': max(sentiment_counts, key=sentiment_counts.get),
+        'emoji_sentiment_score': (sentiment_counts['positive'] - sentiment_counts['negative']) / total_emojis,
+        'emoji_breakdown': sentiment_counts,
+        'emojis_found': emojis
+    }
+
+
+class TextNormalizer:
+    """Precompiled cleaning, emoji and contraction handling producing every text variant"""
+
+    def __init__(self, cache_size=4096):
+        self._contraction_pattern = None
+        self._contraction_table = None
+        self._lock = threading.Lock()
+        # Single-review pipeline methods strip the same text several times
+        self._emoji_variants = lru_cache(maxsize=cache_size)(self._scan_emojis)
+
+    def _contractions(self):
+        """Pattern and table equivalent to contractions.fix(leftovers=True, slang=True), built on first use"""
+        if self._contraction_pattern is None:
+            with self._lock:
+                if self._contraction_pattern is None:
+                    import contractions
+                    table = {}
+                    # Same precedence as the package's replacer: later tables win
+                    for source in (contractions.contractions_dict, contractions.leftovers_dict, contractions.slang_dict):
+                        for key, value in source.items():
+                            table[key.lower()] = value
+                    self._contraction_table = table
+                    self._contraction_pattern = re.compile(
+                        f'(?<!{_WORD_BOUNDARY})(?:{trie_pattern(table)})(?!{_WORD_BOUNDARY})'
+                    )
+        return self._contraction_pattern, self._contraction_table
+
+    def expand_contractions(self, text):
+        """contractions.fix(text) in one regex pass"""
+        pattern, table = self._contractions()
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Lowercasing changed offsets; let the package handle the odd characters
+            import contractions
+            return contractions.fix(text)
+        if lowered == text:
+            return pattern.sub(lambda match: table[match.group()].lower(), text)
+        pieces = []
+        position = 0
+        for match in pattern.finditer(lowered):
+            start, end = match.span()
+            pieces.append(text[position:start])
+            pieces.append(_match_case(text[start:end], table[match.group()]))
+            position = end
+        pieces.append(text[position:])
+        return ''.join(pieces)
+
+    def clean(self, text):
+        """TextPreprocessor cleaning: lowercase, strip URLs/emails/emojis, expand contractions"""
+        text = text.lower()
+        if '://' in text:
+            text = URL_PATTERN.sub('', text)
+        if '@' in text:
+            text = EMAIL_PATTERN.sub('', text)
+        if not text.isascii():
+            text = CLEANING_EMOJI_PATTERN.sub('', text)
+        text = self.expand_contractions(text)
+        return ' '.join(text.split())
+
+    def find_emojis(self, text):
+        """EmojiProcessor.extract_emojis"""
+        if not text or text.isascii():
+            return []
+        return list(self._emoji_variants(text)[2])
+
+    def strip_emojis(self, text):
+        """EmojiProcessor.remove_emojis"""
+        if not text:
+            return text
+        return self._emoji_variants(text)[0]
+
+    def replace_emojis(self, text):
+        """EmojiProcessor.replace_emojis_with_text"""
+        if not text:
+            return text
+        return self._emoji_variants(text)[1]
+
+    def normalize(self, text):
+        """Every variant of a review text"""
+        without_emojis, with_emoji_tokens, emojis = self._emoji_variants(text)
+        return NormalizedText(self.clean(text), without_emojis, with_emoji_tokens, list(emojis))
+
+    def _scan_emojis(self, text):
+        """(without_emojis, with_emoji_tokens, emojis) from one scan for emoji runs"""
+        if text.isascii():
+            return text.strip(), ' '.join(text.split()), ()
+
+        stripped = []
+        replaced = []
+        emojis = []
+        position = 0
+        for match in EMOJI_PATTERN.finditer(text):
+            start, end = match.span()
+            emoji = match.group()
+            stripped.append(text[position:start])
+            replaced.append(text[position:start])
+            stripped.append(' ')
+            replaced.append(EMOJI_TOKENS.get(emoji, UNKNOWN_EMOJI_TOKEN))
+            emojis.append(emoji)
+            position = end
+        stripped.append(text[position:])
+        replaced.append(text[position:])
+
+        if self._runs_nest(emojis):
+            with_emoji_tokens = self._replace_sequentially(text, emojis)
+        else:
+            with_emoji_tokens = ' '.join(''.join(replaced).split())
+        return ''.join(stripped).strip(), with_emoji_tokens, tuple(emojis)
+
+    @staticmethod
+    def _runs_nest(emojis):
+        """Whether one distinct emoji run occurs inside another"""
+        distinct = set(emojis)
+        return len(distinct) > 1 and any(a != b and a in b for a in distinct for b in distinct)
+
+    @staticmethod
+    def _replace_sequentially(text, emojis):
+        # str.replace in extraction order, as replace_emojis_with_text always did: a
+        # run that also occurs inside a longer run is replaced there too
+        for emoji in emojis:
+            text = text.replace(emoji, EMOJI_TOKENS.get(emoji, UNKNOWN_EMOJI_TOKEN))
+        return ' '.join(text.split())
+
+
+_normalizer = None
+_normalizer_lock = threading.Lock()
+
+
+def get_text_normalizer():
+    """Return the process-wide text normalizer"""
+    global _normalizer
+    if _normalizer is None:
+        with _normalizer_lock:
+            if _normalizer is None:
+                _normalizer = TextNormalizer()
+    return _normalizer
@@ -2,18 +2,19 @@
 
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import LatentDirichletAllocation, NMF
-from sklearn.cluster import KMeans
-import spacy
 from collections import defaultdict
 import re
+from .spacy_provider import get_spacy
 
 class TopicExtractor:
     def __init__(self, n_topics=10):
+        # sklearn is imported here rather than on module import
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.decomposition import LatentDirichletAllocation, NMF
+
         self.n_topics = n_topics
-        # Initialize spaCy model
-        self.nlp = spacy.load('en_core_web_sm')
+        # Shared spaCy model; aspect pairs read pos_ and the dependency head
+        self.nlp = get_spacy(('tagger', 'attribute_ruler', 'parser'))
         
         # Initialize vectorizer
         self.vectorizer = TfidfVectorizer(
@@ -104,6 +105,31 @@ class TopicExtractor:
         
         return dict(aspects)
     
+    def extract_aspects_batch(self, texts, docs=None, batch_size=256):
+        """
+        ``extract_aspects([text])`` for each text, parsed with one ``nlp.pipe`` call.
+
+        ``docs`` may hold already parsed Docs for the lowercased texts
+        (tagger and parser run), e.g. shared with the other stages.
+        """
+        valid = [text for text in texts if text and isinstance(text, str)]
+        if docs is None:
+            docs = self.nlp.pipe([text.lower() for text in valid], batch_size=batch_size)
+        docs = iter(docs)
+
+        results = []
+        for text in texts:
+            aspects = defaultdict(list)
+            if text and isinstance(text, str):
+                for aspect, opinion in self._extract_aspect_opinion_pairs(next(docs)):
+                    aspects[self._categorize_aspect(aspect)].append({
+                        'aspect': aspect,
+                        'opinion': opinion,
+                        'text': text
+                    })
+            results.append(dict(aspects))
+        return results
+    
     def _extract_aspect_opinion_pairs(self, doc):
         """Extract aspect-opinion pairs using dependency parsing"""
         pairs = []
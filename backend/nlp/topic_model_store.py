@@ -0,0 +1,205 @@
+# backend/nlp/topic_model_store.py
+"""
+Versioned, persisted BERTopic model for assigning topics at ingest.
+
+A model is fit offline on stored review embeddings
+(scripts/refit_topic_model.py) and published under TOPIC_MODELS_DIR:
+
+    <version>/      BERTopic.save(..., serialization='safetensors')
+    <version>/meta.json
+    CURRENT         name of the version in use
+
+Publishing writes the new version directory first and then swaps CURRENT
+with os.replace. Running processes notice the change on their next
+assignment and load the new version; until it has loaded they keep using
+the old one. A safetensors model has no UMAP/HDBSCAN state, so transform
+is a cosine similarity against the topic embeddings. That keeps
+per-review assignment to a single matrix product.
+"""
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOPIC_MODELS_DIR = os.environ.get('NLP_TOPIC_MODELS_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'topic_models'
+)
+
+TOPIC_WORDS = 5
+
+
+def topic_vectorizer():
+    """Vectorizer for topic words: topics are fit on raw review text, so English stop words are dropped"""
+    from sklearn.feature_extraction.text import CountVectorizer
+    return CountVectorizer(stop_words='english')
+
+
+def fit_topic_model(texts, embeddings, min_topic_size=10, nr_topics='auto', embedding_model=None):
+    """Fit BERTopic on precomputed embeddings of the same texts; returns (model, topics)"""
+    from bertopic import BERTopic
+    model = BERTopic(
+        embedding_model=embedding_model,
+        vectorizer_model=topic_vectorizer(),
+        nr_topics=nr_topics,
+        min_topic_size=min_topic_size
+    )
+    topics, _ = model.fit_transform(list(texts), embeddings=np.asarray(embeddings, dtype=np.float32))
+    return model, topics
+
+
+class PublishedTopicModel:
+    """A loaded model version and its topic words"""
+
+    def __init__(self, version, model, meta):
+        self.version = version
+        self.model = model
+        self.meta = meta
+        self.topic_words = {
+            int(topic_id): [word for word, _ in (model.get_topic(topic_id) or [])[:TOPIC_WORDS] if word]
+            for topic_id in model.get_topics()
+        }
+
+    @property
+    def embedding_model(self):
+        return self.meta.get('embedding_model')
+
+    def assign(self, texts, embeddings):
+        """Review.topics value for each text, from its sentence embedding"""
+        texts = list(texts)
+        if not texts:
+            return []
+        topics, probs = self.model.transform(texts, embeddings=np.asarray(embeddings, dtype=np.float32))
+        probs = np.asarray(probs if probs is not None else np.zeros(len(texts)))
+        if probs.ndim == 2:
+            probs = probs.max(axis=1)
+
+        results = []
+        for topic_id, probability in zip(topics, probs):
+            topic_id = int(topic_id)
+            results.append({
+                'topic_id': topic_id,
+                'topic_words': self.topic_words.get(topic_id, []) if topic_id != -1 else [],
+                'probability': round(float(probability), 4),
+                'model_version': self.version
+            })
+        return results
+
+
+class TopicModelStore:
+    """Published topic model versions in a directory, with an atomically swapped CURRENT pointer"""
+
+    def __init__(self, directory=TOPIC_MODELS_DIR):
+        self.directory = directory
+        self.current_path = os.path.join(directory, 'CURRENT')
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._current_mtime = None
+
+    def current_version(self):
+        try:
+            with open(self.current_path) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def current(self):
+        """The published model (reloaded after a swap), or None if nothing is published"""
+        try:
+            mtime = os.stat(self.current_path).st_mtime_ns
+        except FileNotFoundError:
+            return self._loaded
+        if mtime == self._current_mtime:
+            return self._loaded
+
+        with self._lock:
+            if mtime != self._current_mtime:
+                version = self.current_version()
+                if version and (self._loaded is None or self._loaded.version != version):
+                    try:
+                        self._loaded = self.load(version)
+                        logger.info(f"Loaded topic model {version} ({len(self._loaded.topic_words)} topics)")
+                    except Exception as e:
+                        # Keep serving the previous version
+                        logger.error(f"Could not load topic model {version}: {e}")
+                self._current_mtime = mtime
+        return self._loaded
+
+    def load(self, version):
+        path = os.path.join(self.directory, version)
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        from bertopic import BERTopic
+        return PublishedTopicModel(version, BERTopic.load(path), meta)
+
+    def publish(self, model, meta=None, keep=3):
+        """Save a fitted model as a new version and make it current; returns the version"""
+        os.makedirs(self.directory, exist_ok=True)
+        version = time.strftime('%Y%m%d-%H%M%S', time.gmtime())
+        suffix = 1
+        while os.path.exists(os.path.join(self.directory, version)):
+            version = f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}-{suffix}"
+            suffix += 1
+
+        tmp_path = os.path.join(self.directory, f".{version}.tmp")
+        model.save(tmp_path, serialization='safetensors', save_ctfidf=True, save_embedding_model=False)
+        meta = dict(meta or {}, version=version, created_at=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()))
+        meta.setdefault('num_topics', len([t for t in model.get_topics() if t != -1]))
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.rename(tmp_path, os.path.join(self.directory, version))
+
+        pointer_tmp = self.current_path + '.tmp'
+        with open(pointer_tmp, 'w') as f:
+            f.write(version)
+        os.replace(pointer_tmp, self.current_path)
+        logger.info(f"Published topic model {version}")
+
+        if keep:
+            self.prune(keep)
+        return version
+
+    def versions(self):
+        """Published versions, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if not name.startswith('.') and os.path.isfile(os.path.join(self.directory, name, 'meta.json'))
+        )
+
+    def prune(self, keep=3):
+        """Delete all but the newest ``keep`` versions (never the current one)"""
+        current = self.current_version()
+        for version in self.versions()[:-keep]:
+            if version != current:
+                shutil.rmtree(os.path.join(self.directory, version), ignore_errors=True)
+
+    def stats(self):
+        loaded = self._loaded
+        return {
+            'current_version': self.current_version(),
+            'loaded_version': loaded.version if loaded else None,
+            'num_topics': loaded.meta.get('num_topics') if loaded else None,
+            'versions': self.versions()
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_topic_model_store():
+    """Process-wide store in TOPIC_MODELS_DIR"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TopicModelStore()
+    return _store
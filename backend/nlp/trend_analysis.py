@@ -3,7 +3,6 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from sklearn.linear_model import LinearRegression
 
 class TrendAnalyzer:
     def __init__(self):
@@ -84,6 +83,7 @@ class TrendAnalyzer:
         x = np.arange(len(positive_values)).reshape(-1, 1)
         y = positive_values.reshape(-1, 1)
         
+        from sklearn.linear_model import LinearRegression
         model = LinearRegression()
         model.fit(x, y)
         
@@ -0,0 +1,86 @@
+# backend/scripts/add_duplicate_columns.py
+"""
+Migration script to add near-duplicate columns (duplicate_of, duplicate_analysis) to reviews table
+"""
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+import os
+import sys
+
+# Add parent directory to path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+COLUMNS = {
+    'duplicate_of': 'INTEGER',
+    'duplicate_analysis': 'JSON'
+}
+
+def existing_columns(conn, database_url):
+    """Column names of the reviews table, or None for an unsupported database"""
+    # For SQLite
+    if 'sqlite' in database_url:
+        result = conn.execute(text("PRAGMA table_info(reviews)"))
+        return {row[1] for row in result}
+    
+    # For PostgreSQL
+    if 'postgresql' in database_url:
+        result = conn.execute(text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name='reviews'
+        """))
+        return {row[0] for row in result}
+    
+    # For MySQL
+    if 'mysql' in database_url:
+        result = conn.execute(text("""
+            SELECT COLUMN_NAME 
+            FROM INFORMATION_SCHEMA.COLUMNS 
+            WHERE TABLE_SCHEMA = DATABASE() 
+            AND TABLE_NAME = 'reviews'
+        """))
+        return {row[0] for row in result}
+    
+    return None
+
+def add_duplicate_columns():
+    """Add duplicate_of (and its index) and duplicate_analysis to reviews table if they don't exist"""
+    
+    # Create engine
+    DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///ecommerce_reviews.db')
+    engine = create_engine(DATABASE_URL)
+    
+    try:
+        with engine.connect() as conn:
+            columns = existing_columns(conn, DATABASE_URL)
+            if columns is None:
+                print(f"Unsupported database: {DATABASE_URL}")
+                return False
+            
+            missing = [name for name in COLUMNS if name not in columns]
+            if not missing:
+                print("Duplicate columns already exist.")
+                return True
+            
+            for name in missing:
+                print(f"Adding {name} column to reviews table...")
+                conn.execute(text(f"ALTER TABLE reviews ADD COLUMN {name} {COLUMNS[name]}"))
+            if 'duplicate_of' in missing:
+                conn.execute(text("CREATE INDEX ix_reviews_duplicate_of ON reviews (duplicate_of)"))
+            conn.commit()
+            print("Columns added successfully! Run scripts/build_duplicate_index.py --score to fill them.")
+                    
+    except OperationalError as e:
+        print(f"Error adding columns: {e}")
+        return False
+    
+    return True
+
+if __name__ == "__main__":
+    success = add_duplicate_columns()
+    if success:
+        print("Migration completed successfully!")
+    else:
+        print("Migration failed!")
+        sys.exit(1)
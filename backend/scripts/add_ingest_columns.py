@@ -0,0 +1,90 @@
+# backend/scripts/add_ingest_columns.py
+"""
+Migration script to add ingest retry columns (nlp_profile, processing_attempts) to reviews table
+"""
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+import os
+import sys
+
+# Add parent directory to path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+COLUMNS = {
+    'nlp_profile': 'VARCHAR(50)',
+    'processing_attempts': 'INTEGER DEFAULT 0'
+}
+
+def existing_columns(conn, database_url):
+    """Column names of the reviews table, or None for an unsupported database"""
+    # For SQLite
+    if 'sqlite' in database_url:
+        result = conn.execute(text("PRAGMA table_info(reviews)"))
+        return {row[1] for row in result}
+    
+    # For PostgreSQL
+    if 'postgresql' in database_url:
+        result = conn.execute(text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name='reviews'
+        """))
+        return {row[0] for row in result}
+    
+    # For MySQL
+    if 'mysql' in database_url:
+        result = conn.execute(text("""
+            SELECT COLUMN_NAME 
+            FROM INFORMATION_SCHEMA.COLUMNS 
+            WHERE TABLE_SCHEMA = DATABASE() 
+            AND TABLE_NAME = 'reviews'
+        """))
+        return {row[0] for row in result}
+    
+    return None
+
+def add_ingest_columns():
+    """Add nlp_profile and processing_attempts to reviews table if they don't exist"""
+    
+    # Create engine
+    DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///ecommerce_reviews.db')
+    engine = create_engine(DATABASE_URL)
+    
+    try:
+        with engine.connect() as conn:
+            columns = existing_columns(conn, DATABASE_URL)
+            if columns is None:
+                print(f"Unsupported database: {DATABASE_URL}")
+                return False
+            
+            missing = [name for name in COLUMNS if name not in columns]
+            if not missing:
+                print("Ingest columns already exist.")
+                return True
+            
+            for name in missing:
+                print(f"Adding {name} column to reviews table...")
+                conn.execute(text(f"ALTER TABLE reviews ADD COLUMN {name} {COLUMNS[name]}"))
+            if 'processing_attempts' in missing:
+                # Existing reviews were analyzed once (or are still pending)
+                conn.execute(text(
+                    "UPDATE reviews SET processing_attempts = "
+                    "CASE WHEN processing_status = 'pending' THEN 0 ELSE 1 END"
+                ))
+            conn.commit()
+            print("Columns added successfully!")
+                    
+    except OperationalError as e:
+        print(f"Error adding columns: {e}")
+        return False
+    
+    return True
+
+if __name__ == "__main__":
+    success = add_ingest_columns()
+    if success:
+        print("Migration completed successfully!")
+    else:
+        print("Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,76 @@
+# backend/scripts/add_processing_status_column.py
+"""
+Migration script to add processing_status column to reviews table
+"""
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+import os
+import sys
+
+# Add parent directory to path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+def add_processing_status_column():
+    """Add processing_status column (and its index) to reviews table if it doesn't exist"""
+    
+    # Create engine
+    DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///ecommerce_reviews.db')
+    engine = create_engine(DATABASE_URL)
+    
+    try:
+        with engine.connect() as conn:
+            # For SQLite
+            if 'sqlite' in DATABASE_URL:
+                result = conn.execute(text("PRAGMA table_info(reviews)"))
+                exists = 'processing_status' in [row[1] for row in result]
+            
+            # For PostgreSQL
+            elif 'postgresql' in DATABASE_URL:
+                result = conn.execute(text("""
+                    SELECT column_name 
+                    FROM information_schema.columns 
+                    WHERE table_name='reviews' AND column_name='processing_status'
+                """))
+                exists = result.rowcount > 0
+            
+            # For MySQL
+            elif 'mysql' in DATABASE_URL:
+                result = conn.execute(text("""
+                    SELECT COLUMN_NAME 
+                    FROM INFORMATION_SCHEMA.COLUMNS 
+                    WHERE TABLE_SCHEMA = DATABASE() 
+                    AND TABLE_NAME = 'reviews' 
+                    AND COLUMN_NAME = 'processing_status'
+                """))
+                exists = result.rowcount > 0
+            
+            else:
+                print(f"Unsupported database: {DATABASE_URL}")
+                return False
+            
+            if exists:
+                print("processing_status column already exists.")
+                return True
+            
+            # Existing reviews were analyzed synchronously, so they are complete
+            print("Adding processing_status column to reviews table...")
+            conn.execute(text("ALTER TABLE reviews ADD COLUMN processing_status VARCHAR(20) DEFAULT 'complete'"))
+            conn.execute(text("UPDATE reviews SET processing_status = 'complete' WHERE processing_status IS NULL"))
+            conn.execute(text("CREATE INDEX ix_reviews_processing_status ON reviews (processing_status)"))
+            conn.commit()
+            print("Column added successfully!")
+                    
+    except OperationalError as e:
+        print(f"Error adding column: {e}")
+        return False
+    
+    return True
+
+if __name__ == "__main__":
+    success = add_processing_status_column()
+    if success:
+        print("Migration completed successfully!")
+    else:
+        print("Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,58 @@
+# backend/scripts/backfill_embeddings.py
+"""
+Encode stored reviews into the embedding store.
+
+Reviews that already have an embedding from the current sentence model are
+skipped, so the script can be re-run at any time. After a model upgrade it
+re-encodes everything (the store empties itself on a version change).
+
+Usage: python scripts/backfill_embeddings.py [--chunk-size 1024] [--batch-size 64]
+"""
+import sys
+import os
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from database.connection import engine
+from database.models import Review
+from nlp.embedding_store import get_embedding_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill review sentence embeddings")
+    parser.add_argument('--chunk-size', type=int, default=1024, help="Reviews read per query")
+    parser.add_argument('--batch-size', type=int, default=64, help="Sentence model batch size")
+    args = parser.parse_args()
+
+    from nlp.advanced_pipeline import get_shared_pipeline
+    pipeline = get_shared_pipeline()
+    store = get_embedding_store()
+
+    start = time.perf_counter()
+    last_id = 0
+    seen = encoded = 0
+    while True:
+        stmt = select(Review.id, Review.review_text).where(Review.id > last_id).order_by(Review.id).limit(args.chunk_size)
+        with engine.connect() as conn:
+            rows = conn.execute(stmt).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        seen += len(rows)
+
+        before = len(store)
+        pipeline.embed_reviews([row.id for row in rows], [row.review_text for row in rows], args.batch_size, store=store)
+        encoded += len(store) - before
+
+        elapsed = time.perf_counter() - start
+        print(f"{seen} reviews checked, {encoded} encoded ({encoded / elapsed:.1f}/s)", end='\r', flush=True)
+
+    print(f"\nDone in {time.perf_counter() - start:.1f}s: {store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
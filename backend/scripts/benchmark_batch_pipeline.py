@@ -0,0 +1,87 @@
+# backend/scripts/benchmark_batch_pipeline.py
+"""
+Benchmark AdvancedNLPPipeline.process_reviews throughput on CPU.
+
+Reports reviews/sec for batch sizes 1, 8, 32 and 128 over the same sample of
+reviews from the bundled dataset, plus a parity check of the batched output
+against process_review.
+
+Usage: python scripts/benchmark_batch_pipeline.py [num_reviews]
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import torch
+
+from nlp.advanced_pipeline import AdvancedNLPPipeline
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+BATCH_SIZES = [1, 8, 32, 128]
+
+
+def load_sample(num_reviews):
+    """Load a fixed sample of review texts with their product categories"""
+    df = pd.read_csv(DATASET_PATH).head(num_reviews)
+    texts = df['review_text'].astype(str).tolist()
+    product_infos = [{'category': category} for category in df['category']]
+    return texts, product_infos
+
+
+def run_batched(pipeline, texts, product_infos, batch_size):
+    """Process all texts in chunks of batch_size and return elapsed seconds"""
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        pipeline.process_reviews(
+            texts[i:i + batch_size],
+            product_infos[i:i + batch_size],
+            batch_size=batch_size
+        )
+    return time.perf_counter() - start
+
+
+def check_parity(pipeline, texts, product_infos, sample_size=16):
+    """Compare batched output with process_review on a few reviews"""
+    batched = pipeline.process_reviews(texts[:sample_size], product_infos[:sample_size])
+    mismatches = 0
+    max_delta = 0.0
+    for text, info, batch_result in zip(texts, product_infos, batched):
+        single = pipeline.process_review(text, info)
+        if single['sentiment_analysis']['primary_sentiment'] != batch_result['sentiment_analysis']['primary_sentiment']:
+            mismatches += 1
+        if single['emotions']['primary_emotion'] != batch_result['emotions']['primary_emotion']:
+            mismatches += 1
+        for label, score in single['sentiment_analysis']['sentiment_scores'].items():
+            delta = abs(score - batch_result['sentiment_analysis']['sentiment_scores'][label])
+            max_delta = max(max_delta, delta)
+    return mismatches, max_delta
+
+
+def main():
+    num_reviews = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    texts, product_infos = load_sample(num_reviews)
+
+    print(f"Torch threads: {torch.get_num_threads()}")
+    pipeline = AdvancedNLPPipeline()
+
+    # Warm up every model once so load time is not measured
+    pipeline.process_reviews(texts[:8], product_infos[:8], batch_size=8)
+
+    mismatches, max_delta = check_parity(pipeline, texts, product_infos)
+    print(f"Parity: {mismatches} label mismatches, max sentiment score delta {max_delta:.2e}")
+
+    print(f"\n{'batch size':>10} | {'seconds':>8} | {'reviews/sec':>11}")
+    print(f"{'-' * 10}-+-{'-' * 8}-+-{'-' * 11}")
+    for batch_size in BATCH_SIZES:
+        elapsed = run_batched(pipeline, texts, product_infos, batch_size)
+        print(f"{batch_size:>10} | {elapsed:>8.2f} | {len(texts) / elapsed:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# backend/scripts/benchmark_near_duplicates.py
+"""
+Near-duplicate check latency against a large index.
+
+Indexes num_reviews synthetic reviews: dataset reviews from random users,
+with one word in five replaced with some probability. Then it times the
+check + add of the reviews in the last 1% (or 10000). It reports
+p50/p95/p99 latency per review, indexing throughput and the memory held by
+signatures.
+
+Usage: python scripts/benchmark_near_duplicates.py [num_reviews] [mutation_rate]
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from nlp.near_duplicates import NearDuplicateIndex
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+
+
+def synthetic_reviews(texts, count, mutation_rate, rng):
+    """Dataset reviews, a share of them with every fifth word replaced"""
+    vocabulary = sorted({word for text in texts for word in text.split()})
+    for _ in range(count):
+        words = texts[rng.integers(len(texts))].split()
+        if rng.random() < mutation_rate:
+            for position in range(0, len(words), 5):
+                words[position] = vocabulary[rng.integers(len(vocabulary))]
+        yield ' '.join(words)
+
+
+def main():
+    num_reviews = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    mutation_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+
+    df = pd.read_csv(DATASET_PATH)
+    texts = df['review_text'].astype(str).tolist()
+    rng = np.random.default_rng(0)
+    index = NearDuplicateIndex(path=None)
+
+    timed_from = num_reviews - max(min(num_reviews // 100, 10000), 1)
+    latency = []
+    duplicates = 0
+    start = time.perf_counter()
+    for review_id, text in enumerate(synthetic_reviews(texts, num_reviews, mutation_rate, rng), start=1):
+        user_id = int(rng.integers(num_reviews // 5 + 1))
+        if review_id > timed_from:
+            check_start = time.perf_counter()
+            analysis = index.observe(review_id, text, user_id)
+            latency.append(time.perf_counter() - check_start)
+        else:
+            analysis = index.observe(review_id, text, user_id)
+        duplicates += analysis['duplicate_of'] is not None
+        if review_id % 100000 == 0:
+            print(f"{review_id} reviews indexed ({review_id / (time.perf_counter() - start):.0f}/s)", flush=True)
+    seconds = time.perf_counter() - start
+
+    latency = np.array(latency) * 1000
+    stats = index.stats()
+    print(f"\n{num_reviews} reviews indexed in {seconds:.1f}s ({num_reviews / seconds:.0f}/s)")
+    print(f"near-duplicates: {duplicates} ({duplicates / num_reviews:.1%}), "
+          f"{stats['duplicate_clusters']} clusters, {stats['spam_rings']} spam rings")
+    print(f"signatures: {len(index) * index.num_perm * 4 / 1024 / 1024:.0f} MB")
+    print(f"check + add over the last {len(latency)} reviews: "
+          f"p50 {np.percentile(latency, 50):.3f} ms | p95 {np.percentile(latency, 95):.3f} ms | "
+          f"p99 {np.percentile(latency, 99):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# backend/scripts/benchmark_nlp_pipeline_batch.py
+"""
+NLPPipeline throughput: process_single_review per row vs the columnar
+iter_batches path, plus a parity check between the two.
+
+The per-review path is timed on the first --sample reviews and
+extrapolated to the corpus; the batched path streams the whole corpus
+(the dataset repeated up to --size reviews) chunk by chunk, keeping only
+running totals, so its peak RSS reflects one chunk.
+
+Parity compares sentiment, confidence, entities, aspects and processed
+text on the sample. Token counts are not compared: the batched
+preprocessing takes tokens from spaCy lemmas rather than NLTK.
+
+Usage: python scripts/benchmark_nlp_pipeline_batch.py [--size 20000] [--sample 500] [--batch-size 1000]
+"""
+import sys
+import os
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from nlp.model_registry import MB, current_rss_bytes
+from nlp.pipeline import NLPPipeline
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+
+
+def build_corpus(size):
+    df = pd.read_csv(DATASET_PATH)[['review_id', 'review_text']]
+    repeats = size // len(df) + 1
+    return pd.concat([df] * repeats, ignore_index=True).head(size)
+
+
+def check_parity(single, batched):
+    mismatches = {'sentiment': 0, 'confidence': 0, 'entities': 0, 'aspects': 0, 'processed_text': 0}
+    for result, (_, row) in zip(single, batched.iterrows()):
+        if result['sentiment'] != row['sentiment']:
+            mismatches['sentiment'] += 1
+        if abs(result['sentiment_confidence'] - row['sentiment_confidence']) > 1e-3:
+            mismatches['confidence'] += 1
+        if result['entities'] != json.loads(row['entities']):
+            mismatches['entities'] += 1
+        if result['aspects'] != json.loads(row['aspects']):
+            mismatches['aspects'] += 1
+        if result['processed_text'] != row['processed_text']:
+            mismatches['processed_text'] += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NLPPipeline batch processing")
+    parser.add_argument('--size', type=int, default=20000)
+    parser.add_argument('--sample', type=int, default=500, help="Reviews timed on the per-review path")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size)
+    sample = corpus.head(min(args.sample, len(corpus)))
+    pipeline = NLPPipeline()
+    next(pipeline.iter_batches(corpus.head(50), batch_size=50))
+
+    start = time.perf_counter()
+    single = [pipeline.process_single_review(row.to_dict(), verbose=False) for _, row in sample.iterrows()]
+    single_seconds = (time.perf_counter() - start) / len(sample) * len(corpus)
+
+    parity = check_parity(single, pipeline.process_batch(sample, batch_size=args.batch_size))
+
+    rss_before = current_rss_bytes()
+    rss_peak = rss_before
+    rows = 0
+    positive = 0
+    start = time.perf_counter()
+    # Streamed in frames the size of a chunk, as a multi-million-row CSV would be read
+    frames = (corpus.iloc[i:i + args.batch_size] for i in range(0, len(corpus), args.batch_size))
+    for chunk in pipeline.iter_batches(frames, batch_size=args.batch_size):
+        rows += len(chunk)
+        positive += int((chunk['sentiment'] == 'positive').sum())
+        rss_peak = max(rss_peak, current_rss_bytes())
+    batch_seconds = time.perf_counter() - start
+
+    print(f"\n{len(corpus)} reviews, batch_size={args.batch_size}\n")
+    print(f"process_single_review  {single_seconds:8.1f} s  {len(corpus) / single_seconds:8.0f} reviews/s  "
+          f"(extrapolated from {len(sample)})")
+    print(f"iter_batches           {batch_seconds:8.1f} s  {rows / batch_seconds:8.0f} reviews/s  "
+          f"(peak RSS +{(rss_peak - rss_before) / MB:.0f} MB)")
+    print(f"speedup                {single_seconds / batch_seconds:8.1f}x")
+    print(f"positive share         {positive / max(rows, 1):.1%}")
+    print(f"\nmismatches on {len(sample)}: " + ', '.join(f"{name} {count}" for name, count in parity.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# backend/scripts/benchmark_pipeline_profiles.py
+"""
+Latency table for each AdvancedNLPPipeline profile.
+
+For every profile in nlp.profiles this measures cold model load time, the
+models that end up resident, and warm single-review latency (p50/p95 over
+the sample), using a fresh model registry per profile so loads are isolated.
+
+Usage: python scripts/benchmark_pipeline_profiles.py [num_reviews]
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from nlp.advanced_pipeline import AdvancedNLPPipeline
+from nlp.model_registry import build_default_registry
+from nlp.profiles import PIPELINE_PROFILES
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+
+
+def benchmark_profile(profile, texts, product_infos):
+    """Return load time, resident models and latency percentiles for one profile"""
+    pipeline = AdvancedNLPPipeline(registry=build_default_registry())
+
+    start = time.perf_counter()
+    pipeline.warm_up(profile)
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    for text, product_info in zip(texts, product_infos):
+        start = time.perf_counter()
+        pipeline.process_review(text, product_info, profile=profile)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    summary = pipeline.models.memory_summary()
+    return {
+        'profile': profile,
+        'load_seconds': load_seconds,
+        'models': [m['name'] for m in pipeline.models.resident_models() if m['loaded']],
+        'parameter_mb': summary['parameter_mb'],
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95))
+    }
+
+
+def main():
+    num_reviews = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    df = pd.read_csv(DATASET_PATH).head(num_reviews)
+    texts = df['review_text'].astype(str).tolist()
+    product_infos = [{'category': category} for category in df['category']]
+
+    rows = [benchmark_profile(profile, texts, product_infos) for profile in PIPELINE_PROFILES]
+
+    print(f"\n| {'profile':<26} | {'load s':>7} | {'params MB':>9} | {'p50 ms':>8} | {'p95 ms':>8} | models")
+    print(f"|{'-' * 28}|{'-' * 9}|{'-' * 11}|{'-' * 10}|{'-' * 10}|{'-' * 8}")
+    for row in rows:
+        print(
+            f"| {row['profile']:<26} | {row['load_seconds']:>7.1f} | {row['parameter_mb']:>9.0f} | "
+            f"{row['p50_ms']:>8.1f} | {row['p95_ms']:>8.1f} | {', '.join(row['models'])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
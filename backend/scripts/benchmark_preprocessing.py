@@ -0,0 +1,79 @@
+# backend/scripts/benchmark_preprocessing.py
+"""
+TextPreprocessor throughput: preprocess() per review vs preprocess_batch().
+
+The corpus is the dataset repeated up to --size reviews, which keeps its
+real share of repeated texts. With --unique every review gets a distinct
+suffix instead, so nothing is saved by de-duplication. The per-review
+path is timed on the first --sample reviews and extrapolated; the batch
+path runs on the whole corpus.
+
+Agreement reports how often both paths produce the same processed text
+and tokens on the sample (tokens differ only where NLTK would split a
+spaCy lemma further).
+
+Usage: python scripts/benchmark_preprocessing.py [--size 100000] [--sample 5000] [--batch-size 256] [--n-process 1] [--unique]
+"""
+import sys
+import os
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from nlp.preprocessing import TextPreprocessor
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+
+
+def build_corpus(size, unique):
+    texts = pd.read_csv(DATASET_PATH)['review_text'].astype(str).tolist()
+    corpus = (texts * (size // len(texts) + 1))[:size]
+    if unique:
+        corpus = [f"{text} review{i}" for i, text in enumerate(corpus)]
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark review preprocessing")
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--sample', type=int, default=5000, help="Reviews timed on the per-review path")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--n-process', type=int, default=1)
+    parser.add_argument('--unique', action='store_true', help="Make every review text distinct")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size, args.unique)
+    sample = corpus[:min(args.sample, len(corpus))]
+    preprocessor = TextPreprocessor()
+    preprocessor.preprocess_batch(corpus[:100], batch_size=args.batch_size)
+
+    start = time.perf_counter()
+    single = [preprocessor.preprocess(text) for text in sample]
+    single_seconds = (time.perf_counter() - start) / len(sample) * len(corpus)
+
+    start = time.perf_counter()
+    batch = preprocessor.preprocess_batch(corpus, batch_size=args.batch_size, n_process=args.n_process)
+    batch_seconds = time.perf_counter() - start
+
+    same_processed = sum(r['processed'] == p for r, p in zip(single, batch['processed']))
+    same_tokens = sum(r['tokens'] == t for r, t in zip(single, batch['tokens']))
+    distinct = len(set(batch['cleaned']))
+
+    print(f"\n{len(corpus)} reviews ({distinct} distinct after cleaning), "
+          f"batch_size={args.batch_size}, n_process={args.n_process}\n")
+    print(f"preprocess (per review)  {single_seconds:8.1f} s  {len(corpus) / single_seconds:8.0f} reviews/s  "
+          f"(extrapolated from {len(sample)})")
+    print(f"preprocess_batch         {batch_seconds:8.1f} s  {len(corpus) / batch_seconds:8.0f} reviews/s")
+    print(f"speedup                  {single_seconds / batch_seconds:8.1f}x")
+    print(f"\nagreement on {len(sample)}: processed {same_processed / len(sample):.1%}, "
+          f"tokens {same_tokens / len(sample):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# backend/scripts/benchmark_process_pool.py
+"""
+Scaling and memory of the forked pipeline worker pool.
+
+Runs the same reviews through AdvancedNLPPipeline in-process (all torch
+threads), then through PipelineProcessPool with 1, 2, 4, ... workers up to
+the core count. For every pool size it reports throughput, speedup over one
+worker, and per-worker memory. RSS counts the shared weights in every
+process. PSS splits them between the sharers. Private is what each worker
+really added.
+
+Usage: python scripts/benchmark_process_pool.py [num_reviews] [profile]
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from nlp.advanced_pipeline import AdvancedNLPPipeline
+from nlp.process_pool import PipelineProcessPool, process_memory
+from nlp.profiles import DEFAULT_PROFILE
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+
+
+def worker_counts():
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main():
+    num_reviews = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    profile = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PROFILE
+
+    df = pd.read_csv(DATASET_PATH).head(num_reviews)
+    texts = df['review_text'].astype(str).tolist()
+    product_infos = [{'category': category, 'brand': brand} for category, brand in zip(df['category'], df['brand'])]
+
+    pipeline = AdvancedNLPPipeline()
+    pipeline.warm_up(profile)
+    parent = process_memory(os.getpid())
+
+    # Warm-up so first-call overhead is not attributed to the in-process run
+    pipeline.process_reviews(texts[:8], product_infos[:8], profile=profile)
+    start = time.perf_counter()
+    pipeline.process_reviews(texts, product_infos, profile=profile)
+    in_process = len(texts) / (time.perf_counter() - start)
+
+    print(f"\n{len(texts)} reviews, profile {profile}, {os.cpu_count()} cores")
+    if parent:
+        print(f"Parent after loading models: RSS {parent['rss_mb']} MB")
+    print(f"In-process (all torch threads): {in_process:.1f} rev/s\n")
+
+    print(f"| {'workers':>7} | {'rev/s':>8} | {'speedup':>7} | {'RSS/worker':>10} | {'PSS/worker':>10} | {'private/worker':>14} | {'total PSS':>9}")
+    print(f"|{'-' * 9}|{'-' * 10}|{'-' * 9}|{'-' * 12}|{'-' * 12}|{'-' * 16}|{'-' * 11}")
+
+    single = None
+    for count in worker_counts():
+        with PipelineProcessPool(count, profile=profile, pipeline=pipeline) as pool:
+            pool.process_reviews(texts[:count * pool.chunk_size], product_infos[:count * pool.chunk_size])
+            start = time.perf_counter()
+            pool.process_reviews(texts, product_infos)
+            throughput = len(texts) / (time.perf_counter() - start)
+            workers = pool.worker_memory()
+
+        single = single or throughput
+        n = len(workers) or 1
+        rss = sum(w['rss_mb'] for w in workers) / n
+        pss = sum(w['pss_mb'] for w in workers) / n
+        private = sum(w['private_mb'] for w in workers) / n
+        total_pss = sum(w['pss_mb'] for w in workers) + (process_memory(os.getpid()) or {}).get('pss_mb', 0)
+        print(
+            f"| {count:>7} | {throughput:>8.1f} | {throughput / single:>6.2f}x | {rss:>7.0f} MB | "
+            f"{pss:>7.0f} MB | {private:>11.0f} MB | {total_pss:>6.0f} MB"
+        )
+
+    if parent:
+        print(f"\nN independent processes would hold about N x {parent['rss_mb']:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
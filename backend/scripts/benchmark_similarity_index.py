@@ -0,0 +1,128 @@
+# backend/scripts/benchmark_similarity_index.py
+"""
+Similar-review search: HNSW latency and recall@k against brute-force numpy.
+
+For each corpus size a temporary embedding store is filled, and the HNSW
+index is built from it (build time is reported). Queries are then answered
+both exactly and through the graph at several ef values, unfiltered and
+restricted to a random 10% of reviews (about one category).
+
+The dataset has far fewer reviews than the sizes benchmarked. The corpus
+is therefore made of the dataset's real sentence embeddings (or the
+stored ones) plus small Gaussian noise, renormalized. That keeps the
+cluster structure of real reviews while every vector stays distinct.
+
+Usage: python scripts/benchmark_similarity_index.py [--sizes 100000 1000000] [--k 10] [--queries 200]
+"""
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from nlp.embedding_store import EmbeddingStore, get_embedding_store
+from nlp.similarity_index import SimilarityIndex, exact_search
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+
+
+def base_embeddings():
+    """Real review embeddings: the stored ones, or the dataset encoded now"""
+    store = get_embedding_store()
+    if len(store) >= 1000:
+        return np.asarray(store.vectors(), dtype=np.float32)
+    from nlp.advanced_pipeline import AdvancedNLPPipeline
+    texts = pd.read_csv(DATASET_PATH)['review_text'].astype(str).tolist()
+    print(f"Encoding {len(texts)} dataset reviews...")
+    return AdvancedNLPPipeline().encode_sentences(texts)
+
+
+def perturb(base, rows, noise, rng):
+    vectors = base[rows] + rng.normal(scale=noise, size=(len(rows), base.shape[1])).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def timed(fn, queries):
+    results = []
+    latency = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(fn(query))
+        latency.append(time.perf_counter() - start)
+    return results, np.array(latency) * 1000
+
+
+def recall(truth, results):
+    return np.mean([
+        len({i for i, _ in expected} & {i for i, _ in found}) / max(len(expected), 1)
+        for expected, found in zip(truth, results)
+    ])
+
+
+def report(name, latency, recall_at_k=None):
+    recall_text = f"{recall_at_k * 100:7.2f}%" if recall_at_k is not None else f"{'exact':>8}"
+    print(f"| {name:<28} | {np.percentile(latency, 50):8.2f} | {np.percentile(latency, 95):8.2f} | {recall_text} |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the similar-review index")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--ef', type=int, nargs='+', default=[32, 64, 128, 256])
+    parser.add_argument('--noise', type=float, default=0.025, help="Per-dimension noise added to base embeddings")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    base = base_embeddings()
+    queries = perturb(base, rng.integers(0, len(base), args.queries), args.noise, rng)
+
+    for size in args.sizes:
+        directory = tempfile.mkdtemp(prefix='similarity_bench_')
+        try:
+            store = EmbeddingStore(os.path.join(directory, 'embeddings'))
+            store.ensure_model('benchmark', base.shape[1])
+            for offset in range(0, size, 100000):
+                count = min(100000, size - offset)
+                store.append(np.arange(offset + 1, offset + count + 1), perturb(base, rng.integers(0, len(base), count), args.noise, rng))
+
+            index = SimilarityIndex(store, os.path.join(directory, 'index'), save_every=0)
+            start = time.perf_counter()
+            index.sync()
+            build_seconds = time.perf_counter() - start
+
+            allowed = set(rng.choice(np.arange(1, size + 1), size // 10, replace=False).tolist())
+
+            print(f"\n{size} reviews, dim {base.shape[1]}, k={args.k}: HNSW build {build_seconds:.1f}s "
+                  f"({size / build_seconds:.0f} vectors/s)\n")
+            print(f"| {'search':<28} | {'p50 ms':>8} | {'p95 ms':>8} | {'recall':>8} |")
+            print(f"|{'-' * 30}|{'-' * 10}|{'-' * 10}|{'-' * 10}|")
+
+            truth, latency = timed(lambda q: exact_search(store, q, args.k), queries)
+            report('brute force', latency)
+            for ef in args.ef:
+                index.ef_search = ef
+                results, latency = timed(lambda q: index.search(q, args.k), queries)
+                report(f"hnsw ef={ef}", latency, recall(truth, results))
+
+            truth, latency = timed(lambda q: exact_search(store, q, args.k, allowed), queries)
+            report('brute force, 10% filter', latency)
+            for ef in args.ef:
+                index.ef_search = ef
+                results, latency = timed(lambda q: index.search(q, args.k, allowed_ids=allowed), queries)
+                report(f"hnsw ef={ef}, 10% filter", latency, recall(truth, results))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
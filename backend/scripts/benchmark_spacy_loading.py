@@ -0,0 +1,122 @@
+# backend/scripts/benchmark_spacy_loading.py
+"""
+spaCy load time and memory: one copy per component vs the shared provider.
+
+NLPPipeline used to build four components that each called
+spacy.load('en_core_web_sm'). Each mode runs in a fresh interpreter so RSS
+deltas are not mixed up:
+
+- separate: spacy.load once per component (the previous behaviour)
+- shared: every component asks nlp.spacy_provider for its components
+
+The shared run also parses a sample of reviews through each component's
+view and through the full pipeline, to show what the disabled components
+save per call.
+
+Usage: python scripts/benchmark_spacy_loading.py [--sample 2000]
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlp.model_registry import MB, current_rss_bytes
+from nlp.spacy_provider import DEFAULT_SPACY_MODEL, get_spacy_provider
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+
+# spaCy components each NLPPipeline component requests from the provider
+COMPONENT_REQUESTS = {
+    'TextPreprocessor': ('tagger', 'attribute_ruler', 'lemmatizer'),
+    'SentimentAnalyzer': ('tagger', 'attribute_ruler', 'parser'),
+    'TopicExtractor': ('tagger', 'attribute_ruler', 'parser'),
+    'EntityRecognizer': ('tagger', 'attribute_ruler', 'parser', 'ner'),
+}
+
+
+def run_separate():
+    import spacy
+    rss_before = current_rss_bytes()
+    start = time.perf_counter()
+    models = [spacy.load(DEFAULT_SPACY_MODEL) for _ in COMPONENT_REQUESTS]
+    return {
+        'copies': len(models),
+        'load_seconds': time.perf_counter() - start,
+        'rss_delta_mb': (current_rss_bytes() - rss_before) / MB
+    }
+
+
+def run_shared(sample):
+    import spacy  # imported first so import cost is not counted as load cost
+    import pandas as pd
+    provider = get_spacy_provider()
+    rss_before = current_rss_bytes()
+    start = time.perf_counter()
+    views = {component: provider.get(request) for component, request in COMPONENT_REQUESTS.items()}
+    result = {
+        'copies': len(provider.stats()['models']),
+        'load_seconds': time.perf_counter() - start,
+        'rss_delta_mb': (current_rss_bytes() - rss_before) / MB,
+        'parse': {}
+    }
+
+    texts = pd.read_csv(DATASET_PATH)['review_text'].astype(str).head(sample).tolist()
+    full = provider.load()
+    for name, nlp in [('full pipeline', full)] + list(views.items()):
+        nlp(texts[0])
+        start = time.perf_counter()
+        for text in texts:
+            nlp(text)
+        result['parse'][name] = {
+            'ms_per_review': (time.perf_counter() - start) / len(texts) * 1000,
+            'components': list(nlp.pipe_names)
+        }
+    return result
+
+
+def measure(mode, sample):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--mode', mode, '--sample', str(sample)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shared spaCy model loading")
+    parser.add_argument('--sample', type=int, default=2000, help="Reviews parsed per view")
+    parser.add_argument('--mode', choices=['separate', 'shared'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode == 'separate':
+        print(json.dumps(run_separate()))
+        return
+    if args.mode == 'shared':
+        print(json.dumps(run_shared(args.sample)))
+        return
+
+    separate = measure('separate', args.sample)
+    shared = measure('shared', args.sample)
+
+    print(f"\n{DEFAULT_SPACY_MODEL} for {len(COMPONENT_REQUESTS)} components\n")
+    print(f"| {'loading':<10} | {'copies':>6} | {'load s':>8} | {'RSS MB':>8} |")
+    print(f"|{'-' * 12}|{'-' * 8}|{'-' * 10}|{'-' * 10}|")
+    for name, result in [('separate', separate), ('shared', shared)]:
+        print(f"| {name:<10} | {result['copies']:>6} | {result['load_seconds']:8.2f} | {result['rss_delta_mb']:8.1f} |")
+
+    print(f"\nParse cost per review ({args.sample} reviews)\n")
+    baseline = shared['parse']['full pipeline']['ms_per_review']
+    for name, result in shared['parse'].items():
+        print(f"{name:<18} {result['ms_per_review']:7.3f} ms  {baseline / result['ms_per_review']:5.2f}x  "
+              f"{', '.join(result['components'])}")
+
+
+if __name__ == "__main__":
+    main()
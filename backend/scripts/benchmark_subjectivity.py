@@ -0,0 +1,86 @@
+# backend/scripts/benchmark_subjectivity.py
+"""
+Per-review TextBlob subjectivity vs the batched SubjectivityScorer.
+
+Scores the emoji-free text of each review three ways:
+
+- TextBlob, one review at a time (the previous code path)
+- SubjectivityScorer.score_texts (regex tokens)
+- SubjectivityScorer.score_docs (already-parsed spaCy Docs; parsing is not timed)
+
+For each batched path it reports throughput and agreement with TextBlob
+(exact-match rate, p99 and max absolute difference).
+
+Usage: python scripts/benchmark_subjectivity.py [num_reviews] [batch_size]
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import spacy
+from textblob import TextBlob
+
+from nlp.emoji_processor import EmojiProcessor
+from nlp.subjectivity import SubjectivityScorer
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+
+
+def batched(score, items, batch_size):
+    scores = []
+    for offset in range(0, len(items), batch_size):
+        scores.extend(score(items[offset:offset + batch_size]))
+    return scores
+
+
+def report(name, reference, scores, seconds, baseline_seconds):
+    delta = np.abs(np.array(reference) - np.array(scores))
+    print(
+        f"| {name:<22} | {len(scores) / seconds:>9.0f} | {baseline_seconds / seconds:>6.1f}x | "
+        f"{np.mean(delta < 1e-9) * 100:>6.2f}% | {np.quantile(delta, 0.99):>8.4f} | {delta.max():>8.4f}"
+    )
+
+
+def main():
+    num_reviews = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    emoji_processor = EmojiProcessor()
+    df = pd.read_csv(DATASET_PATH).head(num_reviews)
+    texts = [emoji_processor.remove_emojis(text) for text in df['review_text'].astype(str)]
+
+    # Tokenizer only: the pipeline reuses Docs it has already parsed
+    nlp = spacy.blank('en')
+    docs = list(nlp.pipe(texts))
+
+    scorer = SubjectivityScorer()
+    scorer.score_texts(texts[:batch_size])
+    scorer.score_docs(docs[:batch_size])
+
+    start = time.perf_counter()
+    reference = [TextBlob(text).sentiment.subjectivity for text in texts]
+    textblob_seconds = time.perf_counter() - start
+
+    print(f"\n{len(texts)} reviews, batch size {batch_size}\n")
+    print(f"| {'path':<22} | {'reviews/s':>9} | {'speedup':>7} | {'exact':>7} | {'p99 diff':>8} | {'max diff':>8}")
+    print(f"|{'-' * 24}|{'-' * 11}|{'-' * 9}|{'-' * 9}|{'-' * 10}|{'-' * 10}")
+    print(f"| {'TextBlob per review':<22} | {len(texts) / textblob_seconds:>9.0f} | {1.0:>6.1f}x | {'-':>7} | {'-':>8} | {'-':>8}")
+
+    start = time.perf_counter()
+    scores = batched(scorer.score_texts, texts, batch_size)
+    report('score_texts', reference, scores, time.perf_counter() - start, textblob_seconds)
+
+    start = time.perf_counter()
+    scores = batched(scorer.score_docs, docs, batch_size)
+    report('score_docs', reference, scores, time.perf_counter() - start, textblob_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# backend/scripts/benchmark_text_normalization.py
+"""
+Golden-output check and throughput of nlp.text_normalization.
+
+The reference functions below are the implementations TextNormalizer
+replaced: TextPreprocessor._basic_cleaning (regexes plus contractions.fix)
+and EmojiProcessor's extract/remove/replace/analyze. Every variant is
+compared on the dataset reviews and on copies of them with contractions
+(in lower, upper, title and sentence case), URLs, emails and emoji runs
+inserted, plus a list of edge cases. Any difference is printed and the
+script exits with status 1.
+
+Throughput compares the reference path (cleaning plus the four emoji calls
+a review used to need) with TextNormalizer.normalize.
+
+Usage: python scripts/benchmark_text_normalization.py [--augmented 20000] [--skip-benchmark]
+"""
+import sys
+import os
+import re
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contractions
+import pandas as pd
+
+from nlp.text_normalization import (
+    TextNormalizer, URL_PATTERN, EMAIL_PATTERN, CLEANING_EMOJI_PATTERN, EMOJI_PATTERN, EMOJI_SENTIMENTS,
+    emoji_sentiment_analysis
+)
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+
+EDGE_CASES = [
+    '', ' ', 'plain ascii text', "I can't believe it's not butter", "I CAN'T", "Can't stop",
+    "y'all won't", "they'd've", "it’s fine", "dont do it", "u r great", "r  ", "jan. 5th",
+    "o'clock", "rock 'n' roll", "'tis the season", "he's", "x'd", "gonna wanna", "b4 idk",
+    "Contact me@example.com or visit https://shop.example.com/item?id=5",
+    "me@site.comhttp://x", "😀", "😀😀", "😀 😀😀 😀", "❤️❤️", "❤️ and ❤", "👍🏽 great",
+    "🤩 amazing", "Ⓐ circled", "‍", "tab\tand\nnewline", "ÀÉÎ accents can't",
+    "İstanbul can't", "ﬁne ligature don't", "KELVIN K don't",
+]
+
+WIDE_EMOJIS = ['\U0001F929', '\U0001F44D\U0001F3FD', '❤️', '⭐', '\U0001F600', '☀', 'Ⓜ']
+
+
+# Reference implementations (as they were before nlp.text_normalization)
+
+def reference_basic_cleaning(text):
+    text = text.lower()
+    text = URL_PATTERN.sub('', text)
+    text = EMAIL_PATTERN.sub('', text)
+    text = CLEANING_EMOJI_PATTERN.sub(r'', text)
+    text = contractions.fix(text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def reference_extract_emojis(text):
+    if not text:
+        return []
+    return EMOJI_PATTERN.findall(text)
+
+
+def reference_remove_emojis(text):
+    if not text:
+        return text
+    return EMOJI_PATTERN.sub(' ', text).strip()
+
+
+def reference_replace_emojis_with_text(text):
+    if not text:
+        return text
+    result = text
+    for emoji in reference_extract_emojis(text):
+        if emoji in EMOJI_SENTIMENTS:
+            result = result.replace(emoji, f' {EMOJI_SENTIMENTS[emoji]}_emoji ')
+        else:
+            result = result.replace(emoji, ' emoji ')
+    return ' '.join(result.split())
+
+
+def reference_analyze_emoji_sentiment(text):
+    return emoji_sentiment_analysis(reference_extract_emojis(text))
+
+
+def augment(texts, count, rng):
+    keys = sorted(set(contractions.contractions_dict) | set(contractions.slang_dict))
+    styles = [str.lower, str.upper, str.title, lambda s: s[:1].upper() + s[1:].lower()]
+    extras = ['https://example.com/p?id=1', 'buyer.one@mail.example.org', 'see http://x.co/a']
+    augmented = []
+    for _ in range(count):
+        words = rng.choice(texts).split()
+        for _ in range(rng.randint(1, 4)):
+            insert = rng.choice(styles)(rng.choice(keys))
+            if rng.random() < 0.3:
+                insert = rng.choice(extras)
+            elif rng.random() < 0.4:
+                insert = ''.join(rng.choice(WIDE_EMOJIS + list(EMOJI_SENTIMENTS)) for _ in range(rng.randint(1, 3)))
+            words.insert(rng.randint(0, len(words)), insert)
+        augmented.append(' '.join(words))
+    return augmented
+
+
+def compare(texts, normalizer):
+    checks = {
+        'cleaned': (reference_basic_cleaning, lambda t: normalizer.clean(t)),
+        'without_emojis': (reference_remove_emojis, normalizer.strip_emojis),
+        'with_emoji_tokens': (reference_replace_emojis_with_text, normalizer.replace_emojis),
+        'emojis': (reference_extract_emojis, normalizer.find_emojis),
+        'emoji_analysis': (reference_analyze_emoji_sentiment, lambda t: emoji_sentiment_analysis(normalizer.find_emojis(t))),
+    }
+    failures = 0
+    for name, (reference, candidate) in checks.items():
+        mismatches = [(text, reference(text), candidate(text)) for text in texts if reference(text) != candidate(text)]
+        failures += len(mismatches)
+        print(f"{name:<18} {len(texts) - len(mismatches):>7} / {len(texts)} identical")
+        for text, expected, found in mismatches[:5]:
+            print(f"    {text!r}\n      expected {expected!r}\n      found    {found!r}")
+    return failures
+
+
+def reference_review(text):
+    return (
+        reference_basic_cleaning(text), reference_remove_emojis(text), reference_replace_emojis_with_text(text),
+        reference_analyze_emoji_sentiment(text)
+    )
+
+
+def normalized_review(normalizer, text):
+    normalized = normalizer.normalize(text)
+    return normalized, emoji_sentiment_analysis(normalized.emojis)
+
+
+def throughput(name, fn, texts):
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    seconds = time.perf_counter() - start
+    print(f"{name:<28} {len(texts) / seconds:10.0f} reviews/s")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark text normalization")
+    parser.add_argument('--augmented', type=int, default=20000, help="Dataset reviews with inserted contractions/emojis/URLs")
+    parser.add_argument('--skip-benchmark', action='store_true')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    dataset = pd.read_csv(DATASET_PATH)['review_text'].astype(str).tolist()
+    corpus = EDGE_CASES + dataset + augment(dataset, args.augmented, rng)
+
+    print(f"\nGolden comparison on {len(corpus)} texts\n")
+    failures = compare([text for text in corpus if text], TextNormalizer())
+
+    if not args.skip_benchmark:
+        # No cache: every review is new, as at ingest
+        normalizer = TextNormalizer(cache_size=0)
+        for name, texts in [('dataset', dataset * 2), ('augmented', augment(dataset, 2 * len(dataset), rng))]:
+            print(f"\nThroughput on {len(texts)} {name} reviews\n")
+            reference_seconds = throughput('reference functions', reference_review, texts)
+            normalized_seconds = throughput('TextNormalizer.normalize', lambda t: normalized_review(normalizer, t), texts)
+            print(f"speedup {reference_seconds / normalized_seconds:.1f}x")
+
+    if failures:
+        print(f"\n{failures} differences from the reference functions")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
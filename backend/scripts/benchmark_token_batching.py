@@ -0,0 +1,92 @@
+# backend/scripts/benchmark_token_batching.py
+"""
+Fixed-count vs token-budget batching for the sentiment model.
+
+Fixed-count batching takes reviews in dataset order, batch_size at a time
+(the previous behaviour). Token-budget batching uses TokenBudgetBatcher at
+a few budgets. The report shows padding efficiency (real tokens / padded
+tokens) and throughput for each.
+
+Usage: python scripts/benchmark_token_batching.py [num_reviews] [batch_size]
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import torch
+
+from nlp.model_registry import build_default_registry
+from nlp.batching import TokenBudgetBatcher, token_lengths
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+
+TOKEN_BUDGETS = [2048, 4096, 8192, 16384]
+
+
+def make_scorer(tokenizer, model):
+    def score(texts):
+        inputs = tokenizer(texts, return_tensors="pt", truncation=True, max_length=512, padding=True)
+        with torch.no_grad():
+            return torch.nn.functional.softmax(model(**inputs).logits, dim=-1).tolist()
+    return score
+
+
+def fixed_count(texts, lengths, score, batch_size):
+    """Padding efficiency and reviews/sec for in-order fixed-size batches"""
+    real_tokens = padded_tokens = 0
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        chunk = lengths[offset:offset + batch_size]
+        score(texts[offset:offset + batch_size])
+        real_tokens += sum(chunk)
+        padded_tokens += len(chunk) * max(chunk)
+    seconds = time.perf_counter() - start
+    return real_tokens / padded_tokens, len(texts) / seconds
+
+
+def token_budget(texts, lengths, score, batch_size, max_tokens):
+    batcher = TokenBudgetBatcher(max_tokens=max_tokens, max_batch_size=batch_size)
+    start = time.perf_counter()
+    batcher.run(texts, lengths, score, stage='sentiment')
+    seconds = time.perf_counter() - start
+    summary = batcher.summary()['sentiment']
+    return summary['padding_efficiency'], len(texts) / seconds, summary['batches']
+
+
+def main():
+    num_reviews = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    df = pd.read_csv(DATASET_PATH).head(num_reviews)
+    texts = [text for text in df['review_text'].astype(str) if text.strip()]
+
+    registry = build_default_registry()
+    tokenizer = registry.get('sentiment_tokenizer')
+    model = registry.get('sentiment').to('cpu')
+    score = make_scorer(tokenizer, model)
+    lengths = token_lengths(tokenizer, texts)
+
+    # Warm-up so first-call overhead is not attributed to either strategy
+    score(texts[:batch_size])
+
+    print(f"\n{len(texts)} reviews, mean {sum(lengths) / len(lengths):.0f} tokens, max {max(lengths)}\n")
+    print(f"| {'strategy':<22} | {'batches':>7} | {'pad eff':>7} | {'rev/s':>8}")
+    print(f"|{'-' * 24}|{'-' * 9}|{'-' * 9}|{'-' * 10}")
+
+    efficiency, throughput = fixed_count(texts, lengths, score, batch_size)
+    batches = (len(texts) + batch_size - 1) // batch_size
+    print(f"| {f'fixed {batch_size}':<22} | {batches:>7} | {efficiency:>7.3f} | {throughput:>8.1f}")
+
+    for max_tokens in TOKEN_BUDGETS:
+        efficiency, throughput, batches = token_budget(texts, lengths, score, batch_size, max_tokens)
+        print(f"| {f'budget {max_tokens} tokens':<22} | {batches:>7} | {efficiency:>7.3f} | {throughput:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
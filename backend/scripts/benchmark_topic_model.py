@@ -0,0 +1,99 @@
+# backend/scripts/benchmark_topic_model.py
+"""
+Topic model refit time vs per-review topic assignment latency.
+
+Encodes the first num_reviews reviews of the dataset, then measures:
+
+- refit: fitting BERTopic on all of them (what scripts/refit_topic_model.py does)
+- publish/load: saving a version into a temporary store and loading it back
+- assign: transform of one review from its stored embedding (ingest path)
+- encode + assign: the same for a review that still has to be encoded
+- batch assign: transform throughput for batches of batch_size reviews
+
+Usage: python scripts/benchmark_topic_model.py [num_reviews] [batch_size]
+"""
+import sys
+import os
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from nlp.advanced_pipeline import AdvancedNLPPipeline
+from nlp.topic_model_store import TopicModelStore, fit_topic_model
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+
+LATENCY_SAMPLES = 200
+
+
+def percentiles(seconds):
+    ms = np.array(seconds) * 1000
+    return f"p50 {np.percentile(ms, 50):8.2f} ms | p95 {np.percentile(ms, 95):8.2f} ms"
+
+
+def main():
+    num_reviews = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    texts = pd.read_csv(DATASET_PATH)['review_text'].astype(str).head(num_reviews).tolist()
+    pipeline = AdvancedNLPPipeline()
+
+    start = time.perf_counter()
+    embeddings = pipeline.encode_sentences(texts)
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model, topics = fit_topic_model(texts, embeddings)
+    refit_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = TopicModelStore(directory)
+        start = time.perf_counter()
+        store.publish(model, {'embedding_model': pipeline.models.version('sentence'), 'num_docs': len(texts)})
+        publish_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        published = store.current()
+        load_seconds = time.perf_counter() - start
+
+        samples = range(min(LATENCY_SAMPLES, len(texts)))
+        published.assign(texts[:1], embeddings[:1])
+
+        assign_latency = []
+        for i in samples:
+            start = time.perf_counter()
+            published.assign(texts[i:i + 1], embeddings[i:i + 1])
+            assign_latency.append(time.perf_counter() - start)
+
+        encode_assign_latency = []
+        for i in samples:
+            start = time.perf_counter()
+            published.assign(texts[i:i + 1], pipeline.encode_sentences(texts[i:i + 1]))
+            encode_assign_latency.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for offset in range(0, len(texts), batch_size):
+            published.assign(texts[offset:offset + batch_size], embeddings[offset:offset + batch_size])
+        batch_seconds = time.perf_counter() - start
+
+    num_topics = len(set(topics)) - (1 if -1 in topics else 0)
+    print(f"\n{len(texts)} reviews, {num_topics} topics, {sum(t == -1 for t in topics)} outliers at fit\n")
+    print(f"encode corpus        {encode_seconds:8.2f} s  ({len(texts) / encode_seconds:.0f} reviews/s)")
+    print(f"refit                {refit_seconds:8.2f} s")
+    print(f"publish              {publish_seconds:8.2f} s")
+    print(f"load                 {load_seconds:8.2f} s")
+    print(f"assign (stored)      {percentiles(assign_latency)}")
+    print(f"encode + assign      {percentiles(encode_assign_latency)}")
+    print(f"batch assign ({batch_size:>3})   {len(texts) / batch_seconds:8.0f} reviews/s")
+    print(f"\nOne refit costs as much as assigning "
+          f"{refit_seconds / np.median(assign_latency):,.0f} reviews one at a time from stored embeddings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# backend/scripts/build_duplicate_index.py
+"""
+Rebuild the near-duplicate index from stored reviews.
+
+Reviews are replayed in id order, as they arrived, so each one is compared
+against the reviews before it. The index is written to DUPLICATE_INDEX_PATH.
+With --score, each review's spam_probability, duplicate_of and
+duplicate_analysis columns are also rewritten.
+
+Usage: python scripts/build_duplicate_index.py [--score] [--chunk-size 2000]
+"""
+import sys
+import os
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from database.connection import engine, get_db, close_db
+from database.models import Review
+from nlp.near_duplicates import NearDuplicateIndex, DUPLICATE_INDEX_PATH
+from nlp.review_fields import duplicate_fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the near-duplicate index")
+    parser.add_argument('--score', action='store_true', help="Rewrite spam_probability and duplicate columns")
+    parser.add_argument('--output', default=DUPLICATE_INDEX_PATH)
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    index = NearDuplicateIndex(path=None)
+    db = get_db() if args.score else None
+    start = time.perf_counter()
+    last_id = 0
+    total = 0
+    try:
+        while True:
+            stmt = select(Review.id, Review.review_text, Review.user_id, Review.product_id).where(
+                Review.id > last_id
+            ).order_by(Review.id).limit(args.chunk_size)
+            with engine.connect() as conn:
+                rows = conn.execute(stmt).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            updates = []
+            for row in rows:
+                analysis = index.observe(row.id, row.review_text, row.user_id, row.product_id)
+                updates.append(dict(duplicate_fields(analysis), id=row.id))
+            if db is not None:
+                db.bulk_update_mappings(Review, updates)
+                db.commit()
+
+            total += len(rows)
+            print(f"{total} reviews ({total / (time.perf_counter() - start):.0f}/s)", end='\r', flush=True)
+    finally:
+        if db is not None:
+            close_db()
+
+    index.save(args.output)
+    print(f"\nIndexed {total} reviews in {time.perf_counter() - start:.1f}s -> {args.output}")
+    print(index.stats())
+
+
+if __name__ == "__main__":
+    main()
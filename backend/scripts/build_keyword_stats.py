@@ -0,0 +1,73 @@
+# backend/scripts/build_keyword_stats.py
+"""
+Build the corpus keyword statistics from stored reviews.
+
+The pipeline's CorpusKeywordExtractor updates its phrase document
+frequencies as reviews arrive. This script rebuilds them from every review
+in the database (or a CSV with review_text and category columns). The
+result is written to KEYWORD_STATS_PATH as a new snapshot generation:
+fresh processes start warm, and running ones reload it on their next
+flush instead of overwriting it.
+
+Usage:
+    python scripts/build_keyword_stats.py
+    python scripts/build_keyword_stats.py --csv data/raw/ecommerce_reviews.csv
+"""
+import sys
+import os
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlp.emoji_processor import EmojiProcessor
+from nlp.keyword_extractor import CorpusKeywordExtractor, KEYWORD_STATS_PATH
+
+
+def rows_from_csv(path, chunk_size):
+    import pandas as pd
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        categories = chunk['category'] if 'category' in chunk else [None] * len(chunk)
+        yield list(zip(chunk['review_text'].astype(str), categories))
+
+
+def rows_from_database(chunk_size):
+    from sqlalchemy import select
+    from database.connection import engine
+    from database.models import Review, Product
+
+    stmt = select(Review.review_text, Product.category).select_from(Review).outerjoin(
+        Product, Product.id == Review.product_id
+    )
+    with engine.connect().execution_options(stream_results=True, yield_per=chunk_size) as conn:
+        for partition in conn.execute(stmt).partitions():
+            yield [(row.review_text, row.category) for row in partition]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild corpus keyword statistics")
+    parser.add_argument('--csv', help="Read reviews from this CSV instead of the database")
+    parser.add_argument('--output', default=KEYWORD_STATS_PATH)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    emoji_processor = EmojiProcessor()
+    extractor = CorpusKeywordExtractor(path=None)
+    rows = rows_from_csv(args.csv, args.chunk_size) if args.csv else rows_from_database(args.chunk_size)
+
+    start = time.perf_counter()
+    total = 0
+    for chunk in rows:
+        texts = [emoji_processor.replace_emojis_with_text(text or '') for text, _ in chunk]
+        extractor.update(texts, [category for _, category in chunk])
+        total += len(chunk)
+        print(f"{total} reviews", end='\r', flush=True)
+
+    extractor.save(args.output)
+    print(f"Indexed {total} reviews in {time.perf_counter() - start:.1f}s -> {args.output}")
+    for name, stats in sorted(extractor.stats().items()):
+        print(f"  {name:<20} {stats['docs']:>8} docs {stats['phrases']:>8} phrases")
+
+
+if __name__ == "__main__":
+    main()
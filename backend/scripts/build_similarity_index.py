@@ -0,0 +1,29 @@
+# backend/scripts/build_similarity_index.py
+"""
+Bring the similar-review index up to date with the embedding store and save it.
+
+API processes also add new embeddings on their own before each search.
+Running this after a backfill or model change saves them from building the
+whole graph on the first request.
+
+Usage: python scripts/build_similarity_index.py
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlp.similarity_index import get_similarity_index
+
+
+def main():
+    index = get_similarity_index()
+    start = time.perf_counter()
+    added = index.sync()
+    index.save()
+    print(f"Added {added} embeddings in {time.perf_counter() - start:.1f}s: {index.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# backend/scripts/bulk_reprocess.py
+"""
+Bulk reprocess stored reviews with the current NLP pipeline.
+
+Examples:
+    python scripts/bulk_reprocess.py --model-version-before 2.1
+    python scripts/bulk_reprocess.py --category Electronics --since 2024-01-01 --profile reprocess-sentiment-only
+    python scripts/bulk_reprocess.py --resume <job_id>
+    python scripts/bulk_reprocess.py --model-version-before 2.1 --workers 8
+    python scripts/bulk_reprocess.py --status partial
+    python scripts/bulk_reprocess.py --list
+"""
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlp.profiles import PIPELINE_PROFILES, DEFAULT_PROFILE
+from workers.bulk_reprocess import BulkReprocessJob, list_checkpoints, load_checkpoint
+
+
+def print_progress(state):
+    total = state['total'] or 0
+    done = state['processed'] + state['failed']
+    percent = done / total * 100 if total else 100
+    eta = state['eta_seconds']
+    eta_text = f"{eta // 3600:d}h{eta % 3600 // 60:02d}m{eta % 60:02d}s" if eta is not None else '?'
+    print(
+        f"[{state['job_id']}] {done}/{total} ({percent:.1f}%) "
+        f"failed {state['failed']} | {state['reviews_per_sec']} rev/s "
+        f"(last chunk {state['recent_reviews_per_sec']}) | ETA {eta_text}",
+        flush=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprocess stored reviews in checkpointed chunks")
+    parser.add_argument('--product', dest='product_id', help="Only reviews of this product id")
+    parser.add_argument('--category', help="Only reviews of products in this category")
+    parser.add_argument('--subcategory', help="Only reviews of products in this subcategory")
+    parser.add_argument('--since', help="Reviews created on/after this ISO date")
+    parser.add_argument('--until', help="Reviews created before this ISO date")
+    parser.add_argument('--status', dest='processing_status', choices=['pending', 'partial', 'complete', 'failed'],
+                        help="Only reviews with this processing_status (e.g. partial: finish cheap-profile reviews)")
+    parser.add_argument('--model-version-before', help="Reviews not yet processed by pipeline version >= this")
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, choices=sorted(PIPELINE_PROFILES))
+    parser.add_argument('--chunk-size', type=int, default=256)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Forked pipeline processes sharing one copy of the models (0: run in-process)")
+    parser.add_argument('--job-id', help="Id for a new job (default: random)")
+    parser.add_argument('--resume', metavar='JOB_ID', help="Resume a job from its checkpoint")
+    parser.add_argument('--list', action='store_true', help="List saved jobs and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for state in list_checkpoints():
+            print_progress(state)
+            print(f"    status {state['status']}, filters {state['filters']}, profile {state['profile']}")
+        return
+
+    if args.resume and load_checkpoint(args.resume) is None:
+        print(f"No checkpoint for job {args.resume}")
+        sys.exit(1)
+
+    if args.workers:
+        # Each worker is single-threaded with one caller, so no micro-batching
+        from nlp.advanced_pipeline import AdvancedNLPPipeline
+        from nlp.process_pool import PipelineProcessPool
+        from nlp.result_cache import get_result_cache
+        profile = load_checkpoint(args.resume)['profile'] if args.resume else args.profile
+        pipeline = PipelineProcessPool(args.workers, profile=profile,
+                                       pipeline=AdvancedNLPPipeline(cache=get_result_cache()))
+    else:
+        from nlp.advanced_pipeline import get_shared_pipeline
+        pipeline = get_shared_pipeline()
+
+    filters = {
+        'product_id': args.product_id,
+        'category': args.category,
+        'subcategory': args.subcategory,
+        'since': args.since,
+        'until': args.until,
+        'processing_status': args.processing_status,
+        'model_version_before': args.model_version_before
+    }
+    job = BulkReprocessJob(
+        pipeline,
+        filters=filters,
+        profile=args.profile,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        job_id=args.resume or args.job_id,
+        progress_callback=print_progress
+    )
+    print(f"Job {job.job_id}: filters {job.state['filters']}, profile {job.state['profile']}")
+
+    try:
+        state = job.run()
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; resume with: python scripts/bulk_reprocess.py --resume {job.job_id}")
+        sys.exit(130)
+    finally:
+        if args.workers:
+            pipeline.close()
+
+    print(f"Job {job.job_id} {state['status']}: {state['processed']} processed, {state['failed']} failed")
+    if state['status'] != 'completed':
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
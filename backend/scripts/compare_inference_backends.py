@@ -0,0 +1,115 @@
+# backend/scripts/compare_inference_backends.py
+"""
+Parity and latency report for the transformer inference backends.
+
+Runs the sentiment, emotion, ABSA and NER models over a fixed slice of the
+review dataset with every backend in nlp.inference_backends. Agreement and
+score deltas are measured against PyTorch eager. Throughput is reported
+for each backend.
+
+Usage: python scripts/compare_inference_backends.py [num_reviews] [batch_size]
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from nlp.advanced_pipeline import AdvancedNLPPipeline, CATEGORY_ASPECTS, DEFAULT_ASPECTS
+from nlp.model_registry import build_default_registry
+from nlp.inference_backends import INFERENCE_BACKENDS, DEFAULT_BACKEND
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'raw', 'ecommerce_reviews.csv'
+)
+
+
+def run_models(pipeline, texts, absa_inputs, batch_size):
+    """Predictions per model as lists of (label, score), plus seconds per model"""
+    outputs, seconds = {}, {}
+
+    start = time.perf_counter()
+    probs = pipeline._sentiment_probs_batch(texts, batch_size)
+    seconds['sentiment'] = time.perf_counter() - start
+    outputs['sentiment'] = [
+        ('positive' if p[1] >= p[0] else 'negative', p[1]) if p is not None else (None, 0.0)
+        for p in probs
+    ]
+
+    start = time.perf_counter()
+    emotions = pipeline.emotion_pipeline(texts, batch_size=batch_size)
+    seconds['emotion'] = time.perf_counter() - start
+    outputs['emotion'] = [(e['label'], e['score']) for e in emotions]
+
+    start = time.perf_counter()
+    absa = pipeline.absa_pipeline(absa_inputs, batch_size=batch_size)
+    seconds['absa'] = time.perf_counter() - start
+    outputs['absa'] = [(a['label'], a['score']) for a in absa]
+
+    start = time.perf_counter()
+    entities = pipeline.ner_pipeline(texts, batch_size=batch_size)
+    seconds['ner'] = time.perf_counter() - start
+    # A review's "label" is its full entity sequence; score is the mean entity score
+    outputs['ner'] = [
+        (tuple((e['word'], e['entity']) for e in ents), float(np.mean([e['score'] for e in ents])) if ents else 0.0)
+        for ents in entities
+    ]
+
+    return outputs, seconds
+
+
+def parity(reference, candidate):
+    """Label agreement and absolute score deltas of candidate vs reference"""
+    agreement = np.mean([r[0] == c[0] for r, c in zip(reference, candidate)])
+    deltas = np.abs([r[1] - c[1] for r, c in zip(reference, candidate)])
+    return float(agreement), float(deltas.mean()), float(deltas.max())
+
+
+def main():
+    num_reviews = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    df = pd.read_csv(DATASET_PATH).head(num_reviews)
+    texts = df['review_text'].astype(str).tolist()
+    absa_inputs = [
+        f"{CATEGORY_ASPECTS.get(category, DEFAULT_ASPECTS)[0]}: {text}"
+        for category, text in zip(df['category'], texts)
+    ]
+
+    results = {}
+    for backend in INFERENCE_BACKENDS:
+        pipeline = AdvancedNLPPipeline(registry=build_default_registry(backend))
+        try:
+            start = time.perf_counter()
+            pipeline.warm_up(['sentiment', 'emotions', 'aspects', 'entities'])
+            load_seconds = time.perf_counter() - start
+        except ImportError as e:
+            print(f"Skipping {backend}: {e}")
+            continue
+
+        # One untimed pass so lazy initialisation does not count as latency
+        run_models(pipeline, texts[:batch_size], absa_inputs[:batch_size], batch_size)
+        outputs, seconds = run_models(pipeline, texts, absa_inputs, batch_size)
+        results[backend] = (load_seconds, outputs, seconds)
+
+    reference = results[DEFAULT_BACKEND][1]
+
+    print(f"\n{len(texts)} reviews, batch size {batch_size}\n")
+    print(f"| {'backend':<11} | {'model':<9} | {'agree':>6} | {'mean d':>7} | {'max d':>7} | {'ms/rev':>7} | {'rev/s':>7} | load s")
+    print(f"|{'-' * 13}|{'-' * 11}|{'-' * 8}|{'-' * 9}|{'-' * 9}|{'-' * 9}|{'-' * 9}|{'-' * 7}")
+    for backend, (load_seconds, outputs, seconds) in results.items():
+        for model in ('sentiment', 'emotion', 'absa', 'ner'):
+            agreement, mean_delta, max_delta = parity(reference[model], outputs[model])
+            per_review_ms = seconds[model] / len(texts) * 1000
+            print(
+                f"| {backend:<11} | {model:<9} | {agreement:>6.3f} | {mean_delta:>7.4f} | {max_delta:>7.4f} | "
+                f"{per_review_ms:>7.2f} | {len(texts) / seconds[model]:>7.1f} | {load_seconds:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
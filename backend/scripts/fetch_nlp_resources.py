@@ -0,0 +1,118 @@
+# backend/scripts/fetch_nlp_resources.py
+"""
+Download every NLTK package, spaCy model and Hugging Face model the NLP
+stages use, so workers can run with NLP_OFFLINE=1 (see nlp/resources.py).
+
+Run once per environment; the Docker image runs it at build time. Already
+present resources are skipped. With --check nothing is downloaded: the
+script only reports what is missing and exits with status 1 if anything is.
+
+Usage:
+    python scripts/fetch_nlp_resources.py
+    python scripts/fetch_nlp_resources.py --skip-hf
+    python scripts/fetch_nlp_resources.py --check
+"""
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# nlp.resources puts the hub in offline mode on import; this script is the one place allowed to download
+if '--check' in sys.argv:
+    os.environ['NLP_OFFLINE'] = '1'
+else:
+    os.environ['NLP_OFFLINE'] = '0'
+    os.environ['HF_HUB_OFFLINE'] = '0'
+    os.environ['TRANSFORMERS_OFFLINE'] = '0'
+
+from nlp.resources import (
+    NLTK_RESOURCES, ResourceUnavailable, require_nltk, require_spacy_model, require_hf_model
+)
+from nlp.model_registry import MODEL_IDS
+from nlp.sentiment_analysis import SENTIMENT_MODEL
+
+# Weight formats the pipeline never loads
+HF_IGNORE_PATTERNS = ['*.h5', '*.msgpack', '*.ot', '*.tflite', 'onnx/*', 'openvino/*', 'coreml/*']
+
+
+def hf_model_ids():
+    # The legacy SentimentAnalyzer still uses its own checkpoint
+    ids = [model_id for name, model_id in MODEL_IDS.items() if name != 'spacy']
+    return ids + [SENTIMENT_MODEL]
+
+
+def hf_repo_id(model_id):
+    return model_id if '/' in model_id else f"sentence-transformers/{model_id}"
+
+
+def fetch_nltk():
+    import nltk
+    for name in NLTK_RESOURCES:
+        try:
+            require_nltk(name)
+            print(f"nltk {name}: present")
+        except ResourceUnavailable:
+            # punkt_tab is what NLTK >= 3.9 reads for word_tokenize
+            for package in ['punkt', 'punkt_tab'] if name == 'punkt' else [name]:
+                nltk.download(package, quiet=True)
+            require_nltk(name)
+            print(f"nltk {name}: downloaded")
+
+
+def fetch_spacy():
+    name = MODEL_IDS['spacy']
+    try:
+        require_spacy_model(name)
+        print(f"spacy {name}: present")
+    except ResourceUnavailable:
+        from spacy.cli import download
+        download(name)
+        print(f"spacy {name}: downloaded")
+
+
+def fetch_hf():
+    from huggingface_hub import snapshot_download
+    for model_id in hf_model_ids():
+        path = snapshot_download(hf_repo_id(model_id), ignore_patterns=HF_IGNORE_PATTERNS)
+        print(f"hf {model_id}: {path}")
+
+
+def check(skip_hf):
+    checks = [(f"nltk {name}", require_nltk, name) for name in NLTK_RESOURCES]
+    checks.append((f"spacy {MODEL_IDS['spacy']}", require_spacy_model, MODEL_IDS['spacy']))
+    if not skip_hf:
+        checks += [(f"hf {model_id}", require_hf_model, model_id) for model_id in hf_model_ids()]
+
+    missing = 0
+    for label, require, name in checks:
+        try:
+            require(name)
+            print(f"{label}: present")
+        except ResourceUnavailable:
+            missing += 1
+            print(f"{label}: MISSING")
+    return missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch NLP models and data for offline use")
+    parser.add_argument('--skip-hf', action='store_true', help="Skip Hugging Face models")
+    parser.add_argument('--check', action='store_true', help="Only report missing resources")
+    args = parser.parse_args()
+
+    if args.check:
+        missing = check(args.skip_hf)
+        if missing:
+            print(f"\n{missing} resources missing")
+            sys.exit(1)
+        return
+
+    fetch_nltk()
+    fetch_spacy()
+    if not args.skip_hf:
+        fetch_hf()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# backend/scripts/refit_topic_model.py
+"""
+Fit a new topic model on stored reviews and publish it.
+
+Uses the stored sentence embeddings of the newest --limit reviews (missing
+ones are encoded and stored first). Fits BERTopic and saves it as a new
+version under TOPIC_MODELS_DIR. CURRENT is then swapped to the new
+version, and running API processes and workers switch on their next
+assignment. With --reassign every stored review's topics are rewritten
+with the new model.
+
+Meant to run on a schedule, e.g. nightly from cron:
+
+    0 3 * * * cd /app/backend && python scripts/refit_topic_model.py --reassign
+
+Usage: python scripts/refit_topic_model.py [--limit 50000] [--min-topic-size 10] [--reassign]
+"""
+import sys
+import os
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sqlalchemy import select
+
+from database.connection import engine, get_db, close_db
+from database.models import Review
+from nlp.topic_model_store import get_topic_model_store, fit_topic_model
+
+
+def newest_reviews(limit):
+    stmt = select(Review.id, Review.review_text).order_by(Review.id.desc()).limit(limit)
+    with engine.connect() as conn:
+        return conn.execute(stmt).fetchall()[::-1]
+
+
+def reassign_all(pipeline, published, chunk_size):
+    """Rewrite Review.topics for every review with the published model"""
+    last_id = 0
+    total = 0
+    db = get_db()
+    try:
+        while True:
+            stmt = select(Review.id, Review.review_text).where(Review.id > last_id).order_by(Review.id).limit(chunk_size)
+            with engine.connect() as conn:
+                rows = conn.execute(stmt).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            ids = [row.id for row in rows]
+            texts = [row.review_text or '' for row in rows]
+            topics = published.assign(texts, pipeline.embed_reviews(ids, texts))
+            db.bulk_update_mappings(Review, [{'id': i, 'topics': t} for i, t in zip(ids, topics)])
+            db.commit()
+            total += len(rows)
+            print(f"{total} reviews reassigned", end='\r', flush=True)
+    finally:
+        close_db()
+    print()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refit and publish the topic model")
+    parser.add_argument('--limit', type=int, default=50000, help="Fit on this many of the newest reviews")
+    parser.add_argument('--min-topic-size', type=int, default=10)
+    parser.add_argument('--keep', type=int, default=3, help="Published versions to keep on disk")
+    parser.add_argument('--reassign', action='store_true', help="Rewrite topics of all stored reviews afterwards")
+    parser.add_argument('--chunk-size', type=int, default=1024)
+    args = parser.parse_args()
+
+    from nlp.advanced_pipeline import get_shared_pipeline
+    pipeline = get_shared_pipeline()
+    store = get_topic_model_store()
+
+    rows = newest_reviews(args.limit)
+    if len(rows) < args.min_topic_size * 2:
+        print(f"Only {len(rows)} reviews stored; not enough to fit a topic model")
+        return
+
+    start = time.perf_counter()
+    embeddings = []
+    for offset in range(0, len(rows), args.chunk_size):
+        chunk = rows[offset:offset + args.chunk_size]
+        embeddings.append(pipeline.embed_reviews([row.id for row in chunk], [row.review_text or '' for row in chunk]))
+    embeddings = np.vstack(embeddings)
+    embed_seconds = time.perf_counter() - start
+    print(f"Loaded {len(rows)} embeddings in {embed_seconds:.1f}s")
+
+    start = time.perf_counter()
+    model, topics = fit_topic_model(
+        [row.review_text or '' for row in rows],
+        embeddings,
+        min_topic_size=args.min_topic_size
+    )
+    fit_seconds = time.perf_counter() - start
+    outliers = sum(1 for topic in topics if topic == -1)
+
+    version = store.publish(model, {
+        'embedding_model': pipeline.models.version('sentence'),
+        'num_docs': len(rows),
+        'outlier_docs': outliers,
+        'fit_seconds': round(fit_seconds, 2),
+        'min_topic_size': args.min_topic_size
+    }, keep=args.keep)
+    published = store.current()
+    print(
+        f"Published topic model {version}: {published.meta['num_topics']} topics, "
+        f"{outliers / len(rows):.1%} outliers, fit in {fit_seconds:.1f}s"
+    )
+
+    if args.reassign:
+        start = time.perf_counter()
+        total = reassign_all(pipeline, published, args.chunk_size)
+        print(f"Reassigned {total} reviews in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
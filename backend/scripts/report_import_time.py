@@ -0,0 +1,106 @@
+# backend/scripts/report_import_time.py
+"""
+Import cost of each nlp module and of the API app, for tracking cold start.
+
+Every target is imported in a fresh interpreter with ``python -X importtime``,
+so nothing is shared between measurements. For each target the report shows
+the wall time of the import and the third-party packages that cost the most
+(cumulative microseconds of their top-level import, as reported by CPython).
+
+Usage: python scripts/report_import_time.py [--top 5] [--json] [module ...]
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(BACKEND_DIR, 'api')
+
+NLP_MODULES = [
+    'nlp.preprocessing', 'nlp.text_normalization', 'nlp.spacy_provider', 'nlp.model_registry',
+    'nlp.sentiment_analysis', 'nlp.topic_extraction', 'nlp.entity_recognition', 'nlp.trend_analysis',
+    'nlp.keyword_extractor', 'nlp.topic_model_store', 'nlp.pipeline', 'nlp.advanced_pipeline',
+]
+
+# api/app.py imports its blueprints as top-level packages, so it runs from api/
+APP_TARGET = 'app'
+
+
+def parse_importtime(stderr):
+    """
+    {package: cumulative microseconds} from -X importtime output.
+
+    Lines come children first, indented two spaces per level. An import is
+    charged to its top-level package whenever it was triggered from a
+    different package, so e.g. ``bertopic`` includes umap and its other
+    dependencies, while the imported target itself is left out.
+    """
+    packages = {}
+    pending = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        fields = line.split('|')
+        try:
+            cumulative_us = int(fields[1])
+        except (IndexError, ValueError):
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        package = name.strip().split('.')[0]
+        for child_package, child_us in pending.pop(depth + 1, []):
+            if child_package != package:
+                packages[child_package] = packages.get(child_package, 0) + child_us
+        pending.setdefault(depth, []).append((package, cumulative_us))
+    return packages
+
+
+def measure(module):
+    cwd = API_DIR if module == APP_TARGET else BACKEND_DIR
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([BACKEND_DIR, API_DIR]))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-W', 'ignore', '-c', f'import {module}'],
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+    seconds = time.perf_counter() - start
+    report = {'module': module, 'seconds': round(seconds, 2), 'ok': result.returncode == 0}
+    if result.returncode != 0:
+        report['error'] = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'
+        return report
+    packages = parse_importtime(result.stderr)
+    report['packages_ms'] = {
+        name: round(us / 1000, 1)
+        for name, us in sorted(packages.items(), key=lambda item: -item[1])
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-module import cost")
+    parser.add_argument('modules', nargs='*', help=f"Modules to import (default: nlp modules and {APP_TARGET})")
+    parser.add_argument('--top', type=int, default=5, help="Most expensive packages listed per module")
+    parser.add_argument('--json', action='store_true', help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    reports = [measure(module) for module in (args.modules or NLP_MODULES + [APP_TARGET])]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+
+    print(f"\n| {'module':<26} | {'import s':>8} | most expensive packages (ms)")
+    print(f"|{'-' * 28}|{'-' * 10}|{'-' * 40}")
+    for report in reports:
+        if not report['ok']:
+            print(f"| {report['module']:<26} | {'failed':>8} | {report['error']}")
+            continue
+        top = ', '.join(f"{name} {ms:.0f}" for name, ms in list(report['packages_ms'].items())[:args.top])
+        print(f"| {report['module']:<26} | {report['seconds']:8.2f} | {top}")
+
+
+if __name__ == "__main__":
+    main()
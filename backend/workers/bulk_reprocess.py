@@ -0,0 +1,370 @@
+# backend/workers/bulk_reprocess.py
+"""
+Resumable bulk reprocessing of stored reviews.
+
+A job selects reviews with a filter (product, category, date range,
+processing status, or NLP pipeline version older than X). It streams them in id order through a
+server-side cursor and runs each chunk through the batched pipeline. The
+results are written back with bulk updates.
+
+After every committed chunk the job writes a JSON checkpoint holding the
+last review id and its counters. A crashed or cancelled job resumes from
+there. Re-running a chunk that was committed but not yet checkpointed is
+harmless.
+"""
+import os
+import re
+import json
+import time
+import uuid
+import logging
+import threading
+import traceback
+from datetime import datetime
+
+from sqlalchemy import select, func, distinct, or_
+
+from database.connection import engine, get_db, close_db
+from database.models import Review, Product, ProcessingLog
+from database.processing_logs import confidence_scores_from_results
+from nlp.instrumentation import ProcessingTrace
+from nlp.profiles import DEFAULT_PROFILE, resolve_stages, status_for_profile
+from nlp.review_fields import review_fields_from_results
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'jobs'
+)
+
+# Reviews read per server-side cursor before it is reopened from the last id,
+# so no read transaction stays open for the whole job
+CHUNKS_PER_CURSOR = 50
+
+FILTER_KEYS = ('product_id', 'category', 'subcategory', 'since', 'until', 'processing_status', 'model_version_before')
+
+
+def _version_key(version):
+    """'2.10' > '2.9': compare versions by their numeric parts"""
+    return tuple(int(part) for part in re.findall(r'\d+', str(version or '')))
+
+
+def _parse_date(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def checkpoint_path(job_id):
+    return os.path.join(CHECKPOINT_DIR, f"reprocess_{job_id}.json")
+
+
+def load_checkpoint(job_id):
+    """Saved state of a job, or None"""
+    path = checkpoint_path(job_id)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def list_checkpoints():
+    """Saved state of every job, newest first"""
+    if not os.path.isdir(CHECKPOINT_DIR):
+        return []
+    jobs = []
+    for name in os.listdir(CHECKPOINT_DIR):
+        if name.startswith('reprocess_') and name.endswith('.json'):
+            with open(os.path.join(CHECKPOINT_DIR, name)) as f:
+                jobs.append(json.load(f))
+    return sorted(jobs, key=lambda job: job.get('started_at') or '', reverse=True)
+
+
+class BulkReprocessJob:
+    """Streams filtered reviews through the pipeline in checkpointed chunks"""
+
+    def __init__(self, pipeline, filters=None, profile=DEFAULT_PROFILE, chunk_size=256,
+                 batch_size=32, job_id=None, progress_callback=None):
+        resolve_stages(profile)  # fail fast on unknown profiles
+
+        unknown = set(filters or {}) - set(FILTER_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}")
+
+        self.pipeline = pipeline
+        self.progress_callback = progress_callback
+        self._cancel = threading.Event()
+
+        state = load_checkpoint(job_id) if job_id else None
+        if state:
+            # Resume: the saved filters/profile win so the selection is unchanged
+            self.state = state
+            self.state['status'] = 'resuming'
+        else:
+            self.state = {
+                'job_id': job_id or uuid.uuid4().hex[:12],
+                'filters': {k: v for k, v in (filters or {}).items() if v not in (None, '')},
+                'profile': profile,
+                'chunk_size': chunk_size,
+                'batch_size': batch_size,
+                'last_id': 0,
+                'total': None,
+                'processed': 0,
+                'failed': 0,
+                'failed_ids': [],
+                'errors': [],
+                'status': 'created',
+                'started_at': datetime.utcnow().isoformat(),
+                'updated_at': None,
+                'finished_at': None,
+                'reviews_per_sec': None,
+                'recent_reviews_per_sec': None,
+                'eta_seconds': None
+            }
+
+    @property
+    def job_id(self):
+        return self.state['job_id']
+
+    def cancel(self):
+        """Stop after the current chunk (the checkpoint allows resuming)"""
+        self._cancel.set()
+
+    def _select(self, columns):
+        """SELECT with the job's filters applied"""
+        filters = self.state['filters']
+        stmt = select(*columns).select_from(Review).outerjoin(Product, Product.id == Review.product_id)
+
+        if filters.get('product_id'):
+            stmt = stmt.where(Review.product_id == filters['product_id'])
+        if filters.get('category'):
+            stmt = stmt.where(Product.category == filters['category'])
+        if filters.get('subcategory'):
+            stmt = stmt.where(Product.subcategory == filters['subcategory'])
+        if filters.get('since'):
+            stmt = stmt.where(Review.created_at >= _parse_date(filters['since']))
+        if filters.get('until'):
+            stmt = stmt.where(Review.created_at < _parse_date(filters['until']))
+        if filters.get('processing_status'):
+            stmt = stmt.where(Review.processing_status == filters['processing_status'])
+        if filters.get('model_version_before'):
+            current = self._current_versions(filters['model_version_before'])
+            if current:
+                # Reviews never processed by version >= X (including never processed at all);
+                # a partial review's cheap-profile log does not count as processed
+                processed = select(ProcessingLog.review_id).where(
+                    ProcessingLog.model_version.in_(current),
+                    ProcessingLog.errors.is_(None)
+                )
+                stmt = stmt.where(or_(Review.id.notin_(processed), Review.processing_status == 'partial'))
+
+        return stmt
+
+    def _current_versions(self, minimum):
+        """Logged pipeline versions that are >= minimum (versions are few, so compare in Python)"""
+        with engine.connect() as conn:
+            versions = conn.execute(select(distinct(ProcessingLog.model_version))).scalars().all()
+        return [v for v in versions if v and _version_key(v) >= _version_key(minimum)]
+
+    def _count_remaining(self):
+        stmt = self._select([func.count(Review.id)]).where(Review.id > self.state['last_id'])
+        with engine.connect() as conn:
+            return conn.execute(stmt).scalar()
+
+    def _stream_chunks(self):
+        """Yield lists of review rows in id order, chunk_size at a time"""
+        chunk_size = self.state['chunk_size']
+        columns = [
+            Review.id, Review.review_text, Review.processing_status,
+            Product.id.label('product_id'), Product.category, Product.subcategory,
+            Product.brand, Product.name.label('product_name')
+        ]
+
+        # SQLite cannot commit while another connection holds a read cursor,
+        # so there every chunk is its own short keyset query
+        sqlite = engine.dialect.name == 'sqlite'
+        window = chunk_size * (1 if sqlite else CHUNKS_PER_CURSOR)
+
+        while not self._cancel.is_set():
+            stmt = self._select(columns).where(
+                Review.id > self.state['last_id']
+            ).order_by(Review.id).limit(window)
+
+            rows_seen = 0
+            if sqlite:
+                with engine.connect() as conn:
+                    partitions = [conn.execute(stmt).fetchall()]
+            else:
+                partitions = self._server_side_partitions(stmt, chunk_size)
+
+            for partition in partitions:
+                if not partition:
+                    break
+                rows_seen += len(partition)
+                yield partition
+                if self._cancel.is_set():
+                    return
+
+            if rows_seen < window:
+                return
+
+    def _server_side_partitions(self, stmt, chunk_size):
+        """Server-side cursor: rows arrive chunk_size at a time instead of all at once"""
+        with engine.connect().execution_options(stream_results=True, yield_per=chunk_size) as conn:
+            for partition in conn.execute(stmt).partitions():
+                yield partition
+
+    def run(self):
+        """Process every remaining matching review; returns the final state"""
+        state = self.state
+        remaining = self._count_remaining()
+        state['total'] = state['processed'] + state['failed'] + remaining
+        state['status'] = 'running'
+        self._save()
+        logger.info(f"Reprocess job {self.job_id}: {remaining} reviews to process (profile {state['profile']})")
+
+        start = time.perf_counter()
+        done_at_start = state['processed'] + state['failed']
+
+        try:
+            for rows in self._stream_chunks():
+                chunk_start = time.perf_counter()
+                self._process_chunk(rows)
+                state['last_id'] = rows[-1].id
+
+                elapsed = time.perf_counter() - start
+                done = state['processed'] + state['failed'] - done_at_start
+                state['reviews_per_sec'] = round(done / elapsed, 2) if elapsed > 0 else None
+                chunk_seconds = time.perf_counter() - chunk_start
+                state['recent_reviews_per_sec'] = round(len(rows) / chunk_seconds, 2) if chunk_seconds > 0 else None
+                left = state['total'] - state['processed'] - state['failed']
+                state['eta_seconds'] = round(left / state['reviews_per_sec']) if state['reviews_per_sec'] else None
+                self._save()
+
+                if self.progress_callback:
+                    self.progress_callback(state)
+
+            state['status'] = 'cancelled' if self._cancel.is_set() else 'completed'
+        except Exception as e:
+            state['status'] = 'failed'
+            state['errors'] = (state['errors'] + [str(e)])[-20:]
+            logger.error(f"Reprocess job {self.job_id} failed: {e}")
+            traceback.print_exc()
+        finally:
+            if state['status'] in ('completed', 'failed'):
+                state['finished_at'] = datetime.utcnow().isoformat()
+            state['eta_seconds'] = 0 if state['status'] == 'completed' else state['eta_seconds']
+            self._save()
+            close_db()
+
+        return state
+
+    def _process_chunk(self, rows):
+        state = self.state
+        product_infos = [
+            {
+                'category': row.category,
+                'subcategory': row.subcategory,
+                'brand': row.brand,
+                'product_name': row.product_name,
+                'product_id': row.product_id
+            } if row.product_id is not None else None
+            for row in rows
+        ]
+
+        trace = ProcessingTrace()
+        try:
+            results = self.pipeline.process_reviews(
+                [row.review_text for row in rows],
+                product_infos,
+                batch_size=state['batch_size'],
+                profile=state['profile'],
+                trace=trace,
+                # Complete reviews were counted in the keyword tables on their first full pass
+                update_keywords=[row.processing_status != 'complete' for row in rows]
+            )
+        except Exception as e:
+            # Keep going: record the chunk as failed and move past it
+            logger.error(f"Reprocess chunk ending at review {rows[-1].id} failed: {e}")
+            state['failed'] += len(rows)
+            state['failed_ids'] = (state['failed_ids'] + [row.id for row in rows])[-1000:]
+            state['errors'] = (state['errors'] + [str(e)])[-20:]
+            return
+
+        try:
+            # Only reviews without a stored embedding (or after a model change) are encoded
+            topics = self.pipeline.assign_topics([row.id for row in rows], [row.review_text for row in rows])
+        except Exception as e:
+            logger.warning(f"Could not embed/assign topics for reviews up to {rows[-1].id}: {e}")
+            topics = [None] * len(rows)
+
+        log_fields = trace.log_fields()
+        # Only a full pass completes a review; a partial profile leaves the status as it was
+        completes = status_for_profile(state['profile']) == 'complete'
+        updates = []
+        logs = []
+        for row, nlp_results, review_topics in zip(rows, results, topics):
+            fields = review_fields_from_results(nlp_results)
+            fields['id'] = row.id
+            if review_topics is not None:
+                fields['topics'] = review_topics
+            if completes:
+                fields['processing_status'] = 'complete'
+            updates.append(fields)
+            logs.append(dict(
+                log_fields,
+                review_id=row.id,
+                confidence_scores=confidence_scores_from_results(nlp_results)
+            ))
+
+        db = get_db()
+        try:
+            db.bulk_update_mappings(Review, updates)
+            db.bulk_insert_mappings(ProcessingLog, logs)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        state['processed'] += len(rows)
+
+    def _save(self):
+        """Write the checkpoint atomically"""
+        self.state['updated_at'] = datetime.utcnow().isoformat()
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        path = checkpoint_path(self.job_id)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+
+_running_jobs = {}
+_running_jobs_lock = threading.Lock()
+
+
+def start_job_in_background(filters=None, profile=DEFAULT_PROFILE, chunk_size=256, job_id=None):
+    """Run (or resume) a job on a daemon thread; returns the job"""
+    from nlp.advanced_pipeline import get_shared_pipeline
+
+    with _running_jobs_lock:
+        if job_id and job_id in _running_jobs:
+            raise ValueError(f"Job {job_id} is already running")
+
+        job = BulkReprocessJob(get_shared_pipeline(), filters, profile, chunk_size, job_id=job_id)
+        _running_jobs[job.job_id] = job
+
+    def run():
+        try:
+            job.run()
+        finally:
+            with _running_jobs_lock:
+                _running_jobs.pop(job.job_id, None)
+
+    threading.Thread(target=run, name=f"reprocess-{job.job_id}", daemon=True).start()
+    return job
+
+
+def get_running_job(job_id):
+    return _running_jobs.get(job_id)
@@ -0,0 +1,404 @@
+# backend/workers/review_ingest.py
+"""
+Background NLP processing for submitted reviews.
+
+In async ingest mode, submit stores the review with processing_status
+'pending' and returns 202. A bounded pool of worker threads drains the
+queue in small batches, runs AdvancedNLPPipeline.process_reviews, writes
+the results and a ProcessingLog row, and pushes the analysis to clients
+as a 'review_processed' live update.
+
+A sweeper thread re-queues pending reviews that did not fit in the
+queue, and reviews left pending by a restart, each with the profile it
+was submitted with. Failed reviews are retried by the same sweep after
+retry_delay seconds, until processing_attempts reaches max_attempts.
+
+A review analyzed with a cheap profile (e.g. ingest-fast) is stored as
+'partial' and queued again for a full-profile pass.
+"""
+import os
+import queue
+import threading
+import time
+import logging
+import traceback
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, func
+
+from database.connection import get_db, close_db
+from database.models import Review, Product
+from database.processing_logs import build_processing_log, reusable_reviews
+from nlp.embedding_store import get_embedding_store
+from nlp.instrumentation import ProcessingTrace
+from nlp.near_duplicates import get_duplicate_index, duplicate_detection_enabled, REUSE_THRESHOLD
+from nlp.profiles import DEFAULT_PROFILE, status_for_profile
+from nlp.review_fields import (
+    review_fields_from_results, product_info_from_product, format_nlp_analysis,
+    duplicate_fields, nlp_results_from_review
+)
+
+logger = logging.getLogger(__name__)
+
+
+def async_ingest_enabled():
+    """REVIEW_INGEST_MODE=async turns on background processing for submit"""
+    return os.environ.get('REVIEW_INGEST_MODE', 'sync').lower() == 'async'
+
+
+class ReviewIngestPool:
+    """Bounded queue plus worker threads that analyze pending reviews"""
+
+    def __init__(self, pipeline, socketio=None, num_workers=2, max_queue=1000,
+                 batch_size=16, batch_wait=0.05, sweep_interval=30, max_attempts=3, retry_delay=60):
+        self.pipeline = pipeline
+        self.socketio = socketio
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.sweep_interval = sweep_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+        self.processed = 0
+        self.failed = 0
+        self.busy_workers = 0
+        self.last_batch_seconds = None
+
+    def start(self):
+        """Start the workers and the pending-review sweeper"""
+        self._reset_interrupted()
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"review-ingest-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        sweeper = threading.Thread(target=self._sweep_loop, name="review-ingest-sweeper", daemon=True)
+        sweeper.start()
+        self._threads.append(sweeper)
+        logger.info(f"Review ingest pool started with {self.num_workers} workers")
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def submit(self, review_id, profile=DEFAULT_PROFILE):
+        """
+        Queue a stored review for analysis.
+
+        Returns False when the queue is full; the review stays pending and
+        the sweeper picks it up once there is room.
+        """
+        with self._lock:
+            if review_id in self._inflight:
+                return True
+            try:
+                self._queue.put_nowait((review_id, profile))
+            except queue.Full:
+                return False
+            self._inflight.add(review_id)
+        return True
+
+    def stats(self):
+        return {
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            'inflight': len(self._inflight),
+            'workers': self.num_workers,
+            'busy_workers': self.busy_workers,
+            'processed': self.processed,
+            'failed': self.failed,
+            'max_attempts': self.max_attempts,
+            'last_batch_seconds': self.last_batch_seconds
+        }
+
+    def _next_batch(self):
+        """Block for one item, then take whatever else arrives within batch_wait"""
+        try:
+            items = [self._queue.get(timeout=1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.batch_wait
+        while len(items) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            items = self._next_batch()
+            if not items:
+                continue
+
+            with self._lock:
+                self.busy_workers += 1
+            start = time.perf_counter()
+            follow_ups = []
+            try:
+                by_profile = defaultdict(list)
+                for review_id, profile in items:
+                    by_profile[profile].append(review_id)
+                for profile, review_ids in by_profile.items():
+                    follow_ups += self._process_batch(review_ids, profile)
+            except Exception as e:
+                logger.error(f"Review ingest batch failed: {e}")
+                traceback.print_exc()
+            finally:
+                close_db()
+                with self._lock:
+                    self.busy_workers -= 1
+                    self._inflight.difference_update(review_id for review_id, _ in items)
+                self.last_batch_seconds = round(time.perf_counter() - start, 3)
+
+            # Partial reviews get their full pass (the sweeper catches any that do not fit)
+            for review_id in follow_ups:
+                if not self.submit(review_id, DEFAULT_PROFILE):
+                    break
+
+    def _process_batch(self, review_ids, profile):
+        """Analyze and store a batch; returns ids of reviews left 'partial' that still need a full pass"""
+        db = get_db()
+        reviews = db.query(Review).filter(
+            Review.id.in_(review_ids),
+            Review.processing_status.in_(['pending', 'processing', 'partial', 'failed'])
+        ).all()
+        if not reviews:
+            return []
+
+        product_ids = {review.product_id for review in reviews}
+        products = {p.id: p for p in db.query(Product).filter(Product.id.in_(product_ids)).all()}
+
+        sources = self._check_duplicates(db, reviews)
+        for review in reviews:
+            review.processing_status = 'processing'
+            review.processing_attempts = (review.processing_attempts or 0) + 1
+        db.commit()
+
+        # Near-duplicates of processed reviews reuse their analysis; the rest go through the models
+        fresh = [review for review in reviews if review.id not in sources]
+        trace = ProcessingTrace()
+        results = []
+        if fresh:
+            try:
+                results = self.pipeline.process_reviews(
+                    [review.review_text for review in fresh],
+                    [product_info_from_product(products.get(review.product_id)) for review in fresh],
+                    batch_size=self.batch_size,
+                    profile=profile,
+                    trace=trace,
+                    # None of these has completed a full pass, so every one is counted now.
+                    # Retries too: keywords run after every other stage, so an attempt that
+                    # failed in one of them counted nothing
+                    update_keywords=True
+                )
+            except Exception as e:
+                logger.error(f"NLP processing failed for reviews {[review.id for review in fresh]}: {e}")
+                db.rollback()
+                trace.profile = trace.profile or profile
+                for review in fresh:
+                    review.processing_status = 'failed'
+                    db.add(build_processing_log(review.id, trace, error=e))
+                db.commit()
+                with self._lock:
+                    self.failed += len(fresh)
+                for review in fresh:
+                    self._emit('review_processing_failed', {'review_id': review.id, 'error': str(e)})
+                fresh = []
+                if not sources:
+                    return []
+
+        duplicates = [review for review in reviews if review.id in sources]
+        duplicate_trace = ProcessingTrace()
+        duplicate_trace.profile = 'duplicate'
+        duplicate_trace.num_reviews = len(duplicates)
+        duplicate_results = [nlp_results_from_review(sources[review.id]) for review in duplicates]
+        if duplicates:
+            self._recompute_text_fields(duplicates, duplicate_results, products)
+
+        processed = [(review, nlp_results, trace) for review, nlp_results in zip(fresh, results)]
+        processed += [(review, nlp_results, duplicate_trace) for review, nlp_results in zip(duplicates, duplicate_results)]
+        fresh_status = status_for_profile(profile)
+        partial = []
+        for review, nlp_results, review_trace in processed:
+            for field, value in review_fields_from_results(nlp_results).items():
+                setattr(review, field, value)
+            # Copies of complete reviews are complete whatever profile was asked for
+            review.processing_status = 'complete' if review_trace is duplicate_trace else fresh_status
+            if review.processing_status == 'partial':
+                # The next pass is the full one, with its own attempts
+                review.nlp_profile = DEFAULT_PROFILE
+                review.processing_attempts = 0
+                partial.append(review.id)
+            db.add(build_processing_log(review.id, review_trace, nlp_results))
+        if fresh:
+            self._assign_topics(fresh, results)
+        for review, nlp_results in zip(duplicates, duplicate_results):
+            review.topics = nlp_results['topics']
+            try:
+                get_embedding_store().copy(sources[review.id].id, review.id)
+            except Exception as e:
+                logger.warning(f"Could not copy the embedding of review {sources[review.id].id}: {e}")
+        db.commit()
+        with self._lock:
+            self.processed += len(processed)
+
+        for review, nlp_results, review_trace in processed:
+            self._emit('review_processed', {
+                'review_id': review.id,
+                'user_id': review.user_id,
+                'product_id': review.product_id,
+                'rating': review.rating,
+                'sentiment': review.sentiment,
+                'nlp_profile': review_trace.profile,
+                'processing_status': review.processing_status,
+                'nlp_analysis': format_nlp_analysis(nlp_results),
+                'timestamp': datetime.utcnow().isoformat()
+            })
+        return partial
+
+    def _check_duplicates(self, db, reviews):
+        """Index the batch for near-duplicates and return {review id: fully processed Review it copies}"""
+        if not duplicate_detection_enabled():
+            return {}
+        index = get_duplicate_index()
+        reusable = {}
+        for review in reviews:
+            if review.duplicate_analysis is not None:
+                continue  # indexed on an earlier attempt
+            try:
+                analysis = index.observe(review.id, review.review_text, review.user_id, review.product_id)
+            except Exception as e:
+                logger.warning(f"Duplicate check failed for review {review.id}: {e}")
+                continue
+            for field, value in duplicate_fields(analysis).items():
+                setattr(review, field, value)
+            if analysis['duplicate_of'] is not None and analysis['similarity'] >= REUSE_THRESHOLD:
+                reusable[review.id] = analysis['duplicate_of']
+        if not reusable:
+            return {}
+        sources = reusable_reviews(db, reusable.values())
+        return {review_id: sources[source_id] for review_id, source_id in reusable.items() if source_id in sources}
+
+    def _recompute_text_fields(self, reviews, results, products):
+        """Recompute the fields that follow each copy's own wording (failures keep the source's)"""
+        try:
+            text_fields = self.pipeline.text_fields(
+                [review.review_text for review in reviews],
+                [product_info_from_product(products.get(review.product_id)) for review in reviews]
+            )
+        except Exception as e:
+            logger.warning(f"Could not compute text fields for near-duplicates {[review.id for review in reviews]}: {e}")
+            return
+        for nlp_results, fields in zip(results, text_fields):
+            nlp_results.update(fields)
+
+    def _assign_topics(self, reviews, results):
+        """Embed the batch and set topics from the published topic model (failures only cost the topics)"""
+        try:
+            topics = self.pipeline.assign_topics([review.id for review in reviews], [review.review_text for review in reviews])
+        except Exception as e:
+            logger.warning(f"Could not embed/assign topics for reviews {[review.id for review in reviews]}: {e}")
+            return
+        for review, nlp_results, review_topics in zip(reviews, results, topics):
+            if review_topics is not None:
+                review.topics = nlp_results['topics'] = review_topics
+
+    def _emit(self, update_type, data):
+        if self.socketio is None:
+            return
+        try:
+            self.socketio.emit('live_update', {'type': update_type, 'data': data}, room='general')
+        except Exception as e:
+            logger.warning(f"Could not emit {update_type}: {e}")
+
+    def _reset_interrupted(self):
+        """Reviews left 'processing' by a previous run go back to pending"""
+        db = get_db()
+        try:
+            db.query(Review).filter(Review.processing_status == 'processing').update(
+                {Review.processing_status: 'pending'}, synchronize_session=False
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not reset interrupted reviews: {e}")
+        finally:
+            close_db()
+
+    def _sweep_loop(self):
+        while not self._stop.is_set():
+            self._sweep()
+            self._stop.wait(self.sweep_interval)
+
+    def _sweep(self):
+        """Queue pending and partial reviews, and failed ones with attempts left, that are not already queued, oldest first"""
+        free = self._queue.maxsize - self._queue.qsize()
+        if free <= 0:
+            return
+
+        db = get_db()
+        try:
+            now = datetime.utcnow()
+            pending = db.query(Review.id, Review.nlp_profile).filter(or_(
+                # Skip very recent rows: their submit call is about to queue them
+                and_(Review.processing_status == 'pending', Review.created_at <= now - timedelta(seconds=5)),
+                and_(Review.processing_status == 'partial', Review.updated_at <= now - timedelta(seconds=5)),
+                and_(
+                    Review.processing_status == 'failed',
+                    func.coalesce(Review.processing_attempts, 0) < self.max_attempts,
+                    Review.updated_at <= now - timedelta(seconds=self.retry_delay)
+                )
+            )).order_by(Review.created_at).limit(free + len(self._inflight)).all()
+        except Exception as e:
+            logger.warning(f"Pending review sweep failed: {e}")
+            return
+        finally:
+            close_db()
+
+        for review_id, profile in pending:
+            if not self.submit(review_id, profile or DEFAULT_PROFILE):
+                break
+
+
+_pool = None
+
+
+def init_review_workers(socketio=None, pipeline=None):
+    """Start the ingest pool when REVIEW_INGEST_MODE=async (returns the pool or None)"""
+    global _pool
+    if not async_ingest_enabled() or _pool is not None:
+        return _pool
+
+    if pipeline is None:
+        from nlp.advanced_pipeline import get_shared_pipeline
+        pipeline = get_shared_pipeline()
+
+    _pool = ReviewIngestPool(
+        pipeline,
+        socketio=socketio,
+        num_workers=int(os.environ.get('REVIEW_INGEST_WORKERS', 2)),
+        max_queue=int(os.environ.get('REVIEW_INGEST_QUEUE_SIZE', 1000)),
+        batch_size=int(os.environ.get('REVIEW_INGEST_BATCH_SIZE', 16)),
+        max_attempts=int(os.environ.get('REVIEW_INGEST_MAX_ATTEMPTS', 3))
+    )
+    _pool.start()
+    return _pool
+
+
+def get_review_worker_pool():
+    """The running ingest pool, or None in synchronous mode"""
+    return _pool